@@ -0,0 +1,214 @@
+# account_import.py
+import csv
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from backend.connection_pool import get_pool
+from backend.database import hash_password
+
+logger = logging.getLogger(__name__)
+
+# Cuentas por transacción (y por `executemany`)
+IMPORT_CHUNK_SIZE = 1000
+# Por debajo de este número de contraseñas en un bloque no compensa enviarlas a otros procesos
+PARALLEL_HASH_THRESHOLD = 500
+# Longitud máxima de `account.login` en el esquema de Metin2
+MAX_LOGIN_LENGTH = 30
+VALID_STATUSES = ("OK", "BLOCK")
+
+
+def count_data_lines(path):
+    """Cuenta las líneas con datos del archivo (sin la cabecera en CSV) para informar del progreso."""
+    lines = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                lines += 1
+    if path.lower().endswith(".csv") and lines:
+        lines -= 1
+    return lines
+
+
+def read_import_rows(path):
+    """
+    Lee el archivo de importación fila a fila sin cargarlo entero.
+
+    Admite CSV con cabecera (`login,password[,status]`) y JSONL con un objeto por línea.
+    Genera (número de línea, fila o None, error o None).
+    """
+    if path.lower().endswith(".jsonl"):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_number, None, f"JSON no válido: {e}"
+                    continue
+                if not isinstance(row, dict):
+                    yield line_number, None, "Se esperaba un objeto JSON"
+                    continue
+                yield line_number, row, None
+    else:
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                if not any((value or "").strip() for value in row.values() if isinstance(value, str)):
+                    continue
+                yield reader.line_num, row, None
+
+
+def validate_row(row):
+    """Normaliza una fila de importación; devuelve ((login, contraseña, estado), error)."""
+    login = str(row.get("login") or "").strip()
+    password = str(row.get("password") or "")
+    status = str(row.get("status") or "OK").strip().upper()
+
+    if not login:
+        return None, "Falta el usuario"
+    if len(login) > MAX_LOGIN_LENGTH:
+        return None, f"El usuario supera {MAX_LOGIN_LENGTH} caracteres"
+    if not password:
+        return None, "Falta la contraseña"
+    if status not in VALID_STATUSES:
+        return None, f"Estado no válido: {status}"
+    return (login, password, status), None
+
+
+def _existing_logins(cursor, logins):
+    if not logins:
+        return set()
+    placeholders = ", ".join(["%s"] * len(logins))
+    cursor.execute(f"SELECT login FROM account WHERE login IN ({placeholders})", logins)
+    return {row["login"].lower() for row in cursor.fetchall()}
+
+
+def _insert_chunk(connection, rows, errors):
+    """
+    Inserta un bloque (línea, login, hash, estado) en una transacción.
+
+    Si el `executemany` falla, se reintenta fila a fila para registrar solo las
+    filas problemáticas. Devuelve el número de cuentas insertadas.
+    """
+    if not rows:
+        return 0
+
+    insert = "INSERT INTO account (login, password, status) VALUES (%s, %s, %s)"
+    values = [(login, password_hash, status) for _, login, password_hash, status in rows]
+
+    try:
+        connection.begin()
+        with connection.cursor() as cursor:
+            cursor.executemany(insert, values)
+        connection.commit()
+        return len(rows)
+    except Exception:
+        connection.rollback()
+
+    inserted = 0
+    with connection.cursor() as cursor:
+        for line_number, login, password_hash, status in rows:
+            try:
+                cursor.execute(insert, (login, password_hash, status))
+                inserted += 1
+            except Exception as e:
+                errors.append((line_number, login, str(e)))
+    return inserted
+
+
+def import_accounts(path, chunk_size=IMPORT_CHUNK_SIZE, max_workers=None,
+                    progress_callback=None, should_cancel=None):
+    """
+    Importa cuentas desde un archivo CSV o JSONL.
+
+    El archivo se procesa por bloques de `chunk_size` filas: se validan, se
+    descartan los usuarios repetidos o ya existentes, las contraseñas se
+    cifran en un pool de procesos y el bloque se inserta con `executemany`
+    en su propia transacción. Los errores de una fila no detienen la importación.
+
+    :param path: Ruta del archivo (.csv con cabecera login,password[,status] o .jsonl).
+    :param max_workers: Procesos para cifrar contraseñas (None: uno por CPU).
+    :param progress_callback: Función opcional llamada con (filas procesadas, total de filas).
+    :param should_cancel: Función opcional; si devuelve True se detiene tras el bloque en curso.
+    :return: {"imported": n, "errors": [(línea, login, error)], "cancelled": bool}
+    """
+    total = count_data_lines(path)
+    processed = 0
+    imported = 0
+    errors = []
+    seen_logins = set()
+    cancelled = False
+    hash_executor = None
+
+    def hash_all(passwords):
+        nonlocal hash_executor
+        if len(passwords) < PARALLEL_HASH_THRESHOLD:
+            return [hash_password(password) for password in passwords]
+        if hash_executor is None:
+            hash_executor = ProcessPoolExecutor(max_workers=max_workers)
+        workers = max_workers or os.cpu_count() or 1
+        return list(hash_executor.map(hash_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+    def process_chunk(connection, chunk):
+        valid = []
+        for line_number, row in chunk:
+            values, error = validate_row(row)
+            if error:
+                errors.append((line_number, str(row.get("login", "")), error))
+                continue
+            login_key = values[0].lower()
+            if login_key in seen_logins:
+                errors.append((line_number, values[0], "Usuario repetido en el archivo"))
+                continue
+            seen_logins.add(login_key)
+            valid.append((line_number, values))
+
+        with connection.cursor() as cursor:
+            existing = _existing_logins(cursor, [values[0] for _, values in valid])
+        rows = []
+        for line_number, values in valid:
+            if values[0].lower() in existing:
+                errors.append((line_number, values[0], "El usuario ya existe"))
+            else:
+                rows.append((line_number, values))
+
+        hashes = hash_all([values[1] for _, values in rows])
+        return _insert_chunk(connection, [
+            (line_number, values[0], password_hash, values[2])
+            for (line_number, values), password_hash in zip(rows, hashes)
+        ], errors)
+
+    try:
+        with get_pool("account").connection() as connection:
+            chunk = []
+            for line_number, row, error in read_import_rows(path):
+                if error:
+                    errors.append((line_number, "", error))
+                    processed += 1
+                    continue
+                chunk.append((line_number, row))
+                if len(chunk) >= chunk_size:
+                    if should_cancel is not None and should_cancel():
+                        cancelled = True
+                        break
+                    imported += process_chunk(connection, chunk)
+                    processed += len(chunk)
+                    chunk = []
+                    if progress_callback is not None:
+                        progress_callback(processed, total)
+
+            if chunk and not cancelled:
+                imported += process_chunk(connection, chunk)
+                processed += len(chunk)
+    finally:
+        if hash_executor is not None:
+            hash_executor.shutdown()
+
+    if progress_callback is not None and not cancelled:
+        progress_callback(total, total)
+
+    errors.sort()
+    logger.info("Importación de cuentas: %d creadas, %d con errores", imported, len(errors))
+    return {"imported": imported, "errors": errors, "cancelled": cancelled}
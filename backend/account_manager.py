@@ -1,53 +1,100 @@
-import pymysql
-import json
-import os
+import logging
+from backend.connection_pool import get_pool
 
-# Definir la ruta al archivo de configuración JSON
-CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'server_config.json')
+logger = logging.getLogger(__name__)
 
-# Función para cargar la configuración del servidor desde el archivo JSON
-def load_server_config():
-    """Carga la configuración del servidor desde el archivo JSON."""
-    try:
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error al cargar el archivo de configuración: {e}")
-        return None
+# Valores admitidos por la columna `account.status`
+ACCOUNT_STATUSES = ["OK", "BLOCK"]
 
 # Función para actualizar el estado de la cuenta en la base de datos
-def update_account_status_in_db(account_id, new_status):
+def update_account_status_in_db(account_id, new_status, realm=None):
     """
     Actualiza el estado de una cuenta en la base de datos.
 
     :param account_id: ID de la cuenta a actualizar.
     :param new_status: Nuevo estado de la cuenta (OK o BLOCK).
+    :param realm: Reino de la cuenta (None para el reino activo).
     """
-    # Cargar configuración desde el archivo JSON
-    config = load_server_config()
-    if config is None:
-        raise Exception("No se pudo cargar la configuración del servidor.")
-
-    # Conectar a la base de datos
-    connection = pymysql.connect(
-        host=config["host"],
-        user=config["user"],
-        password=config["password"],
-        database=config["db_account_name"],  # Usar la base de datos de cuentas
-        port=config["port"],
-        cursorclass=pymysql.cursors.DictCursor
-    )
+    # Obtener una conexión del pool de la base de datos de cuentas
+    connection = get_pool("account", realm).get_connection()
 
     try:
         with connection.cursor() as cursor:
             # Actualizar el estado de la cuenta en la tabla
             cursor.execute("UPDATE account SET status = %s WHERE id = %s", (new_status, account_id))
             connection.commit()
-            print(f"Estado de la cuenta con ID {account_id} actualizado a {new_status}")
+            logger.info("Estado de la cuenta con ID %s actualizado a %s", account_id, new_status)
 
     except Exception as e:
-        print(f"Error al actualizar la base de datos: {e}")
+        logger.error("Error al actualizar la base de datos: %s", e)
         raise
 
     finally:
         connection.close()
+
+
+# Número de cuentas por sentencia en los cambios de estado masivos
+BULK_CHUNK_SIZE = 1000
+
+
+class OperationCancelled(Exception):
+    """Se lanza cuando una operación masiva se cancela a mitad; sus cambios se deshacen."""
+
+
+def update_accounts_status_bulk(account_ids, new_status, chunk_size=BULK_CHUNK_SIZE,
+                                progress_callback=None, should_cancel=None, realm=None):
+    """
+    Cambia el estado de muchas cuentas en una sola transacción.
+
+    Las cuentas se procesan por bloques de `chunk_size` con `WHERE id IN (...)`.
+    Si algo falla o se cancela, no se aplica ningún cambio.
+
+    :param account_ids: IDs de las cuentas a actualizar.
+    :param new_status: Nuevo estado de las cuentas (OK o BLOCK).
+    :param progress_callback: Función opcional llamada con (cuentas procesadas, total) tras cada bloque.
+    :param should_cancel: Función opcional que devuelve True si hay que abortar.
+    :param realm: Reino de las cuentas (None para el reino activo).
+    :return: Lista de IDs cuyo estado cambió realmente.
+    """
+    account_ids = list(dict.fromkeys(account_ids))  # Quitar duplicados conservando el orden
+    total = len(account_ids)
+    changed_ids = []
+
+    with get_pool("account", realm).connection() as connection:
+        try:
+            connection.begin()
+            with connection.cursor() as cursor:
+                for start in range(0, total, chunk_size):
+                    if should_cancel is not None and should_cancel():
+                        raise OperationCancelled("Cambio de estado cancelado")
+
+                    chunk = account_ids[start:start + chunk_size]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+
+                    # Bloquear las filas que realmente van a cambiar para poder devolverlas
+                    cursor.execute(
+                        f"SELECT id FROM account WHERE id IN ({placeholders}) AND status <> %s FOR UPDATE",
+                        (*chunk, new_status)
+                    )
+                    chunk_changed = [row["id"] for row in cursor.fetchall()]
+
+                    if chunk_changed:
+                        placeholders = ", ".join(["%s"] * len(chunk_changed))
+                        cursor.execute(
+                            f"UPDATE account SET status = %s WHERE id IN ({placeholders})",
+                            (new_status, *chunk_changed)
+                        )
+                        changed_ids.extend(chunk_changed)
+
+                    if progress_callback is not None:
+                        progress_callback(min(start + chunk_size, total), total)
+
+            connection.commit()
+            logger.info("Estado de %d cuentas actualizado a %s", len(changed_ids), new_status)
+        except Exception as e:
+            connection.rollback()
+            if not isinstance(e, OperationCancelled):
+                logger.error("Error al actualizar la base de datos: %s", e)
+            raise
+
+    return changed_ids
@@ -0,0 +1,110 @@
+# account_search.py
+from array import array
+
+# Longitud de los n-gramas indexados
+NGRAM_SIZE = 3
+
+_EMPTY_POSTINGS = array('i')
+
+
+class AccountSearchIndex(object):
+    """
+    Índice en memoria para buscar cuentas por subcadena del login o por id exacto.
+
+    Cada login (en minúsculas) se descompone en trigramas; para cada trigrama se
+    guarda la lista de posiciones de las cuentas que lo contienen. Una búsqueda
+    solo verifica las cuentas de la lista más corta entre los trigramas del término.
+    Los términos más cortos que un trigrama se resuelven recorriendo los logins
+    ya normalizados, o refinando el resultado anterior si el término lo amplía.
+    """
+
+    def __init__(self, accounts=()):
+        self._accounts = []
+        self._logins = []       # Logins en minúsculas, en el mismo orden que `_accounts`
+        self._positions_by_id = {}
+        self._ngrams = {}       # n-grama -> array de posiciones
+        self._last_term = None  # Último término buscado y sus posiciones, para refinar
+        self._last_positions = None
+        self.extend(accounts)
+
+    def __len__(self):
+        return len(self._accounts)
+
+    def extend(self, accounts):
+        """Añade cuentas al índice (por ejemplo, al cargar una nueva página)."""
+        ngrams = self._ngrams
+        for account in accounts:
+            position = len(self._accounts)
+            login = (account.get("login") or "").lower()
+            self._accounts.append(account)
+            self._logins.append(login)
+            self._positions_by_id[account.get("id")] = position
+
+            for ngram in {login[i:i + NGRAM_SIZE] for i in range(len(login) - NGRAM_SIZE + 1)}:
+                postings = ngrams.get(ngram)
+                if postings is None:
+                    postings = ngrams[ngram] = array('i')
+                postings.append(position)
+
+        # Las cuentas nuevas no están en el resultado guardado
+        self._last_term = None
+        self._last_positions = None
+
+    def get_by_id(self, account_id):
+        """Devuelve la cuenta con ese id, o None si no está cargada."""
+        position = self._positions_by_id.get(account_id)
+        return self._accounts[position] if position is not None else None
+
+    def _candidates(self, term):
+        """
+        Posiciones que pueden contener `term`; después se verifican una a una.
+
+        Devuelve None si hay que recorrer todas las cuentas.
+        """
+        candidates = None
+        if len(term) >= NGRAM_SIZE:
+            candidates = min(
+                (self._ngrams.get(term[i:i + NGRAM_SIZE], _EMPTY_POSTINGS)
+                 for i in range(len(term) - NGRAM_SIZE + 1)),
+                key=len
+            )
+
+        # Si el término amplía el anterior, sus resultados son un superconjunto válido
+        if self._last_term is not None and self._last_term in term:
+            if candidates is None or len(self._last_positions) < len(candidates):
+                candidates = self._last_positions
+        return candidates
+
+    def search(self, term):
+        """
+        Busca cuentas cuyo login contenga `term` (sin distinguir mayúsculas).
+
+        Si el término es numérico, la cuenta con ese id exacto aparece la primera.
+        Devuelve None si el término está vacío (sin filtro).
+        """
+        term = term.strip().lower()
+        if not term:
+            return None
+
+        logins = self._logins
+        candidates = self._candidates(term)
+        if candidates is None:
+            positions = [position for position, login in enumerate(logins) if term in login]
+        else:
+            positions = [position for position in candidates if term in logins[position]]
+        self._last_term = term
+        self._last_positions = positions
+
+        results = [self._accounts[position] for position in positions]
+        if term.isdecimal():
+            exact = self.get_by_id(int(term))
+            if exact is not None:
+                results = [exact] + [account for account in results if account is not exact]
+        return results
+
+    def matches(self, account, term):
+        """Indica si una cuenta coincide con `term` con los mismos criterios que `search`."""
+        term = term.strip().lower()
+        if term in (account.get("login") or "").lower():
+            return True
+        return term.isdecimal() and account.get("id") == int(term)
@@ -0,0 +1,556 @@
+# api_server.py
+"""
+Servidor HTTP/JSON sin interfaz gráfica con las operaciones del backend.
+
+Pensado para ejecutarse en la máquina del servidor de juego (sin pantalla ni
+PyQt5) y usarse desde scripts o desde varios administradores a la vez. Solo
+usa la biblioteca estándar: asyncio atiende las conexiones y las llamadas al
+backend, que son bloqueantes, se ejecutan en un pool de hilos que comparte los
+pools de conexiones MySQL de `backend.connection_pool`.
+
+Todas las peticiones llevan `Authorization: Bearer <token>`. El token se toma
+de --token, de la variable de entorno METIN2_ADMIN_API_TOKEN o de la clave
+"api_token" de 'server_config.json'; si no hay ninguno se genera uno al
+arrancar y se muestra en el log. Las operaciones aceptan `realm=<reino>` (por
+defecto, el primero de la configuración); las búsquedas y las estadísticas
+aceptan además `realm=all` para consultar todos los reinos a la vez.
+
+    GET    /api/status                          Estado del servicio y reinos
+    GET    /api/accounts?after_id=&limit=&total=1  Página de cuentas (paginación por id)
+    POST   /api/accounts                        Crea una cuenta {"login", "password"}
+    GET    /api/accounts/search?q=&limit=       Busca cuentas por login o id
+    PUT    /api/accounts/<id>/status            Cambia el estado {"status": "OK" | "BLOCK"}
+    POST   /api/accounts/status                 Cambio masivo {"ids": [...], "status"}
+    GET    /api/accounts/<id>/characters        Personajes de una cuenta
+    GET    /api/characters/search?q=&limit=     Busca personajes por nombre
+    GET    /api/gms                             Lista de GMs
+    POST   /api/gms                             Crea o actualiza un GM {"account", "character", "authority"}
+    PUT    /api/gms                             Aplica una lista {"gms": [...], "remove_missing": false, "dry_run"}
+    DELETE /api/gms/<mID>                       Elimina un GM
+    GET    /api/statistics                      Estadísticas del servidor
+    GET    /api/statistics/history?metric=&seconds=  Histórico agregado de una métrica
+    GET    /api/metrics                         Métricas de las consultas SQL (formas y agregados)
+
+Uso:
+    python -m backend.api_server --host 0.0.0.0 --port 8765
+    curl -H "Authorization: Bearer $TOKEN" http://127.0.0.1:8765/api/accounts/search?q=admin
+"""
+import argparse
+import asyncio
+import functools
+import hmac
+import json
+import logging
+import os
+import re
+import secrets
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+from backend import database, realms
+from backend.account_manager import update_accounts_status_bulk, ACCOUNT_STATUSES
+from backend.connection_pool import get_realm_names, get_active_realm, close_all_pools, DEFAULT_MAX_SIZE
+from backend.gm_manager import get_gm_list, create_gm, delete_gm, sync_gm_roster, validate_gm_entries
+from backend.query_metrics import get_query_metrics
+from backend.server_config import load_server_config
+from backend.statistics_history import get_statistics_history, start_statistics_collector, \
+    stop_statistics_collector, METRICS, DEFAULT_SAMPLE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Hilos para las llamadas al backend; con más que conexiones en el pool solo se acumulan esperas
+DEFAULT_MAX_WORKERS = 2 * DEFAULT_MAX_SIZE
+API_TOKEN_ENV = "METIN2_ADMIN_API_TOKEN"
+# Valor de `realm` que pide una consulta en todos los reinos
+ALL_REALMS = "all"
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+# Segundos esperando una petición completa en una conexión abierta (también entre peticiones keep-alive)
+REQUEST_TIMEOUT = 30
+MAX_PAGE_SIZE = 5000
+DEFAULT_HISTORY_SECONDS = 3600
+
+
+class ApiError(Exception):
+    """Error que se devuelve al cliente con su código HTTP y un mensaje."""
+
+    def __init__(self, status, message):
+        super(ApiError, self).__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request(object):
+    """Petición HTTP ya leída: método, ruta, parámetros de la URL, cabeceras y cuerpo."""
+
+    def __init__(self, method, target, version, headers, body):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path.rstrip("/") or "/"
+        self.query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        self.version = version
+        self.headers = headers
+        self.body = body
+        self.params = {}
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def arg(self, name, default=None):
+        return self.query.get(name, default)
+
+    def int_arg(self, name, default, minimum=None, maximum=None):
+        value = self.query.get(name)
+        if value is None:
+            return default
+        try:
+            value = int(value)
+        except ValueError:
+            raise ApiError(400, f"'{name}' debe ser un número entero")
+        if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+            raise ApiError(400, f"'{name}' debe estar entre {minimum} y {maximum}")
+        return value
+
+    def bool_arg(self, name, default=False):
+        value = self.query.get(name)
+        if value is None:
+            return default
+        return value.lower() in ("1", "true", "yes", "si", "sí")
+
+    def json(self):
+        try:
+            return json.loads(self.body.decode("utf-8")) if self.body else {}
+        except (UnicodeDecodeError, ValueError) as e:
+            raise ApiError(400, f"El cuerpo no es JSON válido: {e}")
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} no se puede convertir a JSON")
+
+
+def _required_string(body, name):
+    value = body.get(name) if isinstance(body, dict) else None
+    if not isinstance(value, str) or not value.strip():
+        raise ApiError(400, f"Falta '{name}'")
+    return value.strip()
+
+
+def _status_value(body):
+    status = _required_string(body, "status").upper()
+    if status not in ACCOUNT_STATUSES:
+        raise ApiError(400, f"'status' debe ser uno de: {', '.join(ACCOUNT_STATUSES)}")
+    return status
+
+
+class AdminApiServer(object):
+    """
+    Servidor HTTP/1.1 con keep-alive sobre `asyncio.start_server`.
+
+    Cada conexión es una corrutina; las funciones del backend se ejecutan en
+    `self.executor` con `run_in_executor`, así que el bucle de eventos nunca
+    se bloquea esperando a la base de datos.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, token=None, max_workers=DEFAULT_MAX_WORKERS):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api")
+        self.server = None
+        self.started = time.time()
+        self.requests_served = 0
+        self.routes = []
+        self._add_route("GET", r"/api/status", self.status)
+        self._add_route("GET", r"/api/accounts", self.list_accounts)
+        self._add_route("POST", r"/api/accounts", self.create_account)
+        self._add_route("GET", r"/api/accounts/search", self.search_accounts)
+        self._add_route("POST", r"/api/accounts/status", self.update_accounts_status)
+        self._add_route("PUT", r"/api/accounts/(?P<account_id>\d+)/status", self.update_account_status)
+        self._add_route("GET", r"/api/accounts/(?P<account_id>\d+)/characters", self.account_characters)
+        self._add_route("GET", r"/api/characters/search", self.search_characters)
+        self._add_route("GET", r"/api/gms", self.list_gms)
+        self._add_route("POST", r"/api/gms", self.set_gm)
+        self._add_route("PUT", r"/api/gms", self.sync_gms)
+        self._add_route("DELETE", r"/api/gms/(?P<gm_id>\d+)", self.delete_gm)
+        self._add_route("GET", r"/api/statistics", self.statistics)
+        self._add_route("GET", r"/api/statistics/history", self.statistics_history)
+        self._add_route("GET", r"/api/metrics", self.query_metrics)
+
+    def _add_route(self, method, pattern, handler):
+        self.routes.append((method, re.compile(pattern + "$"), handler))
+
+    # --- Servidor ---------------------------------------------------------------
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES)
+        addresses = ", ".join(str(sock.getsockname()) for sock in self.server.sockets)
+        logger.info("API de administración escuchando en %s", addresses)
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self.read_request(reader), REQUEST_TIMEOUT)
+                except ApiError as e:
+                    await self.send(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+
+                status, payload = await self.dispatch(request)
+                await self.send(writer, status, payload, request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def read_request(self, reader):
+        """Lee una petición; devuelve None si el cliente cerró la conexión entre peticiones."""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial.strip():
+                return None
+            raise
+        except asyncio.LimitOverrunError:
+            raise ApiError(431, "Cabeceras demasiado grandes")
+
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ")
+        if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+            raise ApiError(400, "Línea de petición no válida")
+        method, target, version = parts
+
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        if "transfer-encoding" in headers:
+            raise ApiError(501, "Transfer-Encoding no admitido; usa Content-Length")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise ApiError(400, "Content-Length no válido")
+        if length < 0:
+            raise ApiError(400, "Content-Length no válido")
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, f"El cuerpo supera {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, version, headers, body)
+
+    def authorized(self, request):
+        if self.token is None:
+            return True
+        scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(credentials.strip().encode(), self.token.encode())
+
+    def resolve(self, method, path):
+        allowed = []
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if route_method == method:
+                return handler, match.groupdict()
+            allowed.append(route_method)
+        if allowed:
+            raise ApiError(405, f"Método no permitido; usa {', '.join(allowed)}")
+        raise ApiError(404, "Ruta no encontrada")
+
+    async def dispatch(self, request):
+        started = time.perf_counter()
+        try:
+            if not self.authorized(request):
+                raise ApiError(401, "Falta el token o no es válido")
+            handler, request.params = self.resolve(request.method, request.path)
+            result = await handler(request)
+            status, payload = result if isinstance(result, tuple) else (200, result)
+        except ApiError as e:
+            status, payload = e.status, {"error": e.message}
+        except Exception as e:
+            logger.exception("Error no controlado en %s %s", request.method, request.path)
+            status, payload = 500, {"error": f"Error interno: {e}"}
+
+        self.requests_served += 1
+        logger.info("%s %s %d %.1f ms", request.method, request.path, status, (time.perf_counter() - started) * 1000)
+        return status, payload
+
+    async def send(self, writer, status, payload, keep_alive=True):
+        body = json.dumps(payload, default=_json_default, ensure_ascii=False).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 401:
+            headers.append('WWW-Authenticate: Bearer realm="metin2-admin"')
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    # --- Llamadas al backend ----------------------------------------------------
+
+    async def call(self, function, *args, **kwargs):
+        """Ejecuta una función bloqueante del backend en el pool de hilos."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+        except ApiError:
+            raise
+        except Exception as e:
+            raise ApiError(502, str(e))
+
+    async def call_backend(self, function, *args, **kwargs):
+        """Como `call`, para las funciones que devuelven (resultado, error)."""
+        result, error = await self.call(function, *args, **kwargs)
+        if error:
+            raise ApiError(502, str(error))
+        return result
+
+    async def realm_arg(self, request, allow_all=False):
+        """Reino pedido en `realm` (None para el activo); ALL_REALMS solo donde se admite."""
+        realm = request.arg("realm")
+        if realm is None:
+            return None
+        if realm == ALL_REALMS:
+            if not allow_all:
+                raise ApiError(400, f"Esta operación no admite realm={ALL_REALMS}")
+            return ALL_REALMS
+        if realm not in await self.call(get_realm_names):
+            raise ApiError(404, f"El reino '{realm}' no existe en la configuración")
+        return realm
+
+    # --- Rutas ------------------------------------------------------------------
+
+    async def status(self, request):
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "requests_served": self.requests_served,
+            "realms": await self.call(get_realm_names),
+            "active_realm": await self.call(get_active_realm),
+        }
+
+    async def list_accounts(self, request):
+        realm = await self.realm_arg(request)
+        return await self.call_backend(
+            database.get_accounts_page,
+            after_id=request.int_arg("after_id", 0, minimum=0),
+            page_size=request.int_arg("limit", database.ACCOUNT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE),
+            include_total=request.bool_arg("total"),
+            realm=realm,
+        )
+
+    async def create_account(self, request):
+        realm = await self.realm_arg(request)
+        body = request.json()
+        login = _required_string(body, "login")
+        password = _required_string(body, "password")
+        await self.call_backend(database.create_account, login, password, realm=realm)
+        return 201, {"login": login, "realm": realm or await self.call(get_active_realm)}
+
+    async def search_accounts(self, request):
+        term = request.arg("q", "").strip()
+        if not term:
+            raise ApiError(400, "Falta 'q'")
+        limit = request.int_arg("limit", database.SEARCH_LIMIT, minimum=1, maximum=MAX_PAGE_SIZE)
+        realm = await self.realm_arg(request, allow_all=True)
+        if realm == ALL_REALMS:
+            return await self.call_backend(realms.search_accounts_all_realms, term, limit)
+        return {"accounts": await self.call_backend(database.search_accounts, term, limit, realm=realm)}
+
+    async def update_account_status(self, request):
+        realm = await self.realm_arg(request)
+        status = _status_value(request.json())
+        account_id = int(request.params["account_id"])
+        changed = await self.call(update_accounts_status_bulk, [account_id], status, realm=realm)
+        return {"id": account_id, "status": status, "changed": bool(changed)}
+
+    async def update_accounts_status(self, request):
+        realm = await self.realm_arg(request)
+        body = request.json()
+        status = _status_value(body)
+        ids = body.get("ids")
+        if not isinstance(ids, list) or not ids or not all(isinstance(value, int) for value in ids):
+            raise ApiError(400, "'ids' debe ser una lista de ids de cuenta")
+        changed = await self.call(update_accounts_status_bulk, ids, status, realm=realm)
+        return {"status": status, "changed": changed}
+
+    async def account_characters(self, request):
+        realm = await self.realm_arg(request)
+        account_id = int(request.params["account_id"])
+        return {"characters": await self.call_backend(database.get_all_characters, account_id, realm=realm)}
+
+    async def search_characters(self, request):
+        name = request.arg("q", "").strip()
+        if not name:
+            raise ApiError(400, "Falta 'q'")
+        limit = request.int_arg("limit", database.SEARCH_LIMIT, minimum=1, maximum=MAX_PAGE_SIZE)
+        realm = await self.realm_arg(request, allow_all=True)
+        if realm == ALL_REALMS:
+            return await self.call_backend(realms.find_characters_all_realms, name, limit)
+        return {"characters": await self.call_backend(database.find_characters, name, limit, realm=realm)}
+
+    async def list_gms(self, request):
+        realm = await self.realm_arg(request)
+        return {"gms": await self.call_backend(get_gm_list, realm=realm)}
+
+    async def set_gm(self, request):
+        realm = await self.realm_arg(request)
+        entries, error = validate_gm_entries([request.json()])
+        if error:
+            raise ApiError(400, error)
+        entry = entries[0]
+        action = await self.call_backend(create_gm, entry["account"], entry["character"], entry["authority"],
+                                         realm=realm)
+        return (201 if action == "created" else 200), dict(entry, action=action)
+
+    async def sync_gms(self, request):
+        realm = await self.realm_arg(request)
+        body = request.json()
+        gms = body.get("gms") if isinstance(body, dict) else None
+        if not isinstance(gms, list):
+            raise ApiError(400, "'gms' debe ser una lista de GMs")
+        entries, error = validate_gm_entries(gms)
+        if error:
+            raise ApiError(400, error)
+        plan = await self.call_backend(sync_gm_roster, entries, remove_missing=bool(body.get("remove_missing", False)),
+                                       dry_run=bool(body.get("dry_run", False)), realm=realm)
+        plan["update"] = [dict(entry, mID=gm_id) for gm_id, entry in plan["update"]]
+        return plan
+
+    async def delete_gm(self, request):
+        realm = await self.realm_arg(request)
+        gm_id = int(request.params["gm_id"])
+        if not await self.call_backend(delete_gm, gm_id, realm=realm):
+            raise ApiError(404, f"No existe el GM con mID {gm_id}")
+        return {"deleted": gm_id}
+
+    async def statistics(self, request):
+        # Sin reino se suman todos, igual que en el panel de estadísticas
+        realm = await self.realm_arg(request, allow_all=True)
+        return await self.call_backend(database.get_server_statistics, None if realm == ALL_REALMS else realm)
+
+    async def statistics_history(self, request):
+        metric = request.arg("metric", "online_characters")
+        if metric not in METRICS:
+            raise ApiError(400, f"'metric' debe ser una de: {', '.join(METRICS)}")
+        seconds = request.int_arg("seconds", DEFAULT_HISTORY_SECONDS, minimum=60, maximum=5 * 365 * 86400)
+        end = time.time()
+        resolution, buckets = await self.call(get_statistics_history().get_series, metric, end - seconds, end)
+        return {
+            "metric": metric,
+            "resolution": resolution,
+            "buckets": [{"time": bucket, "min": minimum, "avg": average, "max": maximum}
+                        for bucket, minimum, average, maximum in buckets],
+        }
+
+    async def query_metrics(self, request):
+        # Solo formas y agregados: los mensajes de error de MySQL pueden citar valores ("Duplicate entry 'login'")
+        snapshot = get_query_metrics().snapshot()
+        for query in snapshot["queries"]:
+            query.pop("last_error", None)
+        for entry in snapshot["slow_queries"]:
+            entry["error"] = entry["error"] is not None
+        return snapshot
+
+
+async def serve(server):
+    """Atiende peticiones hasta recibir SIGINT o SIGTERM."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signal_number, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C llega como KeyboardInterrupt
+    await server.start()
+    try:
+        await stop.wait()
+    finally:
+        logger.info("Deteniendo la API de administración...")
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.api_server",
+                                     description="API HTTP/JSON de administración del servidor, sin interfaz gráfica.")
+    parser.add_argument("--host", help=f"Dirección en la que escuchar (por defecto \"api_host\" o {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, help=f"Puerto (por defecto \"api_port\" o {DEFAULT_PORT})")
+    parser.add_argument("--token", help=f"Token de acceso (por defecto {API_TOKEN_ENV} o \"api_token\")")
+    parser.add_argument("--no-auth", action="store_true", help="Sin token (solo para pruebas en local)")
+    parser.add_argument("--workers", type=int, help="Hilos para las llamadas al backend")
+    parser.add_argument("--no-collector", action="store_true", help="No muestrear estadísticas para el histórico")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    config = load_server_config()
+    if config is None:
+        logger.error("No se pudo cargar la configuración del servidor.")
+        return 1
+
+    token = None
+    if not args.no_auth:
+        token = args.token or os.environ.get(API_TOKEN_ENV) or config.get("api_token")
+        if not token:
+            token = secrets.token_urlsafe(32)
+            logger.warning("No hay token configurado; token generado para esta ejecución: %s", token)
+
+    server = AdminApiServer(
+        host=args.host or config.get("api_host", DEFAULT_HOST),
+        port=args.port or config.get("api_port", DEFAULT_PORT),
+        token=token,
+        max_workers=args.workers or config.get("api_max_workers", DEFAULT_MAX_WORKERS),
+    )
+    if not args.no_collector:
+        start_statistics_collector(config.get("statistics_sample_interval", DEFAULT_SAMPLE_INTERVAL))
+    try:
+        asyncio.run(serve(server))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_statistics_collector()
+        close_all_pools()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
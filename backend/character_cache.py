@@ -0,0 +1,102 @@
+# character_cache.py
+import threading
+import time
+from collections import OrderedDict
+from backend.database import get_characters_for_accounts
+from backend.connection_pool import get_active_realm
+
+# Número máximo de cuentas con personajes en caché
+DEFAULT_MAX_ACCOUNTS = 2000
+# Segundos que una entrada se considera válida
+DEFAULT_TTL = 60
+
+
+class CharacterCache(object):
+    """
+    Caché LRU con caducidad de los personajes de cada cuenta.
+
+    Las cuentas que faltan se piden a la base de datos en una sola consulta
+    por lotes, así que al prefetch de las filas visibles le basta una ida y vuelta.
+    Los ids de cuenta solo son únicos dentro de un reino: hay una caché por reino.
+    """
+
+    def __init__(self, realm=None, max_accounts=DEFAULT_MAX_ACCOUNTS, ttl=DEFAULT_TTL):
+        self.realm = realm
+        self.max_accounts = max_accounts
+        self.ttl = ttl
+        self._entries = OrderedDict()  # account_id -> (instante de carga, personajes)
+        self._lock = threading.Lock()
+
+    def get(self, account_id):
+        """Devuelve los personajes en caché de una cuenta, o None si no están o caducaron."""
+        with self._lock:
+            entry = self._entries.get(account_id)
+            if entry is None:
+                return None
+            loaded_at, characters = entry
+            if time.monotonic() - loaded_at > self.ttl:
+                del self._entries[account_id]
+                return None
+            self._entries.move_to_end(account_id)
+            return characters
+
+    def put_many(self, characters_by_account):
+        now = time.monotonic()
+        with self._lock:
+            for account_id, characters in characters_by_account.items():
+                self._entries[account_id] = (now, characters)
+                self._entries.move_to_end(account_id)
+            while len(self._entries) > self.max_accounts:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, account_id=None):
+        """Descarta una cuenta, o toda la caché si `account_id` es None."""
+        with self._lock:
+            if account_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(account_id, None)
+
+    def missing(self, account_ids):
+        """Devuelve las cuentas de la lista que no tienen una entrada válida."""
+        return [account_id for account_id in account_ids if self.get(account_id) is None]
+
+    def prefetch(self, account_ids):
+        """
+        Carga en una consulta por lotes las cuentas que aún no están en caché.
+
+        :return: (número de cuentas cargadas, error)
+        """
+        missing = self.missing(account_ids)
+        if not missing:
+            return 0, None
+        characters_by_account, error = get_characters_for_accounts(missing, realm=self.realm)
+        if error:
+            return None, error
+        self.put_many(characters_by_account)
+        return len(missing), None
+
+    def get_characters(self, account_id):
+        """Igual que `get_all_characters`, pero sirviendo desde la caché cuando es posible."""
+        characters = self.get(account_id)
+        if characters is not None:
+            return characters, None
+        characters_by_account, error = get_characters_for_accounts([account_id], realm=self.realm)
+        if error:
+            return None, error
+        self.put_many(characters_by_account)
+        return characters_by_account[account_id], None
+
+
+_caches = {}  # reino -> caché
+_cache_lock = threading.Lock()
+
+
+def get_character_cache(realm=None):
+    """Devuelve la caché de personajes compartida de un reino (por defecto, el activo)."""
+    realm = realm or get_active_realm()
+    with _cache_lock:
+        cache = _caches.get(realm)
+        if cache is None:
+            cache = _caches[realm] = CharacterCache(realm)
+        return cache
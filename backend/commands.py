@@ -1,15 +1,185 @@
 # commands.py
-import os
+import asyncio
+import time
 
-def execute_server_command(command):
+RESTART_COMMAND = "/etc/init.d/metin2 restart"
+# Segundos máximos que puede durar un comando (None para no limitarlo)
+DEFAULT_COMMAND_TIMEOUT = 300
+# Comandos que se ejecutan a la vez (por ejemplo, uno por canal)
+DEFAULT_MAX_CONCURRENCY = 4
+# Segundos que se espera a que un proceso termine tras pedírselo antes de matarlo
+TERMINATE_GRACE_SECONDS = 5
+# Segundos que se sigue leyendo la salida después de que el proceso termine
+OUTPUT_DRAIN_SECONDS = 1
+# Una línea más larga que esto se entrega en trozos
+MAX_LINE_BYTES = 64 * 1024
+STREAM_NAMES = {1: "stdout", 2: "stderr"}
+
+
+class _OutputProtocol(asyncio.SubprocessProtocol):
+    """
+    Recibe la salida de un proceso y la entrega línea a línea con `emit(flujo, línea)`.
+
+    `exited` se completa al terminar el proceso, aunque un demonio arrancado por
+    el comando conserve abierta la salida; `output_closed`, al cerrarse stdout y stderr.
+    """
+
+    def __init__(self, emit):
+        loop = asyncio.get_running_loop()
+        self._emit = emit
+        self._buffers = {fd: b"" for fd in STREAM_NAMES}
+        self._open_pipes = len(STREAM_NAMES)
+        self.exited = loop.create_future()
+        self.output_closed = loop.create_future()
+
+    def pipe_data_received(self, fd, data):
+        *lines, rest = (self._buffers[fd] + data).split(b"\n")
+        while len(rest) > MAX_LINE_BYTES:
+            lines.append(rest[:MAX_LINE_BYTES])
+            rest = rest[MAX_LINE_BYTES:]
+        self._buffers[fd] = rest
+        for line in lines:
+            self._emit(STREAM_NAMES[fd], line)
+
+    def pipe_connection_lost(self, fd, exc):
+        if fd not in STREAM_NAMES:
+            return
+        if self._buffers[fd]:
+            self._emit(STREAM_NAMES[fd], self._buffers[fd])
+            self._buffers[fd] = b""
+        self._open_pipes -= 1
+        if not self._open_pipes and not self.output_closed.done():
+            self.output_closed.set_result(None)
+
+    def process_exited(self):
+        if not self.exited.done():
+            self.exited.set_result(None)
+
+
+class CommandRunner(object):
+    """
+    Ejecuta comandos del servidor con asyncio.
+
+    La salida se entrega línea a línea mientras el proceso se ejecuta con
+    `on_line(nombre, flujo, línea)` (flujo es "stdout" o "stderr"), cada
+    comando tiene un tiempo máximo y un semáforo limita cuántos se ejecutan a
+    la vez. Si la tarea se cancela, o se supera el tiempo máximo, el proceso se
+    termina (y se mata si no responde).
+
+    Cada ejecución devuelve un diccionario con `name`, `command`, `returncode`,
+    `output` (lista de (flujo, línea)), `timed_out`, `cancelled` y `duration`.
+    Un mismo CommandRunner debe usarse desde un único bucle de eventos.
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, timeout=DEFAULT_COMMAND_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore = None
+
+    def _get_semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def run(self, command, name=None, on_line=None, timeout=None):
+        """Ejecuta `command` en una shell y devuelve su resultado."""
+        name = name or command
+        timeout = self.timeout if timeout is None else timeout
+        result = {"name": name, "command": command, "returncode": None, "output": [],
+                  "timed_out": False, "cancelled": False, "duration": 0.0}
+
+        def emit(stream_name, line):
+            text = line.decode(errors="replace").rstrip("\r")
+            result["output"].append((stream_name, text))
+            if on_line is not None:
+                on_line(name, stream_name, text)
+
+        async with self._get_semaphore():
+            started = time.monotonic()
+            transport, protocol = await asyncio.get_running_loop().subprocess_shell(
+                lambda: _OutputProtocol(emit), command,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+            try:
+                try:
+                    await asyncio.wait_for(asyncio.shield(protocol.exited), timeout)
+                except asyncio.TimeoutError:
+                    result["timed_out"] = True
+                    await self._stop(transport, protocol)
+                result["returncode"] = transport.get_returncode()
+                try:
+                    await asyncio.wait_for(asyncio.shield(protocol.output_closed), OUTPUT_DRAIN_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                result["cancelled"] = True
+                await self._stop(transport, protocol)
+                raise
+            finally:
+                result["duration"] = time.monotonic() - started
+                # Si un demonio arrancado por el comando conserva la salida abierta, se deja de leer
+                transport.close()
+        return result
+
+    async def run_many(self, commands, on_line=None, timeout=None, on_result=None):
+        """
+        Ejecuta varios comandos a la vez (hasta `max_concurrency`).
+
+        :param commands: Lista de comandos o de pares (nombre, comando).
+        :param on_result: Función opcional llamada con el resultado de cada comando al terminar.
+        :return: Lista de resultados en el mismo orden.
+        """
+        async def run_one(name, command):
+            result = await self.run(command, name=name, on_line=on_line, timeout=timeout)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        tasks = []
+        for entry in commands:
+            name, command = entry if isinstance(entry, (tuple, list)) else (entry, entry)
+            tasks.append(run_one(name, command))
+        return await asyncio.gather(*tasks)
+
+    @staticmethod
+    async def _stop(transport, protocol):
+        if transport.get_returncode() is not None:
+            return
+        try:
+            transport.terminate()
+            await asyncio.wait_for(asyncio.shield(protocol.exited), TERMINATE_GRACE_SECONDS)
+        except ProcessLookupError:
+            await protocol.exited
+        except asyncio.TimeoutError:
+            transport.kill()
+            await protocol.exited
+
+
+def format_command_result(result):
+    """Texto del resultado de un comando, con la salida y el motivo si no terminó bien."""
+    text = "\n".join(line for _, line in result["output"])
+    if result["timed_out"]:
+        text += f"\nEl comando superó el tiempo máximo y se detuvo ({result['command']})"
+    elif result["cancelled"]:
+        text += f"\nEl comando se canceló ({result['command']})"
+    return text
+
+
+def run_server_commands(commands, on_line=None, timeout=DEFAULT_COMMAND_TIMEOUT, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """Versión bloqueante de `CommandRunner.run_many` (crea su propio bucle de eventos)."""
+    runner = CommandRunner(max_concurrency=max_concurrency, timeout=timeout)
+    return asyncio.run(runner.run_many(commands, on_line=on_line))
+
+
+def execute_server_command(command, timeout=DEFAULT_COMMAND_TIMEOUT):
     # Esta función ejecutará comandos en el servidor
     try:
-        result = os.popen(command).read()
-        return result
+        result, = run_server_commands([command], timeout=timeout)
+        return format_command_result(result)
     except Exception as e:
         return f"Error al ejecutar el comando: {e}"
 
+
 def restart_server():
     print("Reiniciando el servidor de Metin2...")
-    result = execute_server_command("/etc/init.d/metin2 restart")
-    print(result)
+    results = run_server_commands([RESTART_COMMAND], on_line=lambda name, stream, line: print(line))
+    return results[0]
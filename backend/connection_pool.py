@@ -0,0 +1,347 @@
+# connection_pool.py
+import threading
+import time
+from contextlib import contextmanager
+
+from backend.server_config import load_server_config, get_config_service, get_realms
+from backend.query_metrics import get_query_metrics, instrumented_cursor_class
+
+# Bases de datos lógicas y la clave de 'server_config.json' que contiene su nombre real
+DATABASE_KEYS = {
+    "account": "db_account_name",
+    "common": "db_common_name",
+    "player": "db_player_name",
+}
+
+# Valores por defecto de los pools (se pueden sobrescribir en 'server_config.json' con "pool_*")
+DEFAULT_MAX_SIZE = 5
+DEFAULT_IDLE_TIMEOUT = 300        # Segundos que una conexión puede estar libre antes de cerrarse
+DEFAULT_HEALTH_CHECK_INTERVAL = 30  # Segundos libres tras los que se hace ping antes de reutilizarla
+DEFAULT_ACQUIRE_TIMEOUT = 10      # Segundos máximos esperando una conexión libre
+
+# Bit de `server_status` que indica una transacción abierta (pymysql.constants.SERVER_STATUS.SERVER_STATUS_IN_TRANS).
+# pymysql se importa al crear la primera conexión para no retrasar el arranque de la interfaz.
+SERVER_STATUS_IN_TRANS = 1
+
+# Claves de la configuración que afectan a las conexiones; si cambia alguna se recrean los pools
+CONNECTION_KEYS = ("host", "port", "user", "password") + tuple(DATABASE_KEYS.values()) + (
+    "realms", "pool_max_size", "pool_idle_timeout", "pool_health_check_interval", "pool_acquire_timeout",
+)
+
+
+class PoolTimeoutError(Exception):
+    """Se lanza cuando no hay conexiones libres dentro del tiempo de espera."""
+
+
+class PooledConnection(object):
+    """
+    Envoltorio de una conexión de pymysql prestada por un pool.
+
+    Se comporta como la conexión original, pero `close()` la devuelve al pool
+    en lugar de cerrar el socket.
+    """
+
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name):
+        connection = self.__dict__.get("_connection")
+        if connection is None:
+            raise AttributeError("La conexión ya fue devuelta al pool")
+        return getattr(connection, name)
+
+    def close(self):
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            self._pool.release(connection)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ConnectionPool(object):
+    """Pool de conexiones MySQL thread-safe para una base de datos concreta."""
+
+    def __init__(self, host, port, user, password, database,
+                 max_size=DEFAULT_MAX_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL,
+                 acquire_timeout=DEFAULT_ACQUIRE_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.database = database
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = []  # Lista de (conexión, instante en que quedó libre)
+        self._in_use = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def _create_connection(self):
+        import pymysql
+        return pymysql.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            port=self.port,
+            database=self.database,
+            # Cada sentencia se mide para el panel de métricas de consultas
+            cursorclass=instrumented_cursor_class(pymysql.cursors.DictCursor),
+            # Cada consulta suelta se confirma sola; las escrituras múltiples usan begin()/commit()
+            autocommit=True
+        )
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _evict_idle(self, now):
+        """Cierra las conexiones libres que superaron `idle_timeout`. Requiere el lock."""
+        alive = []
+        for connection, released_at in self._idle:
+            if now - released_at > self.idle_timeout:
+                self._close_quietly(connection)
+            else:
+                alive.append((connection, released_at))
+        self._idle = alive
+
+    def _is_healthy(self, connection, released_at, now):
+        if now - released_at < self.health_check_interval:
+            return True
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """Obtiene una conexión libre, creando una nueva si no se alcanzó `max_size`."""
+        started = time.perf_counter()
+        connection = self._acquire()
+        get_query_metrics().record_wait(f"{self.host}/{self.database}", time.perf_counter() - started)
+        return connection
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError("El pool de conexiones está cerrado")
+
+                now = time.monotonic()
+                self._evict_idle(now)
+
+                while self._idle:
+                    connection, released_at = self._idle.pop()
+                    if self._is_healthy(connection, released_at, now):
+                        self._in_use += 1
+                        return connection
+                    self._close_quietly(connection)
+
+                if self._in_use < self.max_size:
+                    # Reservar el hueco antes de conectar para no bloquear a otros hilos
+                    self._in_use += 1
+                    break
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No hay conexiones libres para '{self.database}' tras {self.acquire_timeout}s"
+                    )
+                self._condition.wait(remaining)
+
+        try:
+            return self._create_connection()
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, connection):
+        """Devuelve una conexión al pool, descartando cualquier transacción pendiente."""
+        try:
+            if connection.server_status & SERVER_STATUS_IN_TRANS:
+                connection.rollback()
+            reusable = connection.open
+        except Exception:
+            reusable = False
+
+        with self._condition:
+            self._in_use -= 1
+            if reusable and not self._closed:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self._close_quietly(connection)
+            self._condition.notify()
+
+    def get_connection(self):
+        """Devuelve un `PooledConnection` cuya llamada a `close()` lo devuelve al pool."""
+        return PooledConnection(self, self.acquire())
+
+    @contextmanager
+    def connection(self):
+        """Gestor de contexto que presta una conexión y la devuelve al salir."""
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self):
+        """Cierra todas las conexiones libres; las prestadas se cierran al devolverse."""
+        with self._condition:
+            self._closed = True
+            for connection, _ in self._idle:
+                self._close_quietly(connection)
+            self._idle = []
+            self._condition.notify_all()
+
+
+_pools = {}  # (reino, base de datos) -> pool
+_pools_lock = threading.Lock()
+# Reino que usan las llamadas que no indican uno (el que se elige en la interfaz)
+_active_realm = None
+_default_realm = None
+
+
+def resolve_database_name(db_name, config):
+    """Traduce un nombre lógico ('account', 'common', 'player') al nombre real de la base de datos."""
+    if db_name in DATABASE_KEYS:
+        return config[DATABASE_KEYS[db_name]]
+    return db_name
+
+
+def _load_config():
+    config = load_server_config()
+    if config is None:
+        raise Exception("No se pudo cargar la configuración del servidor.")
+    return config
+
+
+def get_realm_names():
+    """Nombres de los reinos configurados, en el orden del archivo de configuración."""
+    return [realm["name"] for realm in get_realms(_load_config())]
+
+
+def get_realm_config(realm=None, config=None):
+    """Devuelve los datos de conexión de un reino (por defecto, el activo)."""
+    config = config or _load_config()
+    realm = realm or get_active_realm()
+    for realm_config in get_realms(config):
+        if realm_config["name"] == realm:
+            return realm_config
+    raise Exception(f"El reino '{realm}' no existe en la configuración.")
+
+
+def get_active_realm():
+    """Reino que se usa cuando una función no recibe `realm` (por defecto, el primero)."""
+    global _default_realm
+    if _active_realm is not None:
+        return _active_realm
+    if _default_realm is None:
+        _default_realm = get_realms(_load_config())[0]["name"]
+    return _default_realm
+
+
+def set_active_realm(realm):
+    """Cambia el reino activo; None vuelve al primero de la configuración."""
+    global _active_realm
+    if realm is not None and realm not in get_realm_names():
+        raise Exception(f"El reino '{realm}' no existe en la configuración.")
+    _active_realm = realm
+
+
+def get_pool(db_name, realm=None):
+    """
+    Devuelve el pool compartido para una base de datos de un reino, creándolo la primera vez.
+
+    :param db_name: Nombre lógico ('account', 'common', 'player') o nombre real de la base de datos.
+    :param realm: Nombre del reino (None para el reino activo).
+    """
+    # Si el archivo de configuración cambió, los pools afectados se cierran antes de seguir
+    get_config_service().refresh()
+    key = (realm or get_active_realm(), db_name)
+    with _pools_lock:
+        pool = _pools.get(key)
+    if pool is not None:
+        return pool
+
+    # Fuera del bloqueo: leer la configuración puede avisar de un cambio y cerrar los pools
+    config = _load_config()
+    realm_config = get_realm_config(key[0], config)
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None:
+            return pool
+
+        pool = ConnectionPool(
+            host=realm_config["host"],
+            port=realm_config["port"],
+            user=realm_config["user"],
+            password=realm_config["password"],
+            database=resolve_database_name(db_name, realm_config),
+            max_size=config.get("pool_max_size", DEFAULT_MAX_SIZE),
+            idle_timeout=config.get("pool_idle_timeout", DEFAULT_IDLE_TIMEOUT),
+            health_check_interval=config.get("pool_health_check_interval", DEFAULT_HEALTH_CHECK_INTERVAL),
+            acquire_timeout=config.get("pool_acquire_timeout", DEFAULT_ACQUIRE_TIMEOUT),
+        )
+        _pools[key] = pool
+        return pool
+
+
+def streaming_cursor(connection):
+    """
+    Abre un cursor sin buffer (del lado del servidor) que devuelve diccionarios.
+
+    Las filas se leen del socket a medida que se piden, así que la conexión
+    queda ocupada hasta que el cursor se consume o se cierra.
+    """
+    from pymysql.cursors import SSDictCursor
+    return connection.cursor(instrumented_cursor_class(SSDictCursor))
+
+
+@contextmanager
+def pooled_connection(db_name, realm=None):
+    """Atajo para `with pooled_connection('account') as connection: ...`."""
+    with get_pool(db_name, realm).connection() as connection:
+        yield connection
+
+
+def close_all_pools():
+    """Cierra todos los pools; se recrean con la configuración actual en el siguiente uso."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def connection_settings_changed(config, previous):
+    """Indica si entre dos configuraciones cambió algún dato de conexión."""
+    return any(config.get(key) != previous.get(key) for key in CONNECTION_KEYS)
+
+
+def _on_config_changed(config, previous):
+    global _active_realm, _default_realm
+    # Las conexiones abiertas usan los datos anteriores; se recrean en el siguiente uso
+    if connection_settings_changed(config, previous):
+        _default_realm = None
+        if _active_realm not in [realm["name"] for realm in get_realms(config)]:
+            _active_realm = None
+        close_all_pools()
+
+
+get_config_service().subscribe(_on_config_changed)
@@ -1,174 +1,284 @@
 # database.py (actualizado)
 
-import pymysql
-import json
-import os
 import hashlib
+import logging
 from backend.server_config import load_server_config
-from datetime import datetime, timedelta
+from backend.connection_pool import get_pool, streaming_cursor
+from backend.statistics_engine import get_statistics_engine
 
-# Ruta al archivo de configuración 'server_config.json' en la carpeta 'config'
-CONFIG_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'server_config.json')
+logger = logging.getLogger(__name__)
+
+# Tamaños por defecto para la lectura paginada de cuentas
+ACCOUNT_PAGE_SIZE = 500
+ACCOUNT_BATCH_SIZE = 1000
+# Cuentas por consulta al pedir personajes de varias cuentas a la vez
+CHARACTER_BATCH_SIZE = 500
+# Resultados máximos de una búsqueda en la base de datos (por reino)
+SEARCH_LIMIT = 200
 
 def load_db_config():
-    """Carga la configuración de la base de datos desde el archivo 'server_config.json'."""
+    """Devuelve la configuración de la base de datos (la misma que `load_server_config`)."""
+    return load_server_config()
+
+def connect_to_database(db_name, realm=None):
+    """
+    Obtiene una conexión del pool compartido de la base de datos indicada.
+
+    :param db_name: Nombre lógico ('account', 'common', 'player') o nombre real de la base de datos.
+    :param realm: Reino al que conectarse (None para el reino activo). Lo admiten todas las funciones de este módulo.
+    La conexión devuelta vuelve al pool al llamar a `close()`.
+    """
+    try:
+        return get_pool(db_name, realm).get_connection(), None
+    except Exception as e:
+        return None, str(e)
+
+def count_accounts(realm=None):
+    """Devuelve el número total de cuentas como (total, error)."""
+    connection, error = connect_to_database("account", realm)
+    if error:
+        return None, error
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) AS total FROM account")
+            return cursor.fetchone()["total"], None
+    except Exception as e:
+        return None, f"Error counting accounts: {str(e)}"
+    finally:
+        connection.close()
+
+def iter_account_batches(after_id=0, batch_size=ACCOUNT_BATCH_SIZE, limit=None, realm=None):
+    """
+    Recorre la tabla `account` en orden de `id` usando un cursor sin buffer.
+
+    Genera listas de como máximo `batch_size` cuentas sin cargar la tabla entera
+    en memoria. La conexión vuelve al pool al agotar o cerrar el generador.
+
+    :param after_id: Solo se devuelven cuentas con `id` mayor que este valor.
+    :param batch_size: Número de filas por lote.
+    :param limit: Número máximo de cuentas a devolver (None para todas).
+    """
+    connection, error = connect_to_database("account", realm)
+    if error:
+        raise Exception(error)
+
+    query = "SELECT id, login, status, create_time FROM account WHERE id > %s ORDER BY id"
+    params = (after_id,)
+    if limit is not None:
+        query += " LIMIT %s"
+        params = (after_id, limit)
+
+    cursor = streaming_cursor(connection)
+    try:
+        cursor.execute(query, params)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield batch
+    finally:
+        # Cerrar el cursor descarta las filas pendientes y libera la conexión
+        cursor.close()
+        connection.close()
+
+def get_accounts_page(after_id=0, page_size=ACCOUNT_PAGE_SIZE, include_total=False, realm=None):
+    """
+    Devuelve una página de cuentas usando paginación por clave (keyset) sobre `id`.
+
+    :param after_id: `id` de la última cuenta de la página anterior (0 para la primera).
+    :param page_size: Número de cuentas por página.
+    :param include_total: Si es True se incluye el total de cuentas en el resultado.
+    :return: ({"accounts", "last_id", "has_more", "total"}, error)
+    """
     try:
-        with open(CONFIG_FILE_PATH, 'r') as config_file:
-            db_config = json.load(config_file)
-        return db_config
+        # Se pide una fila de más para saber si existe una página siguiente
+        accounts = []
+        for batch in iter_account_batches(after_id, batch_size=page_size + 1, limit=page_size + 1, realm=realm):
+            accounts.extend(batch)
     except Exception as e:
-        print(f"Error al cargar la configuración de la base de datos: {e}")
-        return None
+        return None, f"Error fetching accounts: {str(e)}"
+
+    has_more = len(accounts) > page_size
+    accounts = accounts[:page_size]
 
-def connect_to_database(db_name):
-    """Conecta a la base de datos usando la configuración cargada desde 'server_config.json'."""
-    db_config = load_db_config()
+    total = None
+    if include_total:
+        total, error = count_accounts(realm)
+        if error:
+            return None, error
 
-    if not db_config:
-        return None, "No se pudo cargar la configuración de la base de datos"
+    return {
+        "accounts": accounts,
+        "last_id": accounts[-1]["id"] if accounts else after_id,
+        "has_more": has_more,
+        "total": total
+    }, None
 
+def get_all_accounts(realm=None):
     try:
-        connection = pymysql.connect(
-            host=db_config['host'],
-            user=db_config['user'],
-            password=db_config['password'],
-            port=db_config['port'],
-            database=db_name,
-            cursorclass=pymysql.cursors.DictCursor
-        )
-        return connection, None
+        # Consultar todas las cuentas por lotes para no duplicar el resultado en el driver
+        accounts = []
+        for batch in iter_account_batches(realm=realm):
+            accounts.extend(batch)
+        return accounts, None
     except Exception as e:
+        # Si hay un error, retornarlo para manejarlo en la lógica de carga de cuentas
+        return None, f"Error fetching accounts: {str(e)}"
+
+def get_all_characters(account_id, realm=None):
+    connection, error = connect_to_database("player", realm)
+    if error:
+        return None, error
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id, name, job, last_play FROM player WHERE account_id = %s", (account_id,))
+            characters = cursor.fetchall()
+            return characters, None
+    except Exception as e:
+        logger.error("Error al obtener personajes: %s", e)
         return None, str(e)
+    finally:
+        connection.close()
+
+def get_characters_for_accounts(account_ids, chunk_size=CHARACTER_BATCH_SIZE, realm=None):
+    """
+    Obtiene los personajes de varias cuentas con consultas `WHERE account_id IN (...)`.
 
-def get_all_accounts():
-    connection, error = connect_to_database("srv1_account")
+    :return: ({account_id: [personajes]}, error). Las cuentas sin personajes tienen una lista vacía.
+    """
+    account_ids = list(dict.fromkeys(account_ids))
+    characters_by_account = {account_id: [] for account_id in account_ids}
+    if not account_ids:
+        return characters_by_account, None
 
+    connection, error = connect_to_database("player", realm)
     if error:
-        # Si hay un error, retornarlo para manejarlo en la lógica de carga de cuentas
         return None, error
 
     try:
         with connection.cursor() as cursor:
-            # Consultar todas las cuentas
-            cursor.execute("SELECT id, login, status, create_time FROM account")
-            accounts = cursor.fetchall()
-        return accounts, None
+            for start in range(0, len(account_ids), chunk_size):
+                chunk = account_ids[start:start + chunk_size]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(
+                    f"SELECT id, account_id, name, job, last_play FROM player WHERE account_id IN ({placeholders})",
+                    chunk
+                )
+                for character in cursor.fetchall():
+                    characters_by_account.setdefault(character["account_id"], []).append(character)
+        return characters_by_account, None
     except Exception as e:
-        return None, f"Error fetching accounts: {str(e)}"
+        logger.error("Error al obtener personajes: %s", e)
+        return None, str(e)
     finally:
-        if connection:
-            connection.close()
-
-def get_all_characters(account_id):
-    # Cambiar a la base de datos srv1_player para obtener los personajes
-    config = load_server_config()
-    config["database"] = "srv1_player"
-    connection = pymysql.connect(
-        host=config["host"],
-        user=config["user"],
-        password=config["password"],
-        database=config["database"],
-        port=config["port"],
-        cursorclass=pymysql.cursors.DictCursor
-    )
-    if connection:
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT id, name, job, last_play FROM player WHERE account_id = %s", (account_id,))
-                characters = cursor.fetchall()
-                return characters, None
-        except Exception as e:
-            print(f"Error al obtener personajes: {e}")
-            return None, str(e)
-        finally:
-            connection.close()
-    return None, "No se pudo conectar a la base de datos"
-
-def create_account(login, password):
+        connection.close()
+
+def hash_password(password):
+    """Devuelve la contraseña en el formato de Metin2: '*' + SHA1(SHA1(contraseña)) en hexadecimal mayúsculas."""
     # Generar hash SHA1 doble en mayúsculas
     first_sha1 = hashlib.sha1(password.encode()).digest()
     double_sha1 = hashlib.sha1(first_sha1).hexdigest().upper()
-    formatted_password = f"*{double_sha1}"
-
-    connection = connect_to_database()
-    if connection:
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute("INSERT INTO account (login, password, status) VALUES (%s, %s, %s)", (login, formatted_password, 'OK'))
-                connection.commit()
-                return True, None
-        except Exception as e:
-            print(f"Error al crear la cuenta: {e}")
-            return False, str(e)
-        finally:
-            connection.close()
-    return False, "No se pudo conectar a la base de datos"
-
-def get_server_statistics():
+    return f"*{double_sha1}"
+
+def create_account(login, password, realm=None):
+    formatted_password = hash_password(password)
+
+    connection, error = connect_to_database("account", realm)
+    if error:
+        return False, error
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO account (login, password, status) VALUES (%s, %s, %s)", (login, formatted_password, 'OK'))
+            connection.commit()
+            return True, None
+    except Exception as e:
+        logger.error("Error al crear la cuenta: %s", e)
+        return False, str(e)
+    finally:
+        connection.close()
+
+def get_server_statistics(realm=None):
+    """
+    Devuelve (estadísticas, error) usando los motores compartidos de una sola consulta.
+
+    Sin `realm` se suman las cifras de todos los reinos, consultados a la vez
+    (ver `backend.realms.get_statistics_all_realms`).
+    """
+    if realm is not None:
+        return get_statistics_engine(realm).refresh()
+    from backend.realms import get_statistics_all_realms
+    return get_statistics_all_realms()
+
+def like_pattern(text):
+    """Patrón LIKE que busca `text` como subcadena literal (escapa %, _ y \\)."""
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def search_accounts(term, limit=SEARCH_LIMIT, realm=None):
+    """
+    Busca en la base de datos cuentas cuyo login contenga `term` o cuyo id sea `term`.
+
+    :return: (cuentas, error)
+    """
+    term = term.strip()
+    connection, error = connect_to_database("account", realm)
+    if error:
+        return None, error
+
     try:
-        # Conectar a la base de datos srv1_account
-        connection_account, error_account = connect_to_database("srv1_account")
-        if error_account:
-            return None, error_account
-
-        # Obtener el total de cuentas creadas
-        with connection_account.cursor() as cursor:
-            cursor.execute("SELECT COUNT(*) AS total_accounts FROM account")
-            total_accounts = cursor.fetchone()['total_accounts']
-
-            # Obtener el total de cuentas creadas en los últimos 10 minutos
-            ten_minutes_ago = datetime.now() - timedelta(minutes=10)
-            cursor.execute("SELECT COUNT(*) AS accounts_created_last_10_min FROM account WHERE create_at >= %s", (ten_minutes_ago,))
-            accounts_created_last_10_min = cursor.fetchone()['accounts_created_last_10_min']
-
-        connection_account.close()
-
-        # Conectar a la base de datos srv1_player para obtener el total de personajes
-        connection_player, error_player = connect_to_database("srv1_player")
-        if error_player:
-            return None, error_player
-
-        with connection_player.cursor() as cursor:
-            cursor.execute("SELECT COUNT(*) AS total_characters FROM player")
-            total_characters = cursor.fetchone()['total_characters']
-
-        connection_player.close()
-
-        # Obtener el total de usuarios activos en los últimos 10 minutos
-        # Esto dependerá de cómo se está definiendo "usuario activo"
-        # Aquí voy a asumir que tenemos una columna `availDt` en la tabla `account`
-        connection_account, error_account = connect_to_database("srv1_account")
-        if error_account:
-            return None, error_account
-
-        with connection_account.cursor() as cursor:
-            cursor.execute("SELECT COUNT(*) AS active_users_last_10_min FROM account WHERE availDt >= %s", (ten_minutes_ago,))
-            active_users_last_10_min = cursor.fetchone()['active_users_last_10_min']
-
-        connection_account.close()
-
-        # Devolver los datos obtenidos
-        return {
-            "total_accounts": total_accounts,
-            "total_characters": total_characters,
-            "accounts_created_last_10_min": accounts_created_last_10_min,
-            "active_users_last_10_min": active_users_last_10_min
-        }, None
+        with connection.cursor() as cursor:
+            pattern = like_pattern(term)
+            account_id = int(term) if term.isdecimal() else -1
+            cursor.execute(
+                "SELECT id, login, status, create_time FROM account WHERE login LIKE %s OR id = %s ORDER BY id LIMIT %s",
+                (pattern, account_id, limit)
+            )
+            return cursor.fetchall(), None
+    except Exception as e:
+        logger.error("Error al buscar cuentas: %s", e)
+        return None, str(e)
+    finally:
+        connection.close()
+
+def find_characters(name, limit=SEARCH_LIMIT, realm=None):
+    """
+    Busca personajes cuyo nombre contenga `name`.
+
+    :return: (personajes, error)
+    """
+    connection, error = connect_to_database("player", realm)
+    if error:
+        return None, error
 
+    try:
+        with connection.cursor() as cursor:
+            pattern = like_pattern(name.strip())
+            cursor.execute(
+                "SELECT id, account_id, name, job, last_play FROM player WHERE name LIKE %s ORDER BY id LIMIT %s",
+                (pattern, limit)
+            )
+            return cursor.fetchall(), None
     except Exception as e:
+        logger.error("Error al buscar personajes: %s", e)
         return None, str(e)
+    finally:
+        connection.close()
+
+def update_account_status(account_id, new_status, realm=None):
+    connection, error = connect_to_database("account", realm)
+    if error:
+        logger.error("Error updating account status: %s", error)
+        return False
 
-def update_account_status(account_id, new_status):
-    connection = connect_to_database()
-    if connection:
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute("UPDATE account SET status = %s WHERE id = %s", (new_status, account_id))
-                connection.commit()
-                return True
-        except Exception as e:
-            print(f"Error updating account status: {e}")
-            return False
-        finally:
-            connection.close()
-    return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE account SET status = %s WHERE id = %s", (new_status, account_id))
+            connection.commit()
+            return True
+    except Exception as e:
+        logger.error("Error updating account status: %s", e)
+        return False
+    finally:
+        connection.close()
@@ -0,0 +1,246 @@
+# delta_patch.py
+"""
+Parches binarios entre dos versiones del ejecutable.
+
+Formato del parche (`.m2dp`): la cabecera MAGIC seguida de un flujo LZMA con
+
+    tamaño original (Q), tamaño nuevo (Q), SHA-256 original (32 bytes), SHA-256 nuevo (32 bytes)
+    operaciones hasta el final del flujo:
+        b"C" + posición (Q) + longitud (Q)  -> copiar bytes del archivo original
+        b"I" + longitud (Q) + datos         -> insertar bytes nuevos
+
+Uso desde la línea de comandos:
+
+    python -m backend.delta_patch create ANTIGUO NUEVO PARCHE [--from-version X] [--url URL]
+    python -m backend.delta_patch apply ANTIGUO PARCHE SALIDA
+"""
+import argparse
+import hashlib
+import json
+import lzma
+import os
+import struct
+import sys
+
+MAGIC = b"M2DP\x01"
+HEADER = struct.Struct("<QQ32s32s")
+COPY_OP = struct.Struct("<QQ")
+INSERT_OP = struct.Struct("<Q")
+# Tamaño de los bloques del archivo original que se indexan para buscar coincidencias
+BLOCK_SIZE = 32
+# Coincidencia mínima para que compense una operación de copia frente a insertar los bytes
+MIN_MATCH = 64
+# Bytes que se comparan de una vez al alargar una coincidencia
+EXTEND_STEP = 4096
+
+
+class PatchError(Exception):
+    """El parche no es válido o no corresponde al archivo original."""
+
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(1024 * 1024)
+            if not block:
+                break
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _match_length(old, old_pos, new, new_pos):
+    """Longitud de la coincidencia entre `old[old_pos:]` y `new[new_pos:]`."""
+    length = 0
+    limit = min(len(old) - old_pos, len(new) - new_pos)
+    # Primero por trozos grandes (comparación en C) y luego byte a byte
+    while length + EXTEND_STEP <= limit and \
+            old[old_pos + length:old_pos + length + EXTEND_STEP] == new[new_pos + length:new_pos + length + EXTEND_STEP]:
+        length += EXTEND_STEP
+    while length < limit and old[old_pos + length] == new[new_pos + length]:
+        length += 1
+    return length
+
+
+def diff(old, new):
+    """
+    Genera las operaciones que transforman `old` en `new`.
+
+    Los bloques alineados de `old` se indexan por contenido; `new` se recorre
+    buscando cada ventana de BLOCK_SIZE bytes en el índice y las coincidencias
+    se alargan hacia delante y hacia atrás. Genera ("C", posición, longitud) e
+    ("I", datos).
+    """
+    index = {}
+    for position in range(0, len(old) - BLOCK_SIZE + 1, BLOCK_SIZE):
+        index.setdefault(old[position:position + BLOCK_SIZE], position)
+
+    insert_start = 0
+    position = 0
+    end = len(new) - BLOCK_SIZE
+    lookup = index.get
+    while position <= end:
+        old_pos = lookup(new[position:position + BLOCK_SIZE])
+        if old_pos is None:
+            position += 1
+            continue
+
+        # Alargar hacia atrás sobre los bytes pendientes de insertar
+        back = 0
+        while position - back > insert_start and old_pos - back > 0 and \
+                old[old_pos - back - 1] == new[position - back - 1]:
+            back += 1
+        length = back + _match_length(old, old_pos, new, position)
+        if length < MIN_MATCH:
+            position += 1
+            continue
+
+        start = position - back
+        if start > insert_start:
+            yield "I", new[insert_start:start]
+        yield "C", old_pos - back, length
+        position = start + length
+        insert_start = position
+
+    if insert_start < len(new):
+        yield "I", new[insert_start:]
+
+
+def create_patch(old_path, new_path, patch_path):
+    """
+    Crea el parche que convierte `old_path` en `new_path`.
+
+    :return: Diccionario con los tamaños y hashes, útil para el manifiesto de actualización.
+    """
+    with open(old_path, 'rb') as f:
+        old = f.read()
+    with open(new_path, 'rb') as f:
+        new = f.read()
+    old_sha = hashlib.sha256(old).digest()
+    new_sha = hashlib.sha256(new).digest()
+
+    copied = inserted = 0
+    with open(patch_path, 'wb') as raw:
+        raw.write(MAGIC)
+        with lzma.open(raw, 'wb', preset=9 | lzma.PRESET_EXTREME) as out:
+            out.write(HEADER.pack(len(old), len(new), old_sha, new_sha))
+            for op in diff(old, new):
+                if op[0] == "C":
+                    out.write(b"C" + COPY_OP.pack(op[1], op[2]))
+                    copied += op[2]
+                else:
+                    out.write(b"I" + INSERT_OP.pack(len(op[1])))
+                    out.write(op[1])
+                    inserted += len(op[1])
+
+    return {
+        "from_size": len(old),
+        "from_sha256": old_sha.hex(),
+        "to_size": len(new),
+        "to_sha256": new_sha.hex(),
+        "copied": copied,
+        "inserted": inserted,
+        "size": os.path.getsize(patch_path),
+        "sha256": file_sha256(patch_path),
+    }
+
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise PatchError("El parche está incompleto")
+    return data
+
+
+def apply_patch(old_path, patch_path, output_path):
+    """
+    Aplica un parche y comprueba el resultado.
+
+    La salida se escribe en un archivo temporal y solo se mueve a
+    `output_path` si su SHA-256 coincide con el indicado en el parche.
+    :return: (ruta del archivo generado, error)
+    """
+    temp_path = output_path + ".patching"
+    try:
+        with open(patch_path, 'rb') as raw:
+            if raw.read(len(MAGIC)) != MAGIC:
+                raise PatchError("El archivo no es un parche válido")
+            with lzma.open(raw, 'rb') as patch, open(old_path, 'rb') as old, open(temp_path, 'wb') as out:
+                old_size, new_size, old_sha, new_sha = HEADER.unpack(_read_exact(patch, HEADER.size))
+                if os.path.getsize(old_path) != old_size or file_sha256(old_path) != old_sha.hex():
+                    raise PatchError("El parche no corresponde a la versión instalada")
+
+                hasher = hashlib.sha256()
+                while True:
+                    op = patch.read(1)
+                    if not op:
+                        break
+                    if op == b"C":
+                        position, length = COPY_OP.unpack(_read_exact(patch, COPY_OP.size))
+                        old.seek(position)
+                        while length:
+                            data = old.read(min(length, 1024 * 1024))
+                            if not data:
+                                raise PatchError("El parche copia fuera del archivo original")
+                            out.write(data)
+                            hasher.update(data)
+                            length -= len(data)
+                    elif op == b"I":
+                        length, = INSERT_OP.unpack(_read_exact(patch, INSERT_OP.size))
+                        data = _read_exact(patch, length)
+                        out.write(data)
+                        hasher.update(data)
+                    else:
+                        raise PatchError("Operación desconocida en el parche")
+
+                if out.tell() != new_size or hasher.digest() != new_sha:
+                    raise PatchError("El archivo generado no coincide con la versión esperada")
+        os.replace(temp_path, output_path)
+        return output_path, None
+    except (PatchError, OSError, EOFError, lzma.LZMAError, struct.error) as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return None, str(e)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.delta_patch",
+                                     description="Crea o aplica parches binarios entre versiones.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", help="Crea un parche")
+    create.add_argument("old")
+    create.add_argument("new")
+    create.add_argument("patch")
+    create.add_argument("--from-version", help="Versión de origen, para la entrada del manifiesto")
+    create.add_argument("--url", help="URL donde se publicará el parche, para la entrada del manifiesto")
+
+    apply = commands.add_parser("apply", help="Aplica un parche")
+    apply.add_argument("old")
+    apply.add_argument("patch")
+    apply.add_argument("output")
+
+    args = parser.parse_args(argv)
+    if args.command == "create":
+        info = create_patch(args.old, args.new, args.patch)
+        print(f"Parche creado: {info['size']} bytes ({info['size'] / max(info['to_size'], 1):.1%} del archivo nuevo)",
+              file=sys.stderr)
+        # Entrada lista para la lista "deltas" del manifiesto (version.txt)
+        print(json.dumps({
+            "from_version": args.from_version,
+            "from_sha256": info["from_sha256"],
+            "url": args.url,
+            "size": info["size"],
+            "sha256": info["sha256"],
+        }, indent=4))
+        return 0
+
+    _, error = apply_patch(args.old, args.patch, args.output)
+    if error:
+        print(f"Error al aplicar el parche: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
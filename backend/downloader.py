@@ -0,0 +1,195 @@
+# downloader.py
+import hashlib
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Tamaño de los bloques leídos del socket: se ajusta para que cada lectura dure unos TARGET_CHUNK_SECONDS
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+TARGET_CHUNK_SECONDS = 0.25
+# Intervalo mínimo entre dos avisos de progreso, en segundos
+PROGRESS_INTERVAL = 0.1
+# Reintentos tras un corte de conexión (se continúa desde lo ya descargado)
+MAX_RETRIES = 5
+RETRY_BACKOFF_SECONDS = 1.0
+REQUEST_TIMEOUT = 30
+# Extensión del archivo parcial que permite reanudar la descarga
+PARTIAL_SUFFIX = ".part"
+
+
+class DownloadCancelled(Exception):
+    """Se lanza internamente cuando se pide cancelar la descarga."""
+
+
+def _hash_existing(path, hasher):
+    """Añade al hash el contenido ya descargado del archivo parcial."""
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(1024 * 1024)
+            if not block:
+                break
+            hasher.update(block)
+
+
+def _parse_content_range(value):
+    """Devuelve (inicio, total) de una cabecera `Content-Range: bytes inicio-fin/total`."""
+    try:
+        _, _, spec = value.partition(" ")
+        byte_range, _, total = spec.partition("/")
+        start = None if byte_range == "*" else int(byte_range.split("-")[0])
+        return start, (None if total == "*" else int(total))
+    except (AttributeError, ValueError):
+        return None, None
+
+
+class Downloader(object):
+    """
+    Descarga un archivo por HTTP de forma reanudable y verificada.
+
+    Los datos se escriben en `<destino>.part`; si ese archivo ya existe la
+    descarga continúa desde su tamaño con una cabecera `Range` (y vuelve a
+    empezar si el servidor no la admite). El SHA-256 se calcula mientras se
+    descarga y el archivo solo se mueve a su destino si coincide. No depende
+    de Qt: el progreso se comunica con `progress_callback(descargado, total)`,
+    como mucho cada `progress_interval` segundos (total es 0 si el servidor no
+    indica el tamaño).
+    """
+
+    def __init__(self, session=None, timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES,
+                 retry_backoff=RETRY_BACKOFF_SECONDS, progress_interval=PROGRESS_INTERVAL,
+                 min_chunk_size=MIN_CHUNK_SIZE, max_chunk_size=MAX_CHUNK_SIZE):
+        if session is None:
+            import requests
+            session = requests.Session()
+        self.session = session
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.progress_interval = progress_interval
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+
+    def download(self, url, output_path, expected_sha256=None, progress_callback=None, should_cancel=None):
+        """
+        Descarga `url` en `output_path`.
+
+        :param expected_sha256: Hash esperado en hexadecimal; si no coincide se descarta la descarga.
+        :param progress_callback: Función opcional llamada con (bytes descargados, bytes totales o 0).
+        :param should_cancel: Función opcional; si devuelve True se detiene y se conserva el parcial.
+        :return: (ruta del archivo descargado, error)
+        """
+        part_path = output_path + PARTIAL_SUFFIX
+        state = {"offset": 0, "total": None, "hasher": hashlib.sha256(), "last_progress": 0.0}
+        if os.path.exists(part_path):
+            state["offset"] = os.path.getsize(part_path)
+            _hash_existing(part_path, state["hasher"])
+
+        attempt = 0
+        while True:
+            try:
+                if self._fetch(url, part_path, state, progress_callback, should_cancel):
+                    break
+                error = "La conexión se cerró antes de terminar la descarga"
+            except DownloadCancelled:
+                return None, "Descarga cancelada"
+            except Exception as e:
+                if getattr(e, "response", None) is not None and 400 <= e.response.status_code < 500:
+                    return None, f"Error al descargar {url}: {e}"
+                error = str(e)
+
+            attempt += 1
+            if attempt > self.max_retries:
+                return None, f"Error al descargar {url}: {error}"
+            logger.warning("Descarga interrumpida (%s); reintentando desde %d bytes", error, state["offset"])
+            time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+        if progress_callback is not None:
+            progress_callback(state["offset"], state["total"] or state["offset"])
+
+        digest = state["hasher"].hexdigest()
+        if expected_sha256 and digest != expected_sha256.lower():
+            os.remove(part_path)
+            return None, f"El SHA-256 del archivo descargado no coincide (esperado {expected_sha256}, obtenido {digest})"
+
+        os.replace(part_path, output_path)
+        return output_path, None
+
+    def _restart(self, part_path, state):
+        state["offset"] = 0
+        state["hasher"] = hashlib.sha256()
+        open(part_path, 'wb').close()
+
+    def _fetch(self, url, part_path, state, progress_callback, should_cancel):
+        """Hace una petición desde `state["offset"]`; devuelve True si el archivo quedó completo."""
+        # Sin compresión: los rangos y Content-Length deben referirse a los bytes del archivo
+        headers = {"Accept-Encoding": "identity"}
+        if state["offset"]:
+            headers["Range"] = f"bytes={state['offset']}-"
+        response = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+        try:
+            if state["offset"] and response.status_code == 416:
+                # Rango fuera del archivo: el parcial ya está completo o el archivo cambió
+                _, total = _parse_content_range(response.headers.get("Content-Range"))
+                if total == state["offset"]:
+                    state["total"] = total
+                    return True
+                self._restart(part_path, state)
+                return self._fetch(url, part_path, state, progress_callback, should_cancel)
+
+            response.raise_for_status()
+            if response.status_code == 206:
+                start, total = _parse_content_range(response.headers.get("Content-Range"))
+                if start != state["offset"]:
+                    self._restart(part_path, state)
+                    return self._fetch(url, part_path, state, progress_callback, should_cancel)
+                state["total"] = total
+            else:
+                if state["offset"]:
+                    # El servidor ignoró el rango y envía el archivo entero
+                    self._restart(part_path, state)
+                length = response.headers.get("Content-Length")
+                state["total"] = int(length) if length is not None else None
+
+            self._stream(response, part_path, state, progress_callback, should_cancel)
+        finally:
+            response.close()
+
+        # Sin tamaño conocido, el fin de la respuesta marca el final del archivo
+        return state["total"] is None or state["offset"] >= state["total"]
+
+    def _stream(self, response, part_path, state, progress_callback, should_cancel):
+        chunk_size = self.min_chunk_size
+        hasher = state["hasher"]
+        with open(part_path, 'ab') as f:
+            while True:
+                if should_cancel is not None and should_cancel():
+                    raise DownloadCancelled()
+
+                started = time.monotonic()
+                chunk = response.raw.read(chunk_size, decode_content=True)
+                if not chunk:
+                    break
+                elapsed = time.monotonic() - started
+
+                f.write(chunk)
+                hasher.update(chunk)
+                state["offset"] += len(chunk)
+
+                # Bloques más grandes si la red va rápida, más pequeños si va lenta
+                if elapsed < TARGET_CHUNK_SECONDS / 2 and len(chunk) == chunk_size:
+                    chunk_size = min(chunk_size * 2, self.max_chunk_size)
+                elif elapsed > TARGET_CHUNK_SECONDS * 2:
+                    chunk_size = max(chunk_size // 2, self.min_chunk_size)
+
+                now = time.monotonic()
+                if progress_callback is not None and now - state["last_progress"] >= self.progress_interval:
+                    state["last_progress"] = now
+                    progress_callback(state["offset"], state["total"] or 0)
+
+
+def download_file(url, output_path, expected_sha256=None, progress_callback=None, should_cancel=None, session=None):
+    """Atajo para descargar un archivo con las opciones por defecto; devuelve (ruta, error)."""
+    return Downloader(session=session).download(url, output_path, expected_sha256, progress_callback, should_cancel)
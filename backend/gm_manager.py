@@ -1,49 +1,36 @@
-import pymysql
+import csv
 import json
-import os
+import logging
+from backend.connection_pool import get_pool
 
-# Definir la ruta al archivo de configuración JSON
-CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'server_config.json')
+logger = logging.getLogger(__name__)
 
-# Función para cargar la configuración del servidor desde el archivo JSON
-def load_server_config():
-    """Carga la configuración del servidor desde el archivo JSON."""
-    try:
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error al cargar el archivo de configuración: {e}")
-        return None
+# Niveles de autoridad admitidos por la columna `gmlist.mAuthority`
+GM_AUTHORITY_LEVELS = ["IMPLEMENTOR", "HIGH_WIZARD", "GOD", "LOW_WIZARD", "PLAYER"]
 
 # Función para crear o actualizar GM en la base de datos
-def create_gm(account_name, character_name, authority_level):
+def create_gm(account_name, character_name, authority_level, realm=None):
     """
     Función para crear o actualizar un GM en la base de datos.
     
     :param account_name: Nombre de la cuenta del usuario
     :param character_name: Nombre del personaje
     :param authority_level: Nivel de autoridad que se le asignará
+    :param realm: Reino del GM (None para el reino activo)
+    :return: ("created" o "updated", error)
     """
-    # Cargar configuración desde el archivo JSON
-    config = load_server_config()
-    if config is None:
-        print("No se pudo cargar la configuración del servidor.")
-        return
-    
-    # Conectar a la base de datos común
-    connection = pymysql.connect(
-        host=config["host"],
-        user=config["user"],
-        password=config["password"],
-        database=config["db_common_name"],  # Usar la base de datos común
-        port=config["port"],
-        cursorclass=pymysql.cursors.DictCursor
-    )
+    # Obtener una conexión del pool de la base de datos común
+    try:
+        connection = get_pool("common", realm).get_connection()
+    except Exception as e:
+        logger.error("No se pudo conectar a la base de datos común: %s", e)
+        return None, f"No se pudo conectar a la base de datos común: {e}"
     
     try:
+        connection.begin()
         with connection.cursor() as cursor:
-            # Verificar si el personaje ya está en la tabla gmlist
-            cursor.execute("SELECT * FROM gmlist WHERE mAccount = %s", (account_name,))
+            # Verificar si el personaje ya está en la tabla gmlist (bloqueando la fila hasta el commit)
+            cursor.execute("SELECT mID FROM gmlist WHERE mAccount = %s FOR UPDATE", (account_name,))
             existing_gm = cursor.fetchone()
             
             if existing_gm:
@@ -52,19 +39,189 @@ def create_gm(account_name, character_name, authority_level):
                     "UPDATE gmlist SET mAuthority = %s WHERE mAccount = %s",
                     (authority_level, account_name)
                 )
+                action = "updated"
             else:
                 # Insertar un nuevo registro en gmlist si no existe
                 cursor.execute(
                     "INSERT INTO gmlist (mAccount, mName, mContactIP, mServerIP, mAuthority) VALUES (%s, %s, %s, %s, %s)",
                     (account_name, character_name, "ALL", "ALL", authority_level)
                 )
+                action = "created"
             
             # Guardar cambios
             connection.commit()
-            print(f"Personaje '{character_name}' actualizado como {authority_level} para la cuenta '{account_name}'")
+            logger.info("Personaje '%s' actualizado como %s para la cuenta '%s'", character_name, authority_level, account_name)
+            return action, None
     
     except Exception as e:
-        print(f"Error al actualizar la base de datos: {e}")
+        connection.rollback()
+        logger.error("Error al actualizar la base de datos: %s", e)
+        return None, str(e)
     
     finally:
-        connection.close()
\ No newline at end of file
+        connection.close()
+
+
+def get_gm_list(realm=None):
+    """Devuelve las filas de `gmlist` ordenadas por mID como (lista, error)."""
+    try:
+        with get_pool("common", realm).connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT mID, mAccount, mName, mContactIP, mServerIP, mAuthority FROM gmlist ORDER BY mID")
+                return cursor.fetchall(), None
+    except Exception as e:
+        logger.error("Error al leer la lista de GMs: %s", e)
+        return None, str(e)
+
+
+def delete_gm(gm_id, realm=None):
+    """Borra una fila de `gmlist` por su mID. :return: (filas borradas, error)"""
+    try:
+        with get_pool("common", realm).connection() as connection:
+            with connection.cursor() as cursor:
+                deleted = cursor.execute("DELETE FROM gmlist WHERE mID = %s", (gm_id,))
+        logger.info("GM con mID %s eliminado", gm_id)
+        return deleted, None
+    except Exception as e:
+        logger.error("Error al eliminar el GM: %s", e)
+        return None, str(e)
+
+
+def read_gm_roster_file(path):
+    """
+    Lee la lista de GMs deseada desde un archivo.
+
+    Admite JSON (lista de objetos) o CSV con cabecera `account,character,authority`.
+    :return: (lista de diccionarios con "account", "character" y "authority", error)
+    """
+    try:
+        if path.lower().endswith(".csv"):
+            with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                rows = list(csv.DictReader(f))
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                rows = json.load(f)
+    except Exception as e:
+        return None, f"No se pudo leer el archivo: {e}"
+
+    if not isinstance(rows, list):
+        return None, "El archivo debe contener una lista de GMs"
+    return validate_gm_entries(rows)
+
+
+def validate_gm_entries(rows):
+    """
+    Comprueba y normaliza una lista de GMs (objetos con "account", "character" y "authority").
+
+    :return: (lista de diccionarios con "account", "character" y "authority", error)
+    """
+    entries = []
+    seen = set()
+    for position, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            return None, f"Entrada {position}: se esperaba un objeto"
+        account = str(row.get("account") or "").strip()
+        character = str(row.get("character") or "").strip()
+        authority = str(row.get("authority") or "").strip().upper()
+        if not account or not character:
+            return None, f"Entrada {position}: faltan la cuenta o el personaje"
+        if authority not in GM_AUTHORITY_LEVELS:
+            return None, f"Entrada {position}: nivel de autoridad no válido: {authority}"
+        key = (account.lower(), character.lower())
+        if key in seen:
+            return None, f"Entrada {position}: {account}/{character} está repetido"
+        seen.add(key)
+        entries.append({"account": account, "character": character, "authority": authority})
+    return entries, None
+
+
+def plan_gm_roster_sync(current_rows, entries, remove_missing=False):
+    """
+    Compara la tabla `gmlist` con la lista deseada.
+
+    :param current_rows: Filas de gmlist con mID, mAccount, mName y mAuthority.
+    :param entries: Lista deseada, como la devuelve `read_gm_roster_file`.
+    :param remove_missing: Si es True, los GMs que no están en la lista (y las filas repetidas) se borran.
+    :return: {"insert": [entradas], "update": [(mID, entrada)], "delete": [filas], "unchanged": n}
+    """
+    current = {}
+    duplicates = []
+    for row in current_rows:
+        # mAccount y mName admiten NULL en algunos esquemas
+        key = ((row["mAccount"] or "").lower(), (row["mName"] or "").lower())
+        if key in current:
+            # gmlist no tiene clave única: las filas repetidas sobran
+            duplicates.append(row)
+        else:
+            current[key] = row
+
+    plan = {"insert": [], "update": [], "delete": [], "unchanged": 0}
+    for entry in entries:
+        row = current.pop((entry["account"].lower(), entry["character"].lower()), None)
+        if row is None:
+            plan["insert"].append(entry)
+        elif row["mAuthority"] != entry["authority"]:
+            plan["update"].append((row["mID"], entry))
+        else:
+            plan["unchanged"] += 1
+
+    if remove_missing:
+        plan["delete"] = list(current.values()) + duplicates
+    return plan
+
+
+def sync_gm_roster(entries, remove_missing=False, dry_run=False, realm=None):
+    """
+    Sincroniza la tabla `gmlist` con una lista de GMs en una sola transacción.
+
+    La tabla se lee una vez (bloqueando sus filas) y solo se aplican las
+    diferencias: inserciones y actualizaciones con `executemany` y los
+    borrados con un único `DELETE ... IN`.
+
+    :param entries: Lista de diccionarios con "account", "character" y "authority".
+    :param remove_missing: Si es True, se borran los GMs que no están en la lista; por defecto
+        solo se añaden y actualizan los de la lista, para que una lista parcial no borre al resto.
+    :param dry_run: Si es True, solo se calcula el plan sin modificar la tabla.
+    :param realm: Reino de la tabla (None para el reino activo).
+    :return: (plan de cambios como lo devuelve `plan_gm_roster_sync`, error)
+    """
+    try:
+        connection = get_pool("common", realm).get_connection()
+    except Exception as e:
+        return None, f"No se pudo conectar a la base de datos común: {e}"
+
+    try:
+        connection.begin()
+        with connection.cursor() as cursor:
+            lock = "" if dry_run else " FOR UPDATE"
+            cursor.execute(f"SELECT mID, mAccount, mName, mAuthority FROM gmlist ORDER BY mID{lock}")
+            plan = plan_gm_roster_sync(cursor.fetchall(), entries, remove_missing)
+
+            if dry_run:
+                connection.rollback()
+                return plan, None
+
+            if plan["insert"]:
+                cursor.executemany(
+                    "INSERT INTO gmlist (mAccount, mName, mContactIP, mServerIP, mAuthority) VALUES (%s, %s, %s, %s, %s)",
+                    [(entry["account"], entry["character"], "ALL", "ALL", entry["authority"]) for entry in plan["insert"]]
+                )
+            if plan["update"]:
+                cursor.executemany(
+                    "UPDATE gmlist SET mAuthority = %s WHERE mID = %s",
+                    [(entry["authority"], gm_id) for gm_id, entry in plan["update"]]
+                )
+            if plan["delete"]:
+                ids = [row["mID"] for row in plan["delete"]]
+                placeholders = ", ".join(["%s"] * len(ids))
+                cursor.execute(f"DELETE FROM gmlist WHERE mID IN ({placeholders})", ids)
+        connection.commit()
+    except Exception as e:
+        connection.rollback()
+        return None, str(e)
+    finally:
+        connection.close()
+
+    logger.info("Lista de GMs sincronizada: %d añadidos, %d actualizados, %d eliminados, %d sin cambios",
+                len(plan['insert']), len(plan['update']), len(plan['delete']), plan['unchanged'])
+    return plan, None
@@ -0,0 +1,290 @@
+# query_metrics.py
+import bisect
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from backend.server_config import load_server_config, get_config_service
+
+logger = logging.getLogger(__name__)
+
+# Consultas más lentas que esto (en milisegundos) se guardan en el registro de consultas lentas
+DEFAULT_SLOW_QUERY_THRESHOLD_MS = 500
+# Entradas que conserva el registro de consultas lentas
+SLOW_LOG_SIZE = 200
+# Las consultas más largas que esto (INSERT de muchas filas) se normalizan sin pasar por la caché
+NORMALIZE_CACHE_MAX_CHARS = 4096
+# Límites de los cubos del histograma: escala logarítmica de 0,1 ms a ~2 min (cada cubo un 20 % más ancho)
+HISTOGRAM_BOUNDS = [0.0001 * 1.2 ** i for i in range(78)]
+PERCENTILES = (50, 95, 99)
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROW_LIST = re.compile(r"(\((?:\?|\?, \.\.\.)\))(?:\s*,\s*\1)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    """
+    Devuelve la "forma" de una consulta: sin valores concretos ni espacios de más.
+
+    `SELECT ... WHERE id IN (%s, %s, %s)` y la misma consulta con otro número
+    de ids comparten forma, así que sus tiempos se acumulan juntos. Lo mismo
+    pasa con un `INSERT ... VALUES (...), (...)` de cualquier número de filas,
+    como los que genera `executemany`.
+    """
+    if len(query) > NORMALIZE_CACHE_MAX_CHARS:
+        # No guardar en la caché INSERT de varios megas que no se van a repetir
+        return _normalize_query(query)
+    return _normalize_query_cached(query)
+
+
+def _normalize_query(query):
+    if isinstance(query, bytes):
+        query = query.decode(errors="replace")
+    shape = _STRING_LITERAL.sub("?", query)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _WHITESPACE.sub(" ", shape)
+    shape = _IN_LIST.sub("(?, ...)", shape)
+    shape = _ROW_LIST.sub(r"\1", shape)
+    return shape.strip()
+
+
+_normalize_query_cached = lru_cache(maxsize=1024)(_normalize_query)
+
+
+class LatencyHistogram(object):
+    """Histograma de latencias en cubos de escala logarítmica; los percentiles son aproximados (±10 %)."""
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(HISTOGRAM_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, percent):
+        """Latencia (segundos) por debajo de la que queda el `percent` % de las muestras."""
+        if not self.count:
+            return None
+        target = self.count * percent / 100.0
+        seen = 0
+        for position, count in enumerate(self.counts):
+            if count and seen + count >= target:
+                lower = HISTOGRAM_BOUNDS[position - 1] if position else 0.0
+                upper = HISTOGRAM_BOUNDS[position] if position < len(HISTOGRAM_BOUNDS) else self.max
+                # Interpolar dentro del cubo, sin salirse de los valores realmente vistos
+                value = lower + (upper - lower) * (target - seen) / count
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+    def summary(self):
+        result = {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else None,
+            "min_ms": self.min * 1000 if self.min is not None else None,
+            "max_ms": self.max * 1000 if self.max is not None else None,
+        }
+        for percent in PERCENTILES:
+            value = self.percentile(percent)
+            result[f"p{percent}_ms"] = value * 1000 if value is not None else None
+        return result
+
+
+class QueryMetrics(object):
+    """
+    Métricas de las consultas SQL del backend.
+
+    Por cada forma de consulta (ver `normalize_query`) se acumulan un
+    histograma de latencias, las filas devueltas o afectadas y los errores;
+    por cada base de datos, el tiempo de espera para obtener una conexión del
+    pool. Las consultas que superan `slow_threshold` segundos se guardan, solo
+    con su forma, en un registro acotado y se escriben en el log.
+    """
+
+    def __init__(self, slow_threshold=DEFAULT_SLOW_QUERY_THRESHOLD_MS / 1000.0, slow_log_size=SLOW_LOG_SIZE):
+        self.slow_threshold = slow_threshold
+        self._lock = threading.Lock()
+        self._queries = {}      # forma -> {"histogram", "rows", "errors", "last_error"}
+        self._waits = {}        # base de datos -> histograma
+        self._slow_log = deque(maxlen=slow_log_size)
+        self._started = time.time()
+
+    def record_query(self, query, seconds, rows=None, error=None, database=None):
+        shape = normalize_query(query)
+        with self._lock:
+            stats = self._queries.get(shape)
+            if stats is None:
+                stats = self._queries[shape] = {"histogram": LatencyHistogram(), "rows": 0,
+                                                "errors": 0, "last_error": None}
+            stats["histogram"].add(seconds)
+            if rows is not None and rows >= 0:
+                stats["rows"] += rows
+            if error is not None:
+                stats["errors"] += 1
+                stats["last_error"] = str(error)
+
+        if seconds >= self.slow_threshold:
+            # Solo la forma: la consulta completa puede llevar logins y hashes de contraseñas
+            entry = {
+                "time": time.time(),
+                "database": database,
+                "shape": shape,
+                "ms": seconds * 1000,
+                "rows": rows,
+                "error": str(error) if error is not None else None,
+            }
+            with self._lock:
+                self._slow_log.append(entry)
+            logger.warning("Consulta lenta (%.0f ms) en %s: %s", entry["ms"], database, shape)
+
+    def record_wait(self, database, seconds):
+        with self._lock:
+            histogram = self._waits.get(database)
+            if histogram is None:
+                histogram = self._waits[database] = LatencyHistogram()
+            histogram.add(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._queries.clear()
+            self._waits.clear()
+            self._slow_log.clear()
+            self._started = time.time()
+
+    def snapshot(self):
+        """Copia de las métricas actuales, con las consultas ordenadas por tiempo total."""
+        with self._lock:
+            queries = []
+            for shape, stats in self._queries.items():
+                summary = stats["histogram"].summary()
+                summary.update(shape=shape, rows=stats["rows"], errors=stats["errors"],
+                               last_error=stats["last_error"], total_ms=stats["histogram"].total * 1000)
+                queries.append(summary)
+            waits = {database: histogram.summary() for database, histogram in self._waits.items()}
+            slow_log = list(self._slow_log)
+            started = self._started
+
+        queries.sort(key=lambda summary: summary["total_ms"], reverse=True)
+        return {
+            "since": started,
+            "slow_threshold_ms": self.slow_threshold * 1000,
+            "queries": queries,
+            "connection_wait": waits,
+            "slow_queries": slow_log,
+        }
+
+    def export_json(self):
+        return json.dumps(self.snapshot(), indent=2, ensure_ascii=False, default=str)
+
+    def export_text(self):
+        snapshot = self.snapshot()
+
+        def ms(value):
+            return "-" if value is None else f"{value:.1f}"
+
+        lines = [
+            f"Métricas de consultas desde {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snapshot['since']))}",
+            "",
+            f"{'Llamadas':>9} {'Errores':>8} {'Filas':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'Máx ms':>9}  Consulta",
+        ]
+        for query in snapshot["queries"]:
+            lines.append(
+                f"{query['count']:>9} {query['errors']:>8} {query['rows']:>9} {ms(query['p50_ms']):>9} "
+                f"{ms(query['p95_ms']):>9} {ms(query['p99_ms']):>9} {ms(query['max_ms']):>9}  {query['shape']}"
+            )
+
+        lines += ["", "Espera de conexión del pool:"]
+        for database, wait in sorted(snapshot["connection_wait"].items(), key=lambda item: str(item[0])):
+            lines.append(f"  {database}: {wait['count']} esperas, p50 {ms(wait['p50_ms'])} ms, "
+                         f"p95 {ms(wait['p95_ms'])} ms, p99 {ms(wait['p99_ms'])} ms, máx {ms(wait['max_ms'])} ms")
+
+        lines += ["", f"Consultas lentas (más de {snapshot['slow_threshold_ms']:.0f} ms):"]
+        for entry in snapshot["slow_queries"]:
+            when = time.strftime('%H:%M:%S', time.localtime(entry["time"]))
+            lines.append(f"  {when} {entry['ms']:.0f} ms [{entry['database']}] {entry['shape']}")
+        return "\n".join(lines) + "\n"
+
+
+def _threshold_from_config(config):
+    return (config or {}).get("slow_query_threshold_ms", DEFAULT_SLOW_QUERY_THRESHOLD_MS) / 1000.0
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_query_metrics():
+    """Devuelve las métricas compartidas por todos los pools de conexiones."""
+    global _metrics
+    if _metrics is None:
+        threshold = _threshold_from_config(load_server_config())
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = QueryMetrics(slow_threshold=threshold)
+    return _metrics
+
+
+def _on_config_changed(config, previous):
+    if _metrics is not None:
+        _metrics.slow_threshold = _threshold_from_config(config)
+
+
+get_config_service().subscribe(_on_config_changed)
+
+
+_cursor_classes = {}
+
+
+def connection_label(connection):
+    """Servidor y base de datos de una conexión de pymysql, para identificar sus métricas."""
+    database = getattr(connection, "db", None)
+    if isinstance(database, bytes):
+        database = database.decode(errors="replace")
+    return f"{getattr(connection, 'host', '?')}/{database}"
+
+
+def instrumented_cursor_class(base):
+    """
+    Devuelve una subclase del cursor de pymysql `base` que mide cada sentencia.
+
+    `executemany` queda cubierto porque pymysql lo resuelve con `execute`.
+    Con cursores sin buffer el tiempo medido es hasta la primera fila y no se
+    conocen las filas devueltas.
+    """
+    cursor_class = _cursor_classes.get(base)
+    if cursor_class is not None:
+        return cursor_class
+
+    class InstrumentedCursor(base):
+        def execute(self, query, args=None):
+            started = time.perf_counter()
+            try:
+                result = super(InstrumentedCursor, self).execute(query, args)
+            except Exception as e:
+                get_query_metrics().record_query(query, time.perf_counter() - started, error=e,
+                                                 database=connection_label(self.connection))
+                raise
+            # Los cursores sin buffer no conocen el número de filas (rowcount vale 2**64 - 1)
+            rows = self.rowcount if isinstance(self.rowcount, int) and self.rowcount < 2 ** 63 else None
+            get_query_metrics().record_query(query, time.perf_counter() - started, rows=rows,
+                                             database=connection_label(self.connection))
+            return result
+
+    InstrumentedCursor.__name__ = "Instrumented" + base.__name__
+    _cursor_classes[base] = InstrumentedCursor
+    return InstrumentedCursor
@@ -0,0 +1,139 @@
+# realms.py
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from backend.connection_pool import get_realm_names
+from backend.database import search_accounts, find_characters, SEARCH_LIMIT
+from backend.statistics_engine import get_statistics_engine
+
+# Hilos para consultar varios reinos a la vez; cada reino usa sus propios pools de conexiones
+DEFAULT_MAX_WORKERS = 8
+# Cifras que se suman al agregar las estadísticas de todos los reinos
+SUMMED_STATISTICS = (
+    "total_accounts",
+    "total_characters",
+    "accounts_created_last_10_min",
+    "active_users_last_10_min",
+    "online_characters",
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="realm")
+        return _executor
+
+
+def fan_out(function, *args, realms=None, **kwargs):
+    """
+    Llama a `function(*args, realm=reino, **kwargs)` en todos los reinos a la vez.
+
+    `function` debe devolver (resultado, error), como las funciones de
+    `backend.database`. Genera (reino, resultado, error) según va terminando
+    cada reino, así que el tiempo total es el del reino más lento y no la suma.
+    """
+    realms = realms or get_realm_names()
+    executor = _get_executor()
+    futures = {executor.submit(function, *args, realm=realm, **kwargs): realm for realm in realms}
+    for future in as_completed(futures):
+        realm = futures[future]
+        try:
+            result, error = future.result()
+        except Exception as e:
+            result, error = None, str(e)
+        yield realm, result, error
+
+
+def _format_errors(errors):
+    return "; ".join(f"{realm}: {error}" for realm, error in errors.items())
+
+
+def _merge_rows(function, *args, realms=None, on_partial=None, **kwargs):
+    """
+    Une las filas de todos los reinos añadiendo a cada una la clave "realm".
+
+    :param on_partial: Función opcional llamada con (reino, filas) en cuanto responde cada reino.
+    :return: ((filas, errores por reino), error). Solo hay error si fallan todos los reinos.
+    """
+    realms = realms or get_realm_names()
+    order = {realm: position for position, realm in enumerate(realms)}
+    rows = []
+    errors = {}
+    for realm, result, error in fan_out(function, *args, realms=realms, **kwargs):
+        if error:
+            errors[realm] = error
+            continue
+        tagged = [dict(row, realm=realm) for row in result]
+        rows.extend(tagged)
+        if on_partial is not None:
+            on_partial(realm, tagged)
+
+    if len(errors) == len(realms):
+        return None, _format_errors(errors)
+    # El orden final no depende de qué reino respondió antes
+    rows.sort(key=lambda row: (order[row["realm"]], row["id"]))
+    return (rows, errors), None
+
+
+def search_accounts_all_realms(term, limit=SEARCH_LIMIT, realms=None, on_partial=None):
+    """
+    Busca cuentas por login o id en todos los reinos a la vez.
+
+    :return: ({"accounts": cuentas con "realm", "errors": {reino: error}}, error)
+    """
+    result, error = _merge_rows(search_accounts, term, limit=limit, realms=realms, on_partial=on_partial)
+    if error:
+        return None, error
+    accounts, errors = result
+    return {"accounts": accounts, "errors": errors}, None
+
+
+def find_characters_all_realms(name, limit=SEARCH_LIMIT, realms=None, on_partial=None):
+    """
+    Busca personajes por nombre en todos los reinos a la vez.
+
+    :return: ({"characters": personajes con "realm", "errors": {reino: error}}, error)
+    """
+    result, error = _merge_rows(find_characters, name, limit=limit, realms=realms, on_partial=on_partial)
+    if error:
+        return None, error
+    characters, errors = result
+    return {"characters": characters, "errors": errors}, None
+
+
+def _realm_statistics(realm):
+    return get_statistics_engine(realm).refresh()
+
+
+def get_statistics_all_realms(realms=None, on_partial=None):
+    """
+    Refresca las estadísticas de todos los reinos a la vez y las suma.
+
+    El resultado tiene las mismas claves que las estadísticas de un reino y,
+    además, "realms" ({reino: estadísticas}) y "realm_errors" ({reino: error})
+    con los reinos que no respondieron. Solo hay error si fallan todos.
+    :param on_partial: Función opcional llamada con (reino, estadísticas) en cuanto responde cada reino.
+    :return: (estadísticas, error)
+    """
+    realms = realms or get_realm_names()
+    per_realm = {}
+    errors = {}
+    for realm, stats, error in fan_out(_realm_statistics, realms=realms):
+        if error:
+            errors[realm] = error
+            continue
+        per_realm[realm] = stats
+        if on_partial is not None:
+            on_partial(realm, stats)
+
+    if not per_realm:
+        return None, _format_errors(errors)
+
+    totals = {key: sum(stats[key] for stats in per_realm.values()) for key in SUMMED_STATISTICS}
+    totals["realms"] = {realm: per_realm[realm] for realm in realms if realm in per_realm}
+    totals["realm_errors"] = errors
+    return totals, None
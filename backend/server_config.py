@@ -1,37 +1,173 @@
 # server_config.py
+import copy
 import json
 import os
+import threading
 
 # Ruta al archivo de configuración del servidor de Metin2
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), '..', 'config', 'server_config.json')
 
-def load_server_config():
-    """Carga la configuración del servidor desde el archivo de configuración."""
-    if os.path.exists(CONFIG_FILE):
+# Nombre del reino cuando la configuración no define una lista "realms"
+DEFAULT_REALM_NAME = "default"
+# Claves que cada reino puede definir; las que omita se toman del nivel superior de la configuración
+REALM_KEYS = ("host", "port", "user", "password", "db_account_name", "db_common_name", "db_player_name")
+
+# Valores que se usan si todavía no existe el archivo de configuración
+DEFAULT_CONFIG = {
+    "host": "127.0.0.1",      # Dirección IP del servidor
+    "port": 3306,             # Puerto de conexión (ej. para MySQL)
+    "user": "admin",          # Usuario para la base de datos
+    "password": "password",   # Contraseña de la base de datos
+    "db_account_name": "account",  # Nombre de la base de datos de cuentas
+    "db_common_name": "common",    # Nombre de la base de datos común
+    "db_player_name": "player",    # Nombre de la base de datos de jugadores
+    "theme": "light",         # Tema de la aplicación, 'light' o 'dark'
+    "language": "es"          # Idioma de la aplicación, 'es' o 'en'
+}
+
+
+class ConfigService(object):
+    """
+    Punto único de acceso a 'server_config.json'.
+
+    El archivo se analiza una vez y se guarda en memoria; cada lectura solo
+    comprueba la fecha de modificación y el tamaño del archivo (un `stat`) y
+    vuelve a leerlo si han cambiado. Cuando el contenido cambia, ya sea por
+    `save()` o porque se editó a mano, se avisa a los suscriptores con
+    `callback(nueva configuración, configuración anterior)`.
+    """
+
+    def __init__(self, path=CONFIG_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._config = None
+        self._signature = None
+        self._subscribers = []
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self, signature):
+        if signature is None:
+            return copy.deepcopy(DEFAULT_CONFIG)
         try:
-            with open(CONFIG_FILE, 'r') as f:
+            with open(self.path, 'r') as f:
                 return json.load(f)
         except Exception as e:
             print(f"Error al cargar el archivo de configuración: {e}")
             return None
-    else:
-        # Si no existe el archivo de configuración, devuelve valores predeterminados
-        return {
-            "host": "127.0.0.1",      # Dirección IP del servidor
-            "port": 3306,             # Puerto de conexión (ej. para MySQL)
-            "user": "admin",          # Usuario para la base de datos
-            "password": "password",   # Contraseña de la base de datos
-            "db_account_name": "account",  # Nombre de la base de datos de cuentas
-            "db_common_name": "common",    # Nombre de la base de datos común
-            "db_player_name": "player",    # Nombre de la base de datos de jugadores
-            "theme": "light",         # Tema de la aplicación, 'light' o 'dark'
-            "language": "es"          # Idioma de la aplicación, 'es' o 'en'
-        }
+
+    def refresh(self):
+        """
+        Comprueba si el archivo cambió y, en ese caso, lo vuelve a leer y avisa a los suscriptores.
+
+        Es barato (un `stat` si no hay cambios), así que se puede llamar en cada uso.
+        :return: True si la configuración cambió.
+        """
+        signature = self._file_signature()
+        with self._lock:
+            if signature == self._signature and (self._config is not None or signature is not None):
+                return False
+            previous = self._config
+            self._config = self._load(signature)
+            self._signature = signature
+            current = self._config
+        if previous is not None and current is not None and current != previous:
+            self._notify(current, previous)
+            return True
+        return False
+
+    def get(self):
+        """
+        Devuelve una copia de la configuración actual (None si el archivo no es válido).
+
+        Los cambios en la copia no afectan a la configuración; para guardarlos se usa `save()`.
+        """
+        self.refresh()
+        with self._lock:
+            return copy.deepcopy(self._config)
+
+    def save(self, config):
+        """Guarda la configuración en el archivo y avisa a los suscriptores si ha cambiado."""
+        temp_path = self.path + ".tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Escribir en un archivo temporal y sustituir: nadie lee un JSON a medio escribir
+            with open(temp_path, 'w') as f:
+                json.dump(config, f, indent=4)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Error al guardar el archivo de configuración: {e}")
+            return False
+
+        with self._lock:
+            previous = self._config
+            self._config = copy.deepcopy(config)
+            self._signature = self._file_signature()
+        if previous is not None and previous != config:
+            self._notify(copy.deepcopy(config), previous)
+        return True
+
+    def subscribe(self, callback):
+        """Registra `callback(nueva, anterior)`; se llama en el hilo que detecta el cambio."""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _notify(self, config, previous):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(copy.deepcopy(config), copy.deepcopy(previous))
+            except Exception as e:
+                print(f"Error al aplicar la nueva configuración: {e}")
+
+
+_service = ConfigService()
+
+
+def get_config_service():
+    """Devuelve el servicio de configuración compartido."""
+    return _service
+
+
+def load_server_config():
+    """Carga la configuración del servidor desde el archivo de configuración."""
+    return _service.get()
+
 
 def save_server_config(config):
     """Guarda la configuración actual en el archivo de configuración."""
-    try:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4)
-    except Exception as e:
-        print(f"Error al guardar el archivo de configuración: {e}")
\ No newline at end of file
+    _service.save(config)
+
+
+def get_realms(config):
+    """
+    Devuelve la configuración de conexión de cada reino.
+
+    Con una lista "realms" en la configuración, por ejemplo
+
+        "realms": [{"name": "srv1", "host": "10.0.0.1"}, {"name": "srv2", "host": "10.0.0.2"}]
+
+    cada reino hereda del nivel superior las claves que no indique. Sin ella hay
+    un único reino con los datos del nivel superior. Cada elemento es un
+    diccionario con "name" y las claves de REALM_KEYS.
+    """
+    realms = []
+    for position, entry in enumerate(config.get("realms") or [{"name": DEFAULT_REALM_NAME}]):
+        realm = {key: entry.get(key, config.get(key)) for key in REALM_KEYS}
+        realm["name"] = str(entry.get("name") or f"realm{position + 1}")
+        realms.append(realm)
+    return realms
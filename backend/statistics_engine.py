@@ -0,0 +1,237 @@
+# statistics_engine.py
+import logging
+import threading
+import time
+from datetime import timedelta
+from backend.server_config import load_server_config, get_config_service
+from backend.connection_pool import get_pool, resolve_database_name, connection_settings_changed, \
+    get_realm_config, get_active_realm
+
+logger = logging.getLogger(__name__)
+
+# Ventana de "actividad reciente" que muestra el panel de estadísticas
+DEFAULT_WINDOW_MINUTES = 10
+# Un personaje cuenta como "en línea" si jugó en estos últimos minutos (debe ser <= la ventana)
+DEFAULT_ONLINE_MINUTES = 5
+# Cada cuánto se vuelven a contar las tablas completas para reflejar filas borradas
+DEFAULT_FULL_RESYNC_SECONDS = 3600
+# Margen de seguridad al usar un punto de control como límite inferior de `create_time`
+CHECKPOINT_MARGIN = timedelta(minutes=1)
+# Índice que necesita la actividad reciente para no recorrer toda la tabla `player` en cada refresco
+LAST_PLAY_INDEX_DDL = "ALTER TABLE player ADD INDEX last_play_idx (last_play)"
+
+
+def quote_identifier(name):
+    """Escapa un nombre de base de datos o tabla para usarlo entre comillas invertidas."""
+    return "`" + str(name).replace("`", "``") + "`"
+
+
+class StatisticsEngine(object):
+    """
+    Calcula las estadísticas del servidor con una sola consulta por refresco.
+
+    Los totales de cuentas y personajes se mantienen entre refrescos: solo se
+    cuentan las filas con `id` mayor que el último máximo visto (marca de agua),
+    que es un recorrido corto sobre la clave primaria. Para las cuentas creadas
+    en la ventana reciente se guardan puntos de control (hora del servidor, id
+    máximo): las cuentas con id menor que el de un punto anterior a la ventana
+    no pueden estar dentro de ella, así que la consulta empieza a partir de ese id.
+
+    La actividad reciente (usuarios activos y personajes en línea) se filtra
+    por `player.last_play`, que cambia en filas antiguas y no admite marca de
+    agua por id. Con un índice sobre `last_play` (ver LAST_PLAY_INDEX_DDL) es
+    un recorrido del rango de la ventana y se calcula en cada refresco; sin él,
+    sería un recorrido completo de `player`, así que solo se calcula en la
+    resincronización completa y entre medias se devuelven los últimos valores.
+    """
+
+    def __init__(self, realm=None, window_minutes=DEFAULT_WINDOW_MINUTES, online_minutes=DEFAULT_ONLINE_MINUTES,
+                 full_resync_seconds=DEFAULT_FULL_RESYNC_SECONDS):
+        self.realm = realm
+        self.window_minutes = window_minutes
+        self.online_minutes = online_minutes
+        self.full_resync_seconds = full_resync_seconds
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Descarta los contadores; el siguiente refresco cuenta las tablas completas."""
+        self._total_accounts = 0
+        self._account_high_water = 0
+        self._total_characters = 0
+        self._player_high_water = 0
+        self._checkpoints = []  # Lista de (hora del servidor, id máximo de cuenta), de más antiguo a más reciente
+        self._last_play_indexed = None  # Se comprueba en cada resincronización completa
+        self._recent_activity = (0, 0)  # (usuarios activos, personajes en línea) del último cálculo
+        self._last_db_now = None
+        self._last_refresh = None
+        self._last_full_sync = None
+
+    def request_full_resync(self):
+        """Hace que el siguiente refresco vuelva a contar las tablas completas."""
+        self._last_full_sync = None
+
+    def _recent_account_floor(self):
+        """Id a partir del cual puede haber cuentas creadas dentro de la ventana reciente."""
+        if self._last_db_now is None:
+            return 0
+
+        estimated_now = self._last_db_now + timedelta(seconds=time.monotonic() - self._last_refresh)
+        safe_cutoff = estimated_now - timedelta(minutes=self.window_minutes) - CHECKPOINT_MARGIN
+
+        floor = 0
+        keep_from = 0
+        for position, (checkpoint_time, max_id) in enumerate(self._checkpoints):
+            if checkpoint_time < safe_cutoff:
+                floor = max_id
+                keep_from = position
+        # Los puntos anteriores al elegido ya no se necesitarán
+        del self._checkpoints[:keep_from]
+        return floor
+
+    def _build_query(self, config, full_sync, include_recent):
+        """
+        Consulta del refresco. `full_sync` añade la comprobación del índice de
+        `last_play`; `include_recent`, la subconsulta de actividad reciente.
+        """
+        account_table = quote_identifier(resolve_database_name("account", config)) + ".account"
+        player_table = quote_identifier(resolve_database_name("player", config)) + ".player"
+        if full_sync:
+            index_check = """(SELECT COUNT(*) > 0 FROM information_schema.STATISTICS
+                    WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'player'
+                      AND COLUMN_NAME = 'last_play' AND SEQ_IN_INDEX = 1)"""
+        else:
+            index_check = "NULL"
+        if include_recent:
+            recent_columns = "r.active_users_recent, r.online_characters,"
+            recent_join = f"""
+            CROSS JOIN
+                (SELECT COUNT(DISTINCT account_id) AS active_users_recent,
+                        COALESCE(SUM(last_play >= NOW() - INTERVAL %s MINUTE), 0) AS online_characters
+                    FROM {player_table} WHERE last_play >= NOW() - INTERVAL %s MINUTE) AS r"""
+        else:
+            recent_columns = "NULL AS active_users_recent, NULL AS online_characters,"
+            recent_join = ""
+        # Una sola sentencia: todas las cifras salen de la misma instantánea de lectura
+        return f"""
+            SELECT
+                NOW() AS db_now,
+                a.new_accounts,
+                a.max_account_id,
+                p.new_characters,
+                p.max_player_id,
+                {recent_columns}
+                {index_check} AS last_play_indexed,
+                (SELECT COUNT(*) FROM {account_table}
+                    WHERE id > %s AND create_time >= NOW() - INTERVAL %s MINUTE) AS accounts_created_recent
+            FROM
+                (SELECT COUNT(*) AS new_accounts, MAX(id) AS max_account_id
+                    FROM {account_table} WHERE id > %s) AS a
+            CROSS JOIN
+                (SELECT COUNT(*) AS new_characters, MAX(id) AS max_player_id
+                    FROM {player_table} WHERE id > %s) AS p{recent_join}
+        """
+
+    def refresh(self):
+        """
+        Obtiene las estadísticas actuales.
+
+        :return: (estadísticas, error), con las mismas claves que usaba `get_server_statistics`.
+        """
+        config = load_server_config()
+        if config is None:
+            return None, "No se pudo cargar la configuración del servidor."
+        try:
+            realm_config = get_realm_config(self.realm, config)
+        except Exception as e:
+            return None, str(e)
+
+        with self._lock:
+            now = time.monotonic()
+            full_sync = self._last_full_sync is None or now - self._last_full_sync > self.full_resync_seconds
+            if full_sync:
+                last_play_indexed = self._last_play_indexed
+                recent_activity = self._recent_activity
+                self.reset()
+                # Si la consulta falla, se conserva lo que ya se sabía hasta el siguiente intento
+                self._last_play_indexed = last_play_indexed
+                self._recent_activity = recent_activity
+            include_recent = full_sync or bool(self._last_play_indexed)
+
+            # Mismo orden que los %s de la consulta
+            params = (resolve_database_name("player", realm_config),) if full_sync else ()
+            params += (
+                self._recent_account_floor(), self.window_minutes,
+                self._account_high_water,
+                self._player_high_water,
+            )
+            if include_recent:
+                params += (self.online_minutes, self.window_minutes)
+
+            try:
+                with get_pool("account", self.realm).connection() as connection:
+                    with connection.cursor() as cursor:
+                        cursor.execute(self._build_query(realm_config, full_sync, include_recent), params)
+                        row = cursor.fetchone()
+            except Exception as e:
+                return None, str(e)
+
+            if full_sync:
+                self._last_full_sync = now
+                indexed = bool(row["last_play_indexed"])
+                if not indexed and self._last_play_indexed is not False:
+                    logger.warning("La tabla player no tiene un índice sobre last_play: la actividad reciente "
+                                   "solo se recalculará cada %d s. Para calcularla en cada refresco: %s",
+                                   self.full_resync_seconds, LAST_PLAY_INDEX_DDL)
+                self._last_play_indexed = indexed
+            if include_recent:
+                self._recent_activity = (row["active_users_recent"], int(row["online_characters"]))
+
+            self._total_accounts += row["new_accounts"]
+            self._total_characters += row["new_characters"]
+            if row["max_account_id"] is not None:
+                self._account_high_water = row["max_account_id"]
+            if row["max_player_id"] is not None:
+                self._player_high_water = row["max_player_id"]
+
+            self._last_db_now = row["db_now"]
+            self._last_refresh = time.monotonic()
+            self._checkpoints.append((row["db_now"], self._account_high_water))
+
+            return {
+                "total_accounts": self._total_accounts,
+                "total_characters": self._total_characters,
+                "accounts_created_last_10_min": row["accounts_created_recent"],
+                "active_users_last_10_min": self._recent_activity[0],
+                "online_characters": self._recent_activity[1]
+            }, None
+
+
+_engines = {}  # reino -> motor
+_engine_lock = threading.Lock()
+
+
+def get_statistics_engine(realm=None):
+    """
+    Devuelve el motor de estadísticas compartido de un reino (por defecto, el activo).
+
+    Cada reino tiene su propio motor, que conserva los contadores entre refrescos.
+    """
+    realm = realm or get_active_realm()
+    with _engine_lock:
+        engine = _engines.get(realm)
+        if engine is None:
+            engine = _engines[realm] = StatisticsEngine(realm)
+        return engine
+
+
+def _on_config_changed(config, previous):
+    # Con otro servidor o base de datos los contadores acumulados ya no sirven
+    if connection_settings_changed(config, previous):
+        with _engine_lock:
+            engines = list(_engines.values())
+        for engine in engines:
+            engine.request_full_resync()
+
+
+get_config_service().subscribe(_on_config_changed)
@@ -0,0 +1,203 @@
+# statistics_history.py
+import logging
+import os
+import sqlite3
+import threading
+import time
+from backend.realms import get_statistics_all_realms
+
+logger = logging.getLogger(__name__)
+
+# Archivo local con el histórico de estadísticas (no forma parte de la configuración)
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'statistics_history.db')
+
+# Métricas que se guardan en cada muestra (claves devueltas por el motor de estadísticas)
+METRICS = [
+    "total_accounts",
+    "total_characters",
+    "accounts_created_last_10_min",
+    "active_users_last_10_min",
+    "online_characters",
+]
+
+# Resoluciones de agregación (segundos por cubo) y cuántos cubos se conservan de cada una
+RESOLUTIONS = {
+    60: 60 * 24 * 7,       # 1 minuto, 7 días
+    3600: 24 * 90,         # 1 hora, 90 días
+    86400: 365 * 5,        # 1 día, 5 años
+}
+
+# Intervalo de muestreo por defecto del recolector, en segundos
+DEFAULT_SAMPLE_INTERVAL = 60
+# Número de puntos que se intenta no superar al elegir la resolución de una gráfica
+DEFAULT_MAX_POINTS = 500
+
+
+class StatisticsHistory(object):
+    """
+    Almacén SQLite de estadísticas agregadas en cubos de 1 minuto, 1 hora y 1 día.
+
+    No se guardan muestras sueltas: cada muestra actualiza el mínimo, máximo,
+    suma y número de muestras de su cubo en las tres resoluciones. Cada resolución
+    conserva un número fijo de cubos y los más antiguos se borran al escribir,
+    así que el archivo se comporta como un búfer circular de tamaño acotado.
+    """
+
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS rollup (
+                resolution INTEGER NOT NULL,
+                metric TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                min_value REAL NOT NULL,
+                max_value REAL NOT NULL,
+                sum_value REAL NOT NULL,
+                samples INTEGER NOT NULL,
+                PRIMARY KEY (resolution, metric, bucket)
+            ) WITHOUT ROWID
+        """)
+        self._connection.commit()
+
+    def add_sample(self, stats, timestamp=None):
+        """
+        Añade una muestra a los cubos de todas las resoluciones.
+
+        :param stats: Diccionario devuelto por el motor de estadísticas.
+        :param timestamp: Instante de la muestra (segundos UNIX); por defecto, ahora.
+        """
+        timestamp = int(timestamp if timestamp is not None else time.time())
+        rows = []
+        for resolution in RESOLUTIONS:
+            bucket = timestamp - timestamp % resolution
+            for metric in METRICS:
+                value = stats.get(metric)
+                if value is not None:
+                    rows.append((resolution, metric, bucket, value, value, value))
+
+        with self._lock, self._connection:
+            self._connection.executemany("""
+                INSERT INTO rollup (resolution, metric, bucket, min_value, max_value, sum_value, samples)
+                VALUES (?, ?, ?, ?, ?, ?, 1)
+                ON CONFLICT (resolution, metric, bucket) DO UPDATE SET
+                    min_value = MIN(min_value, excluded.min_value),
+                    max_value = MAX(max_value, excluded.max_value),
+                    sum_value = sum_value + excluded.sum_value,
+                    samples = samples + 1
+            """, rows)
+
+            # Recortar cada resolución a su número máximo de cubos
+            for resolution, keep in RESOLUTIONS.items():
+                oldest = timestamp - timestamp % resolution - (keep - 1) * resolution
+                self._connection.execute(
+                    "DELETE FROM rollup WHERE resolution = ? AND bucket < ?", (resolution, oldest)
+                )
+
+    @staticmethod
+    def pick_resolution(start, end, max_points=DEFAULT_MAX_POINTS):
+        """Elige la resolución más fina que no supere `max_points` cubos en el rango."""
+        for resolution in sorted(RESOLUTIONS):
+            if (end - start) / resolution <= max_points:
+                return resolution
+        return max(RESOLUTIONS)
+
+    def get_series(self, metric, start, end, resolution=None, max_points=DEFAULT_MAX_POINTS):
+        """
+        Devuelve los cubos agregados de una métrica en un rango de tiempo.
+
+        :param start: Inicio del rango (segundos UNIX).
+        :param end: Fin del rango (segundos UNIX).
+        :param resolution: Segundos por cubo; si es None se elige según `max_points`.
+        :return: (resolución, lista de (inicio del cubo, mínimo, media, máximo))
+        """
+        if resolution is None:
+            resolution = self.pick_resolution(start, end, max_points)
+
+        with self._lock:
+            rows = self._connection.execute("""
+                SELECT bucket, min_value, sum_value / samples, max_value
+                FROM rollup
+                WHERE resolution = ? AND metric = ? AND bucket >= ? AND bucket <= ?
+                ORDER BY bucket
+            """, (resolution, metric, start - start % resolution, end)).fetchall()
+        return resolution, rows
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class StatisticsCollector(threading.Thread):
+    """Hilo en segundo plano que toma una muestra de estadísticas cada `interval` segundos."""
+
+    def __init__(self, history, interval=DEFAULT_SAMPLE_INTERVAL, engine=None):
+        super(StatisticsCollector, self).__init__(name="StatisticsCollector", daemon=True)
+        self.history = history
+        self.interval = interval
+        # Sin un motor concreto se guardan las cifras sumadas de todos los reinos
+        self.engine = engine
+        self.last_error = None
+        self._stop_event = threading.Event()
+
+    def sample(self):
+        """Toma una muestra ahora y la guarda en el histórico."""
+        stats, error = self.engine.refresh() if self.engine is not None else get_statistics_all_realms()
+        if error:
+            self.last_error = error
+            logger.warning("Error al recoger estadísticas: %s", error)
+            return
+        self.last_error = None
+        self.history.add_sample(stats)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.sample()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error("Error al guardar estadísticas: %s", e)
+            # Mantener el intervalo fijo aunque la consulta tarde
+            self._stop_event.wait(max(0, self.interval - (time.monotonic() - started)))
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_history = None
+_collector = None
+_lock = threading.Lock()
+
+
+def get_statistics_history():
+    """Devuelve el almacén de histórico compartido (se abre en el primer uso)."""
+    global _history
+    with _lock:
+        if _history is None:
+            _history = StatisticsHistory()
+        return _history
+
+
+def start_statistics_collector(interval=DEFAULT_SAMPLE_INTERVAL):
+    """Arranca el recolector compartido si no está en marcha y lo devuelve."""
+    global _collector
+    history = get_statistics_history()
+    with _lock:
+        if _collector is None or not _collector.is_alive():
+            _collector = StatisticsCollector(history, interval)
+            _collector.start()
+        return _collector
+
+
+def stop_statistics_collector():
+    global _collector
+    with _lock:
+        if _collector is not None:
+            _collector.stop()
+            _collector = None
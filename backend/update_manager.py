@@ -1,40 +1,164 @@
 # Archivo: backend/update_manager.py
-import requests
+import json
+import logging
+import os
+import re
+import sys
+import threading
 from PyQt5.QtCore import QThread, pyqtSignal
+from backend.downloader import Downloader, REQUEST_TIMEOUT
+from backend.delta_patch import apply_patch, file_sha256
+
+logger = logging.getLogger(__name__)
+
+# Versión instalada (relativo al proyecto, no al directorio de trabajo)
+VERSION_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'version.txt')
+PATCH_SUFFIX = ".m2dp"
+
+
+def parse_version(version):
+    """Convierte '1.0.1' (o 'v1.0.1') en (1, 0, 1) para poder comparar versiones."""
+    return tuple(int(part) for part in re.findall(r"\d+", version or ""))
+
+
+def get_installed_version(path=VERSION_FILE):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f).get("version")
+    except Exception as e:
+        logger.error("Error al leer la versión instalada: %s", e)
+        return None
+
+
+def get_installed_executable():
+    """Ejecutable instalado sobre el que se aplican los parches (solo en la versión empaquetada)."""
+    return sys.executable if getattr(sys, "frozen", False) else None
+
+
+def fetch_manifest(url, session):
+    """
+    Descarga el manifiesto de actualización (mismo formato que version.txt):
+
+        {"version": ..., "update_url": ..., "sha256": ...,
+         "deltas": [{"from_version": ..., "from_sha256": ..., "url": ..., "size": ..., "sha256": ...}]}
+
+    :return: (manifiesto, error)
+    """
+    try:
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json(), None
+    except Exception as e:
+        return None, f"Error al descargar el manifiesto de actualización: {e}"
+
+
+def select_delta(manifest, installed_version, installed_sha256):
+    """Devuelve el parche del manifiesto que parte de la versión instalada, o None."""
+    for delta in manifest.get("deltas") or []:
+        if delta.get("from_version") != installed_version or not delta.get("url"):
+            continue
+        # Si el ejecutable instalado se modificó, el parche no serviría
+        if delta.get("from_sha256") and delta["from_sha256"].lower() != installed_sha256:
+            continue
+        return delta
+    return None
+
 
 class UpdateThread(QThread):
+    """
+    Descarga la actualización en segundo plano con `backend.downloader`.
+
+    Con un manifiesto (`manifest_url`) se intenta primero descargar solo el
+    parche desde la versión instalada y aplicarlo al ejecutable actual; si no
+    hay parche, falla la descarga o el resultado no coincide con el SHA-256 de
+    la versión nueva, se descarga el ejecutable completo.
+
+    El progreso se emite en porcentaje y solo cuando cambia (-1 si el servidor
+    no indica el tamaño), así que la interfaz recibe como mucho unas cien
+    señales por descarga. Una descarga cancelada o cortada se reanuda desde el
+    archivo parcial la próxima vez.
+    """
+
     update_progress = pyqtSignal(int)
     update_complete = pyqtSignal(bool)
 
-    def __init__(self, update_url, output_path):
+    def __init__(self, update_url, output_path, expected_sha256=None, manifest_url=None):
         super(UpdateThread, self).__init__()
         self.update_url = update_url
         self.output_path = output_path
+        self.expected_sha256 = expected_sha256
+        self.manifest_url = manifest_url
+        self.error = None
+        self.used_delta = False
+        self._cancel_event = threading.Event()
+        self._last_percent = None
 
-    def run(self):
-        try:
-            response = requests.get(self.update_url, stream=True)
-            total_length = response.headers.get('content-length')
+    def cancel(self):
+        self._cancel_event.set()
+
+    def report_progress(self, downloaded, total):
+        percent = int(100 * downloaded / total) if total else -1
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.update_progress.emit(percent)
+
+    def download(self, downloader, url, output_path, expected_sha256):
+        return downloader.download(url, output_path, expected_sha256,
+                                   progress_callback=self.report_progress, should_cancel=self._cancel_event.is_set)
 
-            if total_length is None:
-                # No se pudo obtener el tamaño del archivo
-                self.update_complete.emit(False)
-                return
+    def apply_delta(self, downloader, manifest, expected_sha256):
+        """Intenta actualizar con un parche; devuelve True si `output_path` quedó listo."""
+        executable = get_installed_executable()
+        version = get_installed_version()
+        # Sin el hash de la versión nueva no se podría comprobar el resultado
+        if not executable or not version or not expected_sha256:
+            return False
+        delta = select_delta(manifest, version, file_sha256(executable))
+        if delta is None:
+            return False
 
-            total_length = int(total_length)
-            downloaded_size = 0
+        patch_path = self.output_path + PATCH_SUFFIX
+        _, error = self.download(downloader, delta["url"], patch_path, delta.get("sha256"))
+        if error:
+            if self._cancel_event.is_set():
+                self.error = error
+                return True
+            logger.warning("No se pudo descargar el parche (%s); se descargará la versión completa", error)
+            return False
 
-            with open(self.output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=4096):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded_size += len(chunk)
-                        progress = int(100 * downloaded_size / total_length)
-                        self.update_progress.emit(progress)
+        _, error = apply_patch(executable, patch_path, self.output_path)
+        os.remove(patch_path)
+        if error is None and file_sha256(self.output_path) != expected_sha256.lower():
+            os.remove(self.output_path)
+            error = "El resultado no coincide con el SHA-256 del manifiesto"
+        if error:
+            logger.warning("No se pudo aplicar el parche (%s); se descargará la versión completa", error)
+            return False
+        self.used_delta = True
+        return True
 
-            # Descarga completa
-            self.update_complete.emit(True)
+    def run(self):
+        try:
+            downloader = Downloader()
+            update_url, expected_sha256 = self.update_url, self.expected_sha256
+            done = False
+            if self.manifest_url:
+                manifest, error = fetch_manifest(self.manifest_url, downloader.session)
+                if error:
+                    logger.warning("%s", error)
+                else:
+                    update_url = manifest.get("update_url") or update_url
+                    expected_sha256 = manifest.get("sha256") or expected_sha256
+                    done = self.apply_delta(downloader, manifest, expected_sha256)
 
+            if not done:
+                if not update_url:
+                    raise ValueError("No hay URL de actualización")
+                self._last_percent = None
+                _, self.error = self.download(downloader, update_url, self.output_path, expected_sha256)
         except Exception as e:
-            print(f"Error al intentar descargar la actualización: {str(e)}")
-            self.update_complete.emit(False)
+            self.error = str(e)
+
+        if self.error:
+            logger.error("Error al intentar descargar la actualización: %s", self.error)
+        self.update_complete.emit(self.error is None)
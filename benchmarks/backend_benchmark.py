@@ -0,0 +1,215 @@
+# backend_benchmark.py
+"""
+Pruebas de rendimiento de las operaciones del backend contra un MariaDB de pruebas.
+
+Mide rendimiento (llamadas y filas por segundo), latencia (p50/p95/p99) y pico
+de memoria de Python de cada operación, llamando a las mismas funciones que usa
+la interfaz con sus pools de conexiones. Los datos se preparan antes con
+`benchmarks.dataset`; `create_account` inserta cuentas 'bench...' que se
+borran al terminar.
+
+Uso:
+    python -m benchmarks.dataset mysql --config bench_config.json --accounts 1000000 --drop
+    python -m benchmarks.backend_benchmark --config bench_config.json --output results/backend.json
+    python -m benchmarks.backend_benchmark --config bench_config.json --baseline results/backend.json
+
+Con --baseline el proceso termina con código 1 si alguna operación empeora más
+que la tolerancia, para poder usarlo en una comprobación automática.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from backend.server_config import get_config_service
+from backend.connection_pool import get_active_realm, pooled_connection, close_all_pools
+from backend.database import get_all_accounts, get_all_characters, get_characters_for_accounts, \
+    get_server_statistics, create_account, count_accounts
+from backend.statistics_engine import StatisticsEngine
+from benchmarks.results import summarize_latencies, peak_rss_bytes, report, DEFAULT_TOLERANCE
+
+SUITE = "backend"
+DEFAULT_WARMUP = 1
+# Cuentas por llamada en la prueba de personajes de varias cuentas (lo que pide la tabla de cuentas)
+CHARACTER_BATCH_ACCOUNTS = 500
+TABLE_COLUMNS = [
+    ("Iter.", "iterations"),
+    ("Llamadas/s", "throughput"),
+    ("Filas/s", "rows_per_second"),
+    ("p50 ms", "p50_ms"),
+    ("p95 ms", "p95_ms"),
+    ("p99 ms", "p99_ms"),
+    ("Máx ms", "max_ms"),
+    ("Pico mem. B", "peak_memory_bytes"),
+]
+
+
+def _check(result, error):
+    if error:
+        raise Exception(error)
+    return result
+
+
+class BackendBenchmark(object):
+    """Prepara y ejecuta cada operación del backend sobre un reino concreto."""
+
+    def __init__(self, realm, seed=0):
+        self.realm = realm
+        self.rng = random.Random(seed)
+        self.run_id = f"bench{int(time.time()) % 100000}"
+        self.total_accounts = _check(*count_accounts(realm))
+        if not self.total_accounts:
+            raise Exception("La tabla 'account' está vacía; genera los datos con benchmarks.dataset.")
+
+    def _random_account_id(self):
+        # Los datos generados tienen ids consecutivos desde 1
+        return self.rng.randint(1, self.total_accounts)
+
+    # Cada operación recibe el número de iteración y devuelve cuántas filas leyó o escribió
+
+    def get_all_accounts(self, iteration):
+        return len(_check(*get_all_accounts(self.realm)))
+
+    def get_all_characters(self, iteration):
+        return len(_check(*get_all_characters(self._random_account_id(), self.realm)))
+
+    def get_characters_for_accounts(self, iteration):
+        start = self.rng.randint(1, max(1, self.total_accounts - CHARACTER_BATCH_ACCOUNTS))
+        characters = _check(*get_characters_for_accounts(range(start, start + CHARACTER_BATCH_ACCOUNTS),
+                                                         realm=self.realm))
+        return sum(len(rows) for rows in characters.values())
+
+    def get_server_statistics(self, iteration):
+        # El motor compartido solo cuenta las filas nuevas desde el refresco anterior
+        _check(*get_server_statistics(self.realm))
+        return 1
+
+    def get_server_statistics_cold(self, iteration):
+        # Motor nuevo en cada llamada: primer refresco de la aplicación, con las tablas completas
+        _check(*StatisticsEngine(self.realm).refresh())
+        return 1
+
+    def create_account(self, iteration):
+        created = _check(*create_account(f"{self.run_id}_{iteration}", "benchmark", self.realm))
+        if not created:
+            raise Exception("No se pudo crear la cuenta")
+        return 1
+
+    def cleanup(self):
+        """Borra las cuentas creadas por `create_account`."""
+        with pooled_connection("account", self.realm) as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM account WHERE login LIKE %s", (self.run_id + "\\_%",))
+                return cursor.rowcount
+
+
+# Operación -> iteraciones por defecto (las que leen tablas completas tardan segundos por llamada)
+OPERATIONS = {
+    "get_all_accounts": 3,
+    "get_all_characters": 500,
+    "get_characters_for_accounts": 50,
+    "get_server_statistics": 50,
+    "get_server_statistics_cold": 5,
+    "create_account": 200,
+}
+
+
+def run_operation(name, operation, iterations, warmup=DEFAULT_WARMUP):
+    """
+    Ejecuta una operación `warmup` veces sin medir, `iterations` veces midiendo el tiempo
+    y una vez más con tracemalloc para medir el pico de memoria (que ralentiza la ejecución).
+    """
+    for iteration in range(warmup):
+        operation(-1 - iteration)
+
+    gc.collect()
+    latencies = []
+    rows = 0
+    started = time.perf_counter()
+    for iteration in range(iterations):
+        call_started = time.perf_counter()
+        rows += operation(iteration)
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        operation(iterations)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        "name": name,
+        "iterations": iterations,
+        "rows": rows,
+        "seconds": elapsed,
+        "throughput": iterations / elapsed if elapsed else None,
+        "rows_per_second": rows / elapsed if elapsed else None,
+        "peak_memory_bytes": peak_memory,
+        "process_peak_rss_bytes": peak_rss_bytes(),
+    }
+    result.update(summarize_latencies(latencies))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.backend_benchmark",
+                                     description="Mide el rendimiento de las operaciones del backend.")
+    parser.add_argument("--config", required=True,
+                        help="'server_config.json' del servidor de pruebas (¡no el de producción!)")
+    parser.add_argument("--realm", help="Reino de la configuración (por defecto, el primero)")
+    parser.add_argument("--operations", default=",".join(OPERATIONS),
+                        help=f"Operaciones separadas por comas (por defecto todas: {', '.join(OPERATIONS)})")
+    parser.add_argument("--iterations", type=int, help="Iteraciones de cada operación (por defecto, según la operación)")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", help="Resultados anteriores con los que comparar")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Empeoramiento relativo permitido respecto a la referencia (0.2 = 20 %%)")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.operations.split(",") if name.strip()]
+    unknown = [name for name in names if name not in OPERATIONS]
+    if unknown:
+        parser.error(f"Operaciones desconocidas: {', '.join(unknown)}")
+    if not os.path.isfile(args.config):
+        parser.error(f"No existe el archivo de configuración {args.config}")
+
+    # Todo el backend lee la configuración del servicio compartido
+    service = get_config_service()
+    service.path = os.path.abspath(args.config)
+    service.refresh()
+
+    benchmark = None
+    results = []
+    try:
+        realm = args.realm or get_active_realm()
+        benchmark = BackendBenchmark(realm, args.seed)
+        print(f"Reino '{realm}': {benchmark.total_accounts} cuentas", file=sys.stderr)
+        for name in names:
+            print(f"  {name}...", file=sys.stderr)
+            results.append(run_operation(name, getattr(benchmark, name),
+                                         args.iterations or OPERATIONS[name], args.warmup))
+    except Exception as e:
+        print(f"Error durante la prueba: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if benchmark is not None and "create_account" in names:
+            try:
+                print(f"Cuentas de prueba borradas: {benchmark.cleanup()}", file=sys.stderr)
+            except Exception as e:
+                print(f"No se pudieron borrar las cuentas '{benchmark.run_id}_*': {e}", file=sys.stderr)
+        close_all_pools()
+
+    parameters = {"realm": realm, "accounts": benchmark.total_accounts, "warmup": args.warmup, "seed": args.seed}
+    return report(SUITE, results, TABLE_COLUMNS, args.output, args.baseline, args.tolerance, parameters)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,402 @@
+# dataset.py
+"""
+Generador de datos sintéticos de Metin2 para las pruebas de rendimiento.
+
+Crea las tablas `account`, `player` y `gmlist` con las columnas que consulta
+el backend y las llena con millones de filas realistas: la mayoría de las
+cuentas activas y algunas bloqueadas, de cero a cuatro personajes por cuenta,
+fechas repartidas en el tiempo y una parte de la actividad dentro de la
+ventana reciente del panel de estadísticas. Con la misma semilla se generan
+siempre los mismos datos.
+
+Destinos:
+    mysql   MariaDB/MySQL. Conexión y nombres de base de datos de un
+            'server_config.json' (--config). NUNCA se debe usar con el
+            servidor de producción: --drop borra las tablas existentes.
+    sqlite  Un archivo SQLite con las tres tablas, como sustituto cuando no
+            hay un MariaDB a mano (sirve de origen de datos para las pruebas
+            de la interfaz; el backend necesita MariaDB).
+
+Uso:
+    python -m benchmarks.dataset sqlite data/bench.sqlite --accounts 1000000
+    python -m benchmarks.dataset mysql --config bench_config.json --accounts 1000000 --drop
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+from backend.database import hash_password
+from backend.gm_manager import GM_AUTHORITY_LEVELS
+
+DEFAULT_ACCOUNTS = 100000
+DEFAULT_GMS = 50
+DEFAULT_SEED = 2
+# Filas por sentencia INSERT y por transacción
+INSERT_BATCH_SIZE = 5000
+# Días hacia atrás en los que se reparten las fechas de creación y de última partida
+HISTORY_DAYS = 3 * 365
+# Proporción de cuentas creadas y de personajes jugando dentro de la ventana reciente
+RECENT_ACCOUNT_RATIO = 0.001
+RECENT_PLAYER_RATIO = 0.02
+RECENT_MINUTES = 10
+BLOCKED_RATIO = 0.03
+# Número de personajes por cuenta y su peso relativo (media ~2)
+CHARACTERS_PER_ACCOUNT = (0, 1, 2, 3, 4)
+CHARACTERS_WEIGHTS = (10, 25, 30, 20, 15)
+# Contraseñas distintas: calcular el hash de millones de contraseñas no aporta nada al conjunto de datos
+PASSWORD_POOL_SIZE = 1000
+JOBS = 8
+MAX_LEVEL = 120
+
+ACCOUNT_COLUMNS = ("id", "login", "password", "social_id", "email", "create_time", "status")
+PLAYER_COLUMNS = ("id", "account_id", "name", "job", "level", "exp", "gold", "playtime", "last_play")
+GMLIST_COLUMNS = ("mID", "mAccount", "mName", "mContactIP", "mServerIP", "mAuthority")
+
+MYSQL_SCHEMA = {
+    "account": """
+        CREATE TABLE account (
+            id INT UNSIGNED NOT NULL AUTO_INCREMENT,
+            login VARCHAR(30) NOT NULL DEFAULT '',
+            password VARCHAR(45) NOT NULL DEFAULT '',
+            social_id VARCHAR(13) NOT NULL DEFAULT '',
+            email VARCHAR(64) NOT NULL DEFAULT '',
+            create_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            status VARCHAR(8) NOT NULL DEFAULT 'OK',
+            PRIMARY KEY (id),
+            UNIQUE KEY login (login),
+            KEY create_time_idx (create_time)
+        ) ENGINE=InnoDB DEFAULT CHARSET=latin1
+    """,
+    "player": """
+        CREATE TABLE player (
+            id INT UNSIGNED NOT NULL AUTO_INCREMENT,
+            account_id INT UNSIGNED NOT NULL DEFAULT 0,
+            name VARCHAR(24) NOT NULL DEFAULT 'NONAME',
+            job TINYINT UNSIGNED NOT NULL DEFAULT 0,
+            level TINYINT UNSIGNED NOT NULL DEFAULT 1,
+            exp INT UNSIGNED NOT NULL DEFAULT 0,
+            gold INT NOT NULL DEFAULT 0,
+            playtime INT UNSIGNED NOT NULL DEFAULT 0,
+            last_play DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id),
+            KEY account_id_idx (account_id),
+            KEY name_idx (name),
+            KEY last_play_idx (last_play)
+        ) ENGINE=InnoDB DEFAULT CHARSET=latin1
+    """,
+    "gmlist": """
+        CREATE TABLE gmlist (
+            mID INT UNSIGNED NOT NULL AUTO_INCREMENT,
+            mAccount VARCHAR(32) NOT NULL DEFAULT '',
+            mName VARCHAR(32) NOT NULL DEFAULT '',
+            mContactIP VARCHAR(16) NOT NULL DEFAULT '',
+            mServerIP VARCHAR(16) NOT NULL DEFAULT 'ALL',
+            mAuthority ENUM('IMPLEMENTOR','HIGH_WIZARD','GOD','LOW_WIZARD','PLAYER') DEFAULT 'PLAYER',
+            PRIMARY KEY (mID)
+        ) ENGINE=InnoDB DEFAULT CHARSET=latin1
+    """,
+}
+
+SQLITE_SCHEMA = {
+    "account": """
+        CREATE TABLE account (
+            id INTEGER PRIMARY KEY,
+            login TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL DEFAULT '',
+            social_id TEXT NOT NULL DEFAULT '',
+            email TEXT NOT NULL DEFAULT '',
+            create_time TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            status TEXT NOT NULL DEFAULT 'OK'
+        )
+    """,
+    "player": """
+        CREATE TABLE player (
+            id INTEGER PRIMARY KEY,
+            account_id INTEGER NOT NULL DEFAULT 0,
+            name TEXT NOT NULL DEFAULT 'NONAME',
+            job INTEGER NOT NULL DEFAULT 0,
+            level INTEGER NOT NULL DEFAULT 1,
+            exp INTEGER NOT NULL DEFAULT 0,
+            gold INTEGER NOT NULL DEFAULT 0,
+            playtime INTEGER NOT NULL DEFAULT 0,
+            last_play TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    "gmlist": """
+        CREATE TABLE gmlist (
+            mID INTEGER PRIMARY KEY,
+            mAccount TEXT NOT NULL DEFAULT '',
+            mName TEXT NOT NULL DEFAULT '',
+            mContactIP TEXT NOT NULL DEFAULT '',
+            mServerIP TEXT NOT NULL DEFAULT 'ALL',
+            mAuthority TEXT DEFAULT 'PLAYER'
+        )
+    """,
+}
+# En SQLite los índices se crean al final: cargar primero y luego indexar es mucho más rápido
+SQLITE_INDEXES = (
+    "CREATE INDEX account_create_time_idx ON account (create_time)",
+    "CREATE INDEX player_account_id_idx ON player (account_id)",
+    "CREATE INDEX player_name_idx ON player (name)",
+    "CREATE INDEX player_last_play_idx ON player (last_play)",
+)
+
+_SYLLABLES = ("ka", "ri", "mo", "shin", "tae", "ra", "jin", "so", "yu", "na", "ho", "min", "gi", "do", "han", "seo")
+
+
+def _name(rng, serial):
+    """Nombre de personaje o login legible y único (el número final evita repeticiones)."""
+    parts = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return f"{parts.capitalize()}{serial}"
+
+
+def _random_time(rng, now, recent_ratio):
+    if rng.random() < recent_ratio:
+        return now - timedelta(seconds=rng.randint(0, RECENT_MINUTES * 60 - 1))
+    return now - timedelta(seconds=rng.randint(RECENT_MINUTES * 60, HISTORY_DAYS * 86400))
+
+
+def generate_accounts(count, seed=DEFAULT_SEED, now=None):
+    """
+    Genera `count` cuentas como diccionarios con las columnas de ACCOUNT_COLUMNS.
+
+    Los ids van de 1 a `count`, en el mismo orden que los asigna AUTO_INCREMENT.
+    """
+    rng = random.Random(seed)
+    now = (now or datetime.now()).replace(microsecond=0)
+    passwords = [hash_password(f"pass{number}") for number in range(PASSWORD_POOL_SIZE)]
+    for account_id in range(1, count + 1):
+        login = _name(rng, account_id).lower()
+        yield {
+            "id": account_id,
+            "login": login,
+            "password": rng.choice(passwords),
+            "social_id": f"{rng.randint(0, 9999999):07d}",
+            "email": f"{login}@example.com",
+            "create_time": _random_time(rng, now, RECENT_ACCOUNT_RATIO),
+            "status": "BLOCK" if rng.random() < BLOCKED_RATIO else "OK",
+        }
+
+
+def generate_players(account_count, seed=DEFAULT_SEED, now=None):
+    """Genera los personajes de las cuentas 1..`account_count` como diccionarios con PLAYER_COLUMNS."""
+    rng = random.Random(seed + 1)
+    now = (now or datetime.now()).replace(microsecond=0)
+    player_id = 0
+    for account_id in range(1, account_count + 1):
+        for _ in range(rng.choices(CHARACTERS_PER_ACCOUNT, CHARACTERS_WEIGHTS)[0]):
+            player_id += 1
+            level = min(MAX_LEVEL, int(rng.expovariate(1 / 30.0)) + 1)
+            yield {
+                "id": player_id,
+                "account_id": account_id,
+                "name": _name(rng, player_id),
+                "job": rng.randrange(JOBS),
+                "level": level,
+                "exp": rng.randint(0, level * 10000),
+                "gold": rng.randint(0, 2000000000) if level > 50 else rng.randint(0, 5000000),
+                "playtime": rng.randint(0, level * 600),
+                "last_play": _random_time(rng, now, RECENT_PLAYER_RATIO),
+            }
+
+
+def generate_gms(count, account_count, seed=DEFAULT_SEED):
+    """
+    Genera `count` entradas de `gmlist` para cuentas al azar, con las columnas de GMLIST_COLUMNS.
+
+    Los nombres de cuenta y personaje son los mismos que generan `generate_accounts`
+    y `generate_players` con la misma semilla, así que las filas se corresponden.
+    """
+    rng = random.Random(seed + 2)
+    chosen = sorted(rng.sample(range(1, account_count + 1), min(count, account_count)))
+    wanted = set(chosen)
+    logins = {}
+    for account in generate_accounts(chosen[-1] if chosen else 0, seed):
+        if account["id"] in wanted:
+            logins[account["id"]] = account["login"]
+
+    authorities = GM_AUTHORITY_LEVELS[:-1]  # "PLAYER" no es un GM
+    for gm_id, account_id in enumerate(chosen, start=1):
+        yield {
+            "mID": gm_id,
+            "mAccount": logins[account_id],
+            "mName": f"[GM]{logins[account_id]}"[:24],
+            "mContactIP": "ALL",
+            "mServerIP": "ALL",
+            "mAuthority": rng.choices(authorities, (1, 2, 6, 12))[0],
+        }
+
+
+def _batches(rows, columns, batch_size=INSERT_BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(tuple(row[column] for column in columns))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _as_text(rows):
+    """SQLite no tiene tipo fecha: las fechas se guardan como texto 'AAAA-MM-DD HH:MM:SS', igual que las muestra MySQL."""
+    for row in rows:
+        yield {key: str(value) if isinstance(value, datetime) else value for key, value in row.items()}
+
+
+def _report(table, inserted, started):
+    elapsed = time.perf_counter() - started
+    print(f"  {table}: {inserted} filas ({inserted / max(elapsed, 1e-9):,.0f} filas/s)", file=sys.stderr)
+
+
+def _load(connection, cursor, table, columns, rows, placeholder):
+    started = time.perf_counter()
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join([placeholder] * len(columns))})"
+    inserted = 0
+    for batch in _batches(rows, columns):
+        cursor.executemany(sql, batch)
+        connection.commit()
+        inserted += len(batch)
+    _report(table, inserted, started)
+    return inserted
+
+
+def build_sqlite(path, accounts=DEFAULT_ACCOUNTS, gms=DEFAULT_GMS, seed=DEFAULT_SEED, now=None):
+    """
+    Crea (o sustituye) un archivo SQLite con las tablas `account`, `player` y `gmlist`.
+
+    :return: Diccionario con el número de filas de cada tabla.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+
+    now = now or datetime.now()
+    connection = sqlite3.connect(path)
+    try:
+        # Es un archivo desechable: sin diario ni sincronizaciones la carga es varias veces más rápida
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        for statement in SQLITE_SCHEMA.values():
+            connection.execute(statement)
+        cursor = connection.cursor()
+        counts = {
+            "account": _load(connection, cursor, "account", ACCOUNT_COLUMNS,
+                             _as_text(generate_accounts(accounts, seed, now)), "?"),
+            "player": _load(connection, cursor, "player", PLAYER_COLUMNS,
+                            _as_text(generate_players(accounts, seed, now)), "?"),
+            "gmlist": _load(connection, cursor, "gmlist", GMLIST_COLUMNS, generate_gms(gms, accounts, seed), "?"),
+        }
+        for statement in SQLITE_INDEXES:
+            connection.execute(statement)
+        connection.commit()
+        return counts
+    finally:
+        connection.close()
+
+
+def build_mysql(realm_config, accounts=DEFAULT_ACCOUNTS, gms=DEFAULT_GMS, seed=DEFAULT_SEED, drop=False, now=None):
+    """
+    Crea las tablas en las bases de datos de un reino de MariaDB y las llena.
+
+    Las bases de datos se crean si no existen. Si alguna tabla ya existe, solo
+    se sustituye con `drop=True`.
+    :param realm_config: Diccionario de conexión de un reino (ver `server_config.get_realms`).
+    :return: Diccionario con el número de filas de cada tabla.
+    """
+    import pymysql
+    from backend.connection_pool import resolve_database_name
+    from backend.statistics_engine import quote_identifier
+
+    connection = pymysql.connect(
+        host=realm_config["host"],
+        port=realm_config["port"],
+        user=realm_config["user"],
+        password=realm_config["password"],
+        autocommit=False,
+    )
+    now = now or datetime.now()
+    tables = (
+        ("account", "account", ACCOUNT_COLUMNS, generate_accounts(accounts, seed, now)),
+        ("player", "player", PLAYER_COLUMNS, generate_players(accounts, seed, now)),
+        ("common", "gmlist", GMLIST_COLUMNS, generate_gms(gms, accounts, seed)),
+    )
+    counts = {}
+    try:
+        with connection.cursor() as cursor:
+            # Comprobar todo antes de borrar nada
+            for database, table, _, _ in tables:
+                name = resolve_database_name(database, realm_config)
+                cursor.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = %s "
+                               "AND table_name = %s", (name, table))
+                if cursor.fetchone()[0] and not drop:
+                    raise Exception(f"La tabla {name}.{table} ya existe; usa --drop para sustituirla.")
+
+            # Los datos generados ya son únicos: no hace falta comprobarlo fila a fila durante la carga
+            cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+            for database, table, columns, rows in tables:
+                name = quote_identifier(resolve_database_name(database, realm_config))
+                cursor.execute(f"CREATE DATABASE IF NOT EXISTS {name}")
+                cursor.execute(f"USE {name}")
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                cursor.execute(MYSQL_SCHEMA[table])
+                counts[table] = _load(connection, cursor, table, columns, rows, "%s")
+            cursor.execute("SET SESSION unique_checks = 1, foreign_key_checks = 1")
+        return counts
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.dataset",
+                                     description="Genera un conjunto de datos sintético de Metin2.")
+    targets = parser.add_subparsers(dest="target", required=True)
+
+    for name, help_text in (("sqlite", "Archivo SQLite de sustitución"), ("mysql", "Base de datos MariaDB/MySQL")):
+        target = targets.add_parser(name, help=help_text)
+        if name == "sqlite":
+            target.add_argument("path", help="Archivo SQLite a crear (se sustituye si existe)")
+        else:
+            target.add_argument("--config", required=True,
+                                help="'server_config.json' con los datos de conexión del servidor de pruebas")
+            target.add_argument("--realm", help="Reino de la configuración (por defecto, el primero)")
+            target.add_argument("--drop", action="store_true", help="Sustituye las tablas si ya existen")
+        target.add_argument("--accounts", type=int, default=DEFAULT_ACCOUNTS)
+        target.add_argument("--gms", type=int, default=DEFAULT_GMS)
+        target.add_argument("--seed", type=int, default=DEFAULT_SEED)
+
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    print(f"Generando {args.accounts} cuentas (semilla {args.seed})...", file=sys.stderr)
+    try:
+        if args.target == "sqlite":
+            counts = build_sqlite(args.path, args.accounts, args.gms, args.seed)
+        else:
+            from backend.server_config import ConfigService, get_realms
+            config = ConfigService(os.path.abspath(args.config)).get()
+            if config is None:
+                raise Exception(f"No se pudo leer {args.config}")
+            realms = get_realms(config)
+            realm_config = next((realm for realm in realms if realm["name"] == args.realm), None) \
+                if args.realm else realms[0]
+            if realm_config is None:
+                raise Exception(f"El reino '{args.realm}' no existe en la configuración.")
+            counts = build_mysql(realm_config, args.accounts, args.gms, args.seed, args.drop)
+    except Exception as e:
+        print(f"Error al generar los datos: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Terminado en {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    print(json.dumps({"seed": args.seed, "rows": counts}, indent=4))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
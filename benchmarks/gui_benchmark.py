@@ -0,0 +1,351 @@
+# gui_benchmark.py
+"""
+Pruebas de rendimiento de la interfaz con Qt sin pantalla (QT_QPA_PLATFORM=offscreen).
+
+Alimenta con datos de prueba, sin base de datos, los widgets reales y mide:
+
+    display_accounts[N]   Tiempo hasta tener N cuentas en la tabla, hasta el
+                          primer pintado de la tabla con filas y crecimiento de
+                          la memoria residente (RSS).
+    filter_accounts[N]    Latencia de cada pulsación al buscar (filtro + repintado,
+                          sin contar la espera de SEARCH_DEBOUNCE_MS).
+    load_characters[N]    Latencia de un clic en una cuenta con los personajes ya en
+                          caché; load_characters_cold[N], pidiéndolos en segundo plano.
+    plot_statistics       Latencia de cada actualización del panel de estadísticas
+                          hasta llenar la gráfica en directo.
+    plot_history[N]       Tiempo de dibujar un histórico de N puntos.
+
+Cada tamaño se ejecuta en un proceso aparte para que la memoria de uno no
+afecte a la del siguiente. Los datos de las cuentas se generan con
+`benchmarks.dataset` o se leen de un archivo SQLite creado con él (--dataset).
+
+Uso:
+    python -m benchmarks.gui_benchmark --rows 10000,100000,1000000 --output results/gui.json
+    python -m benchmarks.gui_benchmark --dataset data/bench.sqlite --baseline results/gui.json
+"""
+import os
+
+# Debe fijarse antes de crear la QApplication
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import gc
+import json
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.dataset import generate_accounts, DEFAULT_SEED
+from benchmarks.results import summarize_latencies, current_rss_bytes, report, DEFAULT_TOLERANCE
+
+SUITE = "gui"
+DEFAULT_ROWS = (10000, 100000, 1000000)
+# Texto que se escribe en el buscador, letra a letra, y que luego se borra
+SEARCH_TERM_LENGTH = 6
+# Cuentas en las que se hace clic para mostrar sus personajes
+CHARACTER_CLICKS = 50
+CHARACTERS_PER_ACCOUNT = 4
+# Actualizaciones del panel de estadísticas (la gráfica en directo guarda LIVE_MAX_SAMPLES)
+LIVE_UPDATES = 700
+HISTORY_REPEATS = 5
+HISTORY_RESOLUTION = 60
+# Segundos máximos esperando a que la interfaz termine algo (carga, primer pintado)
+WAIT_TIMEOUT = 300
+TABLE_COLUMNS = [
+    ("Filas", "rows"),
+    ("Constr. ms", "build_ms"),
+    ("1er pintado ms", "first_paint_ms"),
+    ("p50 ms", "p50_ms"),
+    ("p95 ms", "p95_ms"),
+    ("Máx ms", "max_ms"),
+    ("RSS +B", "rss_growth_bytes"),
+]
+SCENARIOS = ("accounts", "dashboard")
+
+
+# --- Datos de prueba ---------------------------------------------------------------
+
+def load_accounts(rows, dataset=None, seed=DEFAULT_SEED):
+    """Cuentas con las columnas que devuelve `get_accounts_page`, generadas o leídas de un SQLite."""
+    if dataset is None:
+        return [{"id": account["id"], "login": account["login"], "status": account["status"],
+                 "create_time": account["create_time"]} for account in generate_accounts(rows, seed)]
+
+    connection = sqlite3.connect(dataset)
+    try:
+        cursor = connection.execute("SELECT id, login, status, create_time FROM account ORDER BY id LIMIT ?", (rows,))
+        # MySQL devuelve datetime; el modelo de la tabla lo formatea en cada celda pintada
+        return [{"id": account_id, "login": login, "status": status,
+                 "create_time": datetime.strptime(create_time, "%Y-%m-%d %H:%M:%S")}
+                for account_id, login, status, create_time in cursor]
+    finally:
+        connection.close()
+
+
+def fixture_characters(account_id, count=CHARACTERS_PER_ACCOUNT):
+    now = datetime.now().replace(microsecond=0)
+    return [{"id": account_id * 10 + slot, "account_id": account_id, "name": f"Pj{account_id}_{slot}",
+             "job": (account_id + slot) % 8, "last_play": now - timedelta(minutes=account_id % 1000 + slot)}
+            for slot in range(count)]
+
+
+def fixture_statistics(step):
+    return {
+        "total_accounts": 1000000 + step,
+        "total_characters": 2000000 + step * 2,
+        "accounts_created_last_10_min": step % 17,
+        "active_users_last_10_min": 300 + step % 50,
+        "online_characters": 500 + (step * 7) % 200,
+    }
+
+
+def install_fixtures(accounts):
+    """Sustituye las llamadas a la base de datos que hacen los widgets por los datos de prueba."""
+    import backend.character_cache
+    import gui.statistics_dashboard
+    import gui.user_management
+    from backend.statistics_history import StatisticsHistory
+
+    def get_accounts_page(after_id=0, page_size=None, include_total=False, realm=None):
+        # Todas las cuentas en la primera página: el coste que se mide es el de la tabla con N filas
+        page = accounts if after_id == 0 else []
+        return {"accounts": page, "last_id": page[-1]["id"] if page else after_id,
+                "has_more": False, "total": len(accounts) if include_total else None}, None
+
+    def get_characters_for_accounts(account_ids, chunk_size=None, realm=None):
+        return {account_id: fixture_characters(account_id) for account_id in account_ids}, None
+
+    history = StatisticsHistory(os.path.join(tempfile.mkdtemp(prefix="gui_benchmark"), "history.db"))
+
+    gui.user_management.get_accounts_page = get_accounts_page
+    backend.character_cache.get_characters_for_accounts = get_characters_for_accounts
+    gui.statistics_dashboard.get_server_statistics = lambda: (fixture_statistics(0), None)
+    gui.statistics_dashboard.get_statistics_history = lambda: history
+
+
+# --- Medidas -----------------------------------------------------------------------
+
+class PaintRecorder(object):
+    """Filtro de eventos que anota el instante del primer pintado que cumple una condición."""
+
+    def __init__(self, widget, condition):
+        from PyQt5.QtCore import QObject, QEvent
+
+        recorder = self
+
+        class Filter(QObject):
+            def eventFilter(self, watched, event):
+                if event.type() == QEvent.Paint and recorder.painted_at is None and condition():
+                    recorder.painted_at = time.perf_counter()
+                return False
+
+        self.painted_at = None
+        self._filter = Filter()
+        widget.installEventFilter(self._filter)
+
+
+def wait_until(app, condition, timeout=WAIT_TIMEOUT):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise Exception("Tiempo de espera agotado en la interfaz")
+        app.processEvents()
+        time.sleep(0.0005)
+
+
+def measure_accounts(app, accounts):
+    from gui.user_management import UserManagementWidget
+
+    rows = len(accounts)
+    results = []
+    gc.collect()
+    rss_before = current_rss_bytes()
+
+    loaded = []
+    started = time.perf_counter()
+    widget = UserManagementWidget()
+    # Los slots se llaman en orden de conexión: este se ejecuta al terminar `on_accounts_loaded`
+    widget.accounts_handle.finished.connect(lambda _: loaded.append(time.perf_counter()))
+    widget.resize(1280, 900)
+    recorder = PaintRecorder(widget.accounts_table.viewport(), lambda: widget.accounts_model.rowCount() > 0)
+    widget.show()
+    wait_until(app, lambda: loaded and recorder.painted_at is not None)
+    if widget.accounts_model.rowCount() != rows:
+        raise Exception(f"La tabla muestra {widget.accounts_model.rowCount()} cuentas en lugar de {rows}")
+    gc.collect()
+    rss_after = current_rss_bytes()
+
+    results.append({
+        "name": f"display_accounts[{rows}]",
+        "rows": rows,
+        "build_ms": (loaded[0] - started) * 1000,
+        "first_paint_ms": (recorder.painted_at - started) * 1000,
+        "rss_growth_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+    })
+
+    # Escribir el login de una cuenta del medio letra a letra y luego borrarlo
+    term = accounts[rows // 2]["login"][:SEARCH_TERM_LENGTH]
+    keystrokes = [term[:length] for length in range(1, len(term) + 1)]
+    keystrokes += [term[:length] for length in range(len(term) - 1, -1, -1)]
+    latencies = []
+    for text in keystrokes:
+        widget.account_search_box.setText(text)
+        widget.search_timer.stop()  # Se mide el filtro, no la espera del temporizador
+        app.processEvents()
+        keystroke_started = time.perf_counter()
+        widget.filter_accounts()
+        widget.accounts_table.viewport().repaint()
+        latencies.append(time.perf_counter() - keystroke_started)
+    result = {"name": f"filter_accounts[{rows}]", "rows": rows}
+    result.update(summarize_latencies(latencies))
+    results.append(result)
+
+    # Clics repartidos por toda la tabla
+    app.processEvents()
+    step = max(1, rows // CHARACTER_CLICKS)
+    clicked_rows = list(range(0, rows, step))[:CHARACTER_CLICKS]
+    cache = widget.character_cache
+    cache.put_many({widget.accounts_model.account_at(row)["id"]: fixture_characters(
+        widget.accounts_model.account_at(row)["id"]) for row in clicked_rows})
+    for cold in (False, True):
+        latencies = []
+        for row in clicked_rows:
+            account_id = widget.accounts_model.account_at(row)["id"]
+            expected = fixture_characters(account_id)[0]["name"]
+            if cold:
+                cache.invalidate(account_id)
+            click_started = time.perf_counter()
+            widget.load_characters(widget.accounts_model.index(row, 0))
+            wait_until(app, lambda: widget.characters_table.item(0, 1) is not None
+                       and widget.characters_table.item(0, 1).text() == expected)
+            widget.characters_table.viewport().repaint()
+            latencies.append(time.perf_counter() - click_started)
+        result = {"name": f"load_characters{'_cold' if cold else ''}[{rows}]", "rows": rows}
+        result.update(summarize_latencies(latencies))
+        results.append(result)
+
+    widget.close()
+    return results
+
+
+def measure_dashboard(app, rows, live_updates):
+    import numpy as np
+    from gui.statistics_dashboard import StatisticsDashboard
+
+    results = []
+    dashboard = StatisticsDashboard()
+    dashboard.auto_refresh_checkbox.setChecked(False)
+    dashboard.resize(1280, 900)
+    dashboard.show()
+    app.processEvents()
+
+    if live_updates:
+        latencies = []
+        for step in range(live_updates):
+            update_started = time.perf_counter()
+            dashboard.plot_statistics(fixture_statistics(step))
+            dashboard.repaint()
+            latencies.append(time.perf_counter() - update_started)
+        result = {"name": "plot_statistics", "rows": live_updates}
+        result.update(summarize_latencies(latencies))
+        results.append(result)
+
+    # Cubos (inicio, mínimo, media, máximo) como los que devuelve StatisticsHistory.get_series
+    end = int(time.time())
+    starts = np.arange(end - rows * HISTORY_RESOLUTION, end, HISTORY_RESOLUTION, dtype=float)
+    wave = 500 + 200 * np.sin(np.arange(rows) / 500.0)
+    buckets = np.column_stack((starts, wave - 20, wave, wave + 20)).tolist()
+    latencies = []
+    for _ in range(HISTORY_REPEATS):
+        dashboard.plot_history(HISTORY_RESOLUTION, [])
+        dashboard.repaint()
+        plot_started = time.perf_counter()
+        dashboard.plot_history(HISTORY_RESOLUTION, buckets)
+        dashboard.repaint()
+        latencies.append(time.perf_counter() - plot_started)
+    result = {"name": f"plot_history[{rows}]", "rows": rows}
+    result.update(summarize_latencies(latencies))
+    results.append(result)
+
+    dashboard.close()
+    return results
+
+
+def run_scenario(scenario, rows, dataset=None, live_updates=0):
+    """Ejecuta un escenario en este proceso y devuelve la lista de resultados."""
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    accounts = load_accounts(rows, dataset) if scenario == "accounts" else []
+    install_fixtures(accounts)
+    if scenario == "accounts":
+        return measure_accounts(app, accounts)
+    return measure_dashboard(app, rows, live_updates)
+
+
+def run_isolated(scenario, rows, dataset=None, live_updates=0):
+    """Ejecuta un escenario en un proceso nuevo; su última línea de salida es el JSON de resultados."""
+    command = [sys.executable, "-m", "benchmarks.gui_benchmark", "--child", scenario, "--rows", str(rows),
+               "--live-updates", str(live_updates)]
+    if dataset:
+        command += ["--dataset", dataset]
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=project_dir)
+    if completed.returncode != 0:
+        raise Exception(f"El escenario {scenario} con {rows} filas falló:\n{completed.stderr.strip()}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.gui_benchmark",
+                                     description="Mide el rendimiento de la interfaz con Qt sin pantalla.")
+    parser.add_argument("--rows", default=",".join(str(rows) for rows in DEFAULT_ROWS),
+                        help="Tamaños separados por comas")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Escenarios: accounts, dashboard")
+    parser.add_argument("--dataset", help="Archivo SQLite creado con benchmarks.dataset (por defecto se generan)")
+    parser.add_argument("--live-updates", type=int, default=LIVE_UPDATES)
+    parser.add_argument("--in-process", action="store_true",
+                        help="No usar un proceso por tamaño (la medida de memoria será menos fiable)")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", help="Resultados anteriores con los que comparar")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Empeoramiento relativo permitido respecto a la referencia (0.2 = 20 %%)")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    try:
+        sizes = [int(rows) for rows in args.rows.split(",") if rows.strip()]
+    except ValueError:
+        parser.error("--rows debe ser una lista de números separados por comas")
+    scenarios = [scenario.strip() for scenario in args.scenarios.split(",") if scenario.strip()]
+    unknown = [scenario for scenario in scenarios if scenario not in SCENARIOS]
+    if unknown:
+        parser.error(f"Escenarios desconocidos: {', '.join(unknown)}")
+
+    if args.child:
+        print(json.dumps(run_scenario(args.child, sizes[0], args.dataset, args.live_updates), default=str))
+        return 0
+
+    results = []
+    try:
+        for position, rows in enumerate(sizes):
+            for scenario in scenarios:
+                print(f"  {scenario} [{rows}]...", file=sys.stderr)
+                # La gráfica en directo no depende del tamaño: se mide una sola vez
+                live_updates = args.live_updates if position == 0 else 0
+                run = run_scenario if args.in_process else run_isolated
+                results.extend(run(scenario, rows, args.dataset, live_updates))
+    except Exception as e:
+        print(f"Error durante la prueba: {e}", file=sys.stderr)
+        return 2
+
+    parameters = {"rows": sizes, "scenarios": scenarios, "dataset": args.dataset,
+                  "platform": os.environ.get("QT_QPA_PLATFORM")}
+    return report(SUITE, results, TABLE_COLUMNS, args.output, args.baseline, args.tolerance, parameters)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+# results.py
+"""Utilidades comunes de las pruebas de rendimiento: estadísticas, memoria y archivos de resultados."""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+PERCENTILES = (50, 95, 99)
+# Empeoramiento relativo a partir del cual una comparación con la referencia se marca como regresión
+DEFAULT_TOLERANCE = 0.2
+# Métricas que se comparan con la referencia y si "más" es peor (latencias, memoria) o mejor (rendimiento)
+COMPARED_METRICS = {
+    "build_ms": True,
+    "first_paint_ms": True,
+    "p50_ms": True,
+    "p95_ms": True,
+    "peak_memory_bytes": True,
+    "rss_growth_bytes": True,
+    "throughput": False,
+}
+
+
+def percentile(sorted_values, percent):
+    """Percentil con interpolación lineal de una lista ya ordenada."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * percent / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize_latencies(seconds):
+    """Resume una lista de duraciones (segundos) en milisegundos: mínimo, media, percentiles y máximo."""
+    values = sorted(seconds)
+    if not values:
+        return {"samples": 0}
+    result = {
+        "samples": len(values),
+        "min_ms": values[0] * 1000,
+        "mean_ms": sum(values) / len(values) * 1000,
+        "max_ms": values[-1] * 1000,
+    }
+    for percent in PERCENTILES:
+        result[f"p{percent}_ms"] = percentile(values, percent) * 1000
+    return result
+
+
+def current_rss_bytes():
+    """Memoria residente actual del proceso (None si no se puede saber en esta plataforma)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        except Exception:
+            pass
+    return None
+
+
+def peak_rss_bytes():
+    """Pico de memoria residente del proceso desde que arrancó (None si no se puede saber)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KiB y macOS en bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def environment():
+    """Datos de la máquina y del código con los que se obtuvieron los resultados."""
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(path, suite, results, parameters=None):
+    """
+    Guarda los resultados en JSON.
+
+    :param results: Lista de diccionarios, uno por prueba, cada uno con una clave "name".
+    """
+    document = {
+        "suite": suite,
+        "environment": environment(),
+        "parameters": parameters or {},
+        "results": results,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, ensure_ascii=False, default=str)
+    return document
+
+
+def compare_results(results, baseline_path, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compara los resultados con un archivo de referencia guardado por `write_results`.
+
+    :return: Lista de regresiones como (prueba, métrica, valor de referencia, valor actual).
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {result["name"]: result for result in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        reference = baseline.get(result["name"])
+        if reference is None:
+            continue
+        for metric, higher_is_worse in COMPARED_METRICS.items():
+            old, new = reference.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (change > tolerance) if higher_is_worse else (change < -tolerance):
+                regressions.append((result["name"], metric, old, new))
+    return regressions
+
+
+def _format_value(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:,.1f}"
+    return f"{value:,}"
+
+
+def format_table(results, columns):
+    """Tabla de texto con una fila por prueba y las columnas indicadas como (título, clave)."""
+    rows = [["Prueba"] + [title for title, _ in columns]]
+    for result in results:
+        rows.append([result["name"]] + [_format_value(result.get(key)) for _, key in columns])
+    widths = [max(len(row[position]) for row in rows) for position in range(len(rows[0]))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) if position == 0 else cell.rjust(width)
+                  for position, (cell, width) in enumerate(zip(row, widths)))
+        for row in rows
+    )
+
+
+def report(suite, results, columns, output=None, baseline=None, tolerance=DEFAULT_TOLERANCE, parameters=None):
+    """
+    Muestra la tabla, guarda el JSON y compara con la referencia.
+
+    :return: Código de salida del proceso: 1 si hay regresiones, 0 si no.
+    """
+    print(format_table(results, columns))
+    # Comparar antes de guardar: la referencia puede ser el mismo archivo que la salida
+    regressions = compare_results(results, baseline, tolerance) if baseline else []
+    if output:
+        write_results(output, suite, results, parameters)
+        print(f"\nResultados guardados en {output}")
+    if not baseline:
+        return 0
+
+    if not regressions:
+        print(f"\nSin regresiones respecto a {baseline} (tolerancia {tolerance:.0%})")
+        return 0
+    print(f"\nRegresiones respecto a {baseline} (tolerancia {tolerance:.0%}):")
+    for name, metric, old, new in regressions:
+        print(f"  {name} {metric}: {_format_value(old)} -> {_format_value(new)} ({(new - old) / old:+.0%})")
+    return 1
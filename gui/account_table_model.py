@@ -0,0 +1,207 @@
+# account_table_model.py
+from datetime import datetime
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant, pyqtSignal
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QStyledItemDelegate, QComboBox
+from backend.account_manager import ACCOUNT_STATUSES
+
+
+class AccountTableModel(QAbstractTableModel):
+    """
+    Modelo de la tabla de cuentas.
+
+    Guarda las cuentas como diccionarios y solo formatea las celdas que la vista
+    pide al pintar, así que el coste no depende del número de cuentas cargadas.
+    """
+
+    ID_COLUMN = 0
+    LOGIN_COLUMN = 1
+    STATUS_COLUMN = 2
+    CREATE_TIME_COLUMN = 3
+
+    # Emitida cuando el usuario elige un nuevo estado en la columna "Estado"
+    status_change_requested = pyqtSignal(int, str)
+
+    def __init__(self, headers, parent=None):
+        super(AccountTableModel, self).__init__(parent)
+        self.headers = headers
+        self._accounts = []       # Todas las cuentas cargadas
+        self._visible = []        # Cuentas mostradas (todas o las filtradas)
+        self._filtered = False
+        self._rows_by_id = {}     # id de cuenta -> posición en `_accounts`
+        self.has_more = False     # Quedan páginas por pedir al servidor
+        self.fetch_more_callback = None
+
+    # --- API de QAbstractTableModel -------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._visible)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return QVariant()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+
+        account = self._visible[index.row()]
+        column = index.column()
+
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if column == self.ID_COLUMN:
+                return str(account.get("id", ""))
+            if column == self.LOGIN_COLUMN:
+                return account.get("login", "")
+            if column == self.STATUS_COLUMN:
+                return account.get("status", "OK")
+            if column == self.CREATE_TIME_COLUMN:
+                create_time = account.get("create_time", "")
+                if isinstance(create_time, datetime):
+                    return create_time.strftime("%Y-%m-%d %H:%M:%S")
+                return str(create_time)
+
+        if role == Qt.ForegroundRole and column == self.STATUS_COLUMN and account.get("status") == "BLOCK":
+            return QColor("#c0392b")
+
+        return QVariant()
+
+    def flags(self, index):
+        flags = super(AccountTableModel, self).flags(index)
+        if index.isValid() and index.column() == self.STATUS_COLUMN:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole or index.column() != self.STATUS_COLUMN:
+            return False
+
+        account = self._visible[index.row()]
+        if value != account.get("status"):
+            # El cambio se aplica en la tabla cuando la base de datos lo confirma
+            self.status_change_requested.emit(account["id"], value)
+        return False
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more and self.fetch_more_callback is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self.fetch_more_callback()
+
+    # --- Gestión de datos -----------------------------------------------------------
+
+    def set_headers(self, headers):
+        """Cambia los títulos de las columnas (por ejemplo, al cambiar de idioma)."""
+        self.headers = headers
+        self.headerDataChanged.emit(Qt.Horizontal, 0, len(headers) - 1)
+
+    def set_accounts(self, accounts, has_more=False):
+        """Sustituye todas las cuentas del modelo."""
+        self.beginResetModel()
+        self._accounts = list(accounts)
+        self._rows_by_id = {account["id"]: row for row, account in enumerate(self._accounts)}
+        self._visible = self._accounts
+        self._filtered = False
+        self.has_more = has_more
+        self.endResetModel()
+
+    def append_accounts(self, accounts, has_more=False, matches=None):
+        """
+        Añade cuentas al final del modelo.
+
+        :param matches: Si hay un filtro activo, función que decide qué cuentas nuevas son visibles.
+        """
+        self.has_more = has_more
+        if not accounts:
+            return
+
+        first_row = len(self._accounts)
+        for offset, account in enumerate(accounts):
+            self._rows_by_id[account["id"]] = first_row + offset
+
+        if not self._filtered:
+            self.beginInsertRows(QModelIndex(), first_row, first_row + len(accounts) - 1)
+            self._accounts.extend(accounts)
+            self.endInsertRows()
+            return
+
+        self._accounts.extend(accounts)
+        visible = [account for account in accounts if matches is None or matches(account)]
+        if visible:
+            first_visible = len(self._visible)
+            self.beginInsertRows(QModelIndex(), first_visible, first_visible + len(visible) - 1)
+            self._visible.extend(visible)
+            self.endInsertRows()
+
+    def set_filter(self, accounts):
+        """Muestra solo las cuentas indicadas, o todas si `accounts` es None."""
+        self.beginResetModel()
+        if accounts is None:
+            self._visible = self._accounts
+            self._filtered = False
+        else:
+            self._visible = list(accounts)
+            self._filtered = True
+        self.endResetModel()
+
+    def all_accounts(self):
+        return self._accounts
+
+    def account_at(self, row):
+        return self._visible[row]
+
+    def set_account_status(self, account_id, new_status):
+        """Actualiza el estado de una cuenta ya confirmado en la base de datos."""
+        position = self._rows_by_id.get(account_id)
+        if position is None:
+            return
+        account = self._accounts[position]
+        account["status"] = new_status
+
+        # Solo hay que repintar si la cuenta está visible
+        row = position if not self._filtered else next(
+            (row for row, visible in enumerate(self._visible) if visible is account), None)
+        if row is not None:
+            cell = self.index(row, self.STATUS_COLUMN)
+            self.dataChanged.emit(cell, cell, [Qt.DisplayRole, Qt.ForegroundRole])
+
+    def set_accounts_status(self, account_ids, new_status):
+        """Actualiza el estado de varias cuentas y repinta la columna una sola vez."""
+        for account_id in account_ids:
+            position = self._rows_by_id.get(account_id)
+            if position is not None:
+                self._accounts[position]["status"] = new_status
+
+        if account_ids and self._visible:
+            top = self.index(0, self.STATUS_COLUMN)
+            bottom = self.index(len(self._visible) - 1, self.STATUS_COLUMN)
+            self.dataChanged.emit(top, bottom, [Qt.DisplayRole, Qt.ForegroundRole])
+
+
+class StatusDelegate(QStyledItemDelegate):
+    """Editor de la columna "Estado": un único QComboBox creado solo mientras se edita."""
+
+    def createEditor(self, parent, option, index):
+        editor = QComboBox(parent)
+        editor.addItems(ACCOUNT_STATUSES)
+        return editor
+
+    def setEditorData(self, editor, index):
+        status = index.data(Qt.EditRole)
+        position = editor.findText(status)
+        editor.setCurrentIndex(position if position >= 0 else 0)
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
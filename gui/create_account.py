@@ -1,18 +1,16 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox, QFormLayout, QHBoxLayout, QSpacerItem, QSizePolicy
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox, QFormLayout, QHBoxLayout, QSpacerItem, QSizePolicy, QProgressBar, QFileDialog
 from backend.database import create_account
+from backend.account_import import import_accounts
+from gui.query_executor import get_executor
+from gui.translations import get_translations
 
 class CreateAccountWidget(QWidget):
     def __init__(self):
         super(CreateAccountWidget, self).__init__()
-        self.translations = self.load_translations()  # Cargar las traducciones
+        self.translations = get_translations()  # Textos en el idioma activo
+        self.import_handle = None
         self.init_ui()
 
-    def load_translations(self):
-        import json
-        with open('translations.json', 'r', encoding='utf-8') as file:
-            translations = json.load(file)
-        return translations.get("es", {})  # Utiliza 'es' como el idioma predeterminado
-
     def init_ui(self):
         # Cambiar el layout a un QFormLayout para mejor alineación
         form_layout = QFormLayout()
@@ -41,14 +39,36 @@ class CreateAccountWidget(QWidget):
         # Añadir espacio flexible al otro lado del botón
         button_layout.addSpacerItem(spacer)
 
+        # Importación masiva desde CSV (login,password[,status]) o JSONL
+        import_layout = QHBoxLayout()
+        self.import_button = QPushButton("Importar cuentas desde archivo...")
+        self.import_button.clicked.connect(self.import_accounts_action)
+        self.import_cancel_button = QPushButton("Cancelar")
+        self.import_cancel_button.clicked.connect(self.cancel_import)
+        self.import_cancel_button.hide()
+        self.import_progress_bar = QProgressBar()
+        self.import_progress_bar.hide()
+        import_layout.addWidget(self.import_button)
+        import_layout.addWidget(self.import_progress_bar)
+        import_layout.addWidget(self.import_cancel_button)
+
         # Layout principal que contiene el formulario y el botón
         main_layout = QVBoxLayout()
         main_layout.addLayout(form_layout)
         main_layout.addLayout(button_layout)
+        main_layout.addLayout(import_layout)
 
         # Establecer el layout al widget
         self.setLayout(main_layout)
 
+    def retranslate_ui(self):
+        self.login_label.setText(self.translations["login_label"])
+        self.password_label.setText(self.translations["password_label"])
+        self.create_account_button.setText(self.translations["btn_create_account"])
+
+    def can_unload(self):
+        return self.import_handle is None
+
     def create_account_action(self):
         login = self.login_input.text()
         password = self.password_input.text()
@@ -57,9 +77,71 @@ class CreateAccountWidget(QWidget):
             QMessageBox.warning(self, "Advertencia", self.translations["create_account_error"])
             return
 
-        success, error = create_account(login, password)
+        # Crear la cuenta en segundo plano para no bloquear la interfaz
+        self.create_account_button.setEnabled(False)
+        handle = get_executor().submit(create_account, login, password, key=("create_account", login))
+        handle.finished.connect(self.on_account_created)
+        handle.failed.connect(self.on_account_create_failed)
+
+    def on_account_create_failed(self, error):
+        self.create_account_button.setEnabled(True)
+        QMessageBox.critical(self, "Error", self.translations["create_account_error"] + f": {error}")
+
+    def on_account_created(self, result):
+        self.create_account_button.setEnabled(True)
+        success, error = result
 
         if success:
             QMessageBox.information(self, "Éxito", self.translations["create_account_success"])
         else:
             QMessageBox.critical(self, "Error", self.translations["create_account_error"] + f": {error}")
+
+    def import_accounts_action(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Importar cuentas", "", "Cuentas (*.csv *.jsonl);;Todos los archivos (*)")
+        if not path:
+            return
+
+        self.import_button.setEnabled(False)
+        self.import_progress_bar.setRange(0, 0)  # Indeterminado hasta el primer bloque
+        self.import_progress_bar.show()
+        self.import_cancel_button.show()
+
+        self.import_handle = get_executor().submit(import_accounts, path, key=("import_accounts", path), with_progress=True)
+        self.import_handle.progress.connect(self.on_import_progress)
+        self.import_handle.finished.connect(self.on_import_finished)
+        self.import_handle.failed.connect(self.on_import_failed)
+        self.import_handle.cancelled.connect(self.on_import_cancelled)
+
+    def cancel_import(self):
+        if self.import_handle is not None:
+            self.import_handle.cancel()
+
+    def on_import_progress(self, done, total):
+        self.import_progress_bar.setRange(0, total)
+        self.import_progress_bar.setValue(done)
+
+    def finish_import(self):
+        self.import_handle = None
+        self.import_button.setEnabled(True)
+        self.import_progress_bar.hide()
+        self.import_cancel_button.hide()
+
+    def on_import_finished(self, report):
+        self.finish_import()
+        errors = report["errors"]
+        message = QMessageBox(self)
+        message.setWindowTitle("Importación de cuentas")
+        message.setIcon(QMessageBox.Warning if errors else QMessageBox.Information)
+        message.setText(f"Cuentas creadas: {report['imported']}\nFilas con errores: {len(errors)}")
+        if errors:
+            message.setDetailedText("\n".join(f"Línea {line}: {login} - {error}" for line, login, error in errors))
+        message.exec_()
+
+    def on_import_failed(self, error):
+        self.finish_import()
+        QMessageBox.critical(self, "Error", f"No se pudo importar el archivo: {error}")
+
+    def on_import_cancelled(self):
+        self.finish_import()
+        QMessageBox.information(self, "Importación de cuentas",
+                                "Importación cancelada. Las cuentas de los bloques ya confirmados se han creado.")
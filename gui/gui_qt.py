@@ -6,22 +6,18 @@ import qtawesome as qta  # Importar qtawesome para usar íconos FontAwesome
 from backend.database import get_all_accounts, update_account_status, create_account, get_all_characters, get_server_statistics
 from backend.server_config import load_server_config, save_server_config
 from backend.update_manager import UpdateThread
-import json
 import os
 
-# Cargar traducciones desde archivo JSON
-TRANSLATIONS_FILE = "translations.json"
-def load_translations():
-    with open(TRANSLATIONS_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+from gui.translations import get_translations
 
 class ServerAdminApp(QMainWindow):
     def __init__(self):
         super(ServerAdminApp, self).__init__()
         self.config = load_server_config()
         self.language = self.config.get("language", "es")
-        self.translations = load_translations()
-        self.trans = self.translations[self.language]
+        # Catálogo compartido con la ventana principal: se lee una sola vez
+        self.trans = get_translations()
+        self.trans.set_language(self.language)
         
         self.setWindowTitle(self.trans["app_title"])
         self.resize(1000, 600)
@@ -1,14 +1,14 @@
 # Archivo: main_window.py
 from PyQt5 import QtWidgets
-from PyQt5.QtWidgets import QMainWindow, QHBoxLayout, QVBoxLayout, QPushButton, QStackedWidget, QProgressBar, QMessageBox, QInputDialog
-from PyQt5.QtGui import QIcon
-import qtawesome as qta
-from gui.statistics_dashboard import StatisticsDashboard
-from backend.server_config import load_server_config, save_server_config
-from backend.update_manager import UpdateThread  # Importar el módulo de actualización
-from backend.gm_manager import create_gm
-from gui.statistics_dashboard import StatisticsDashboard  # Asegúrate de importar StatisticsDashboard correctamente
-import json
+from PyQt5.QtCore import QTimer, pyqtSignal
+from PyQt5.QtWidgets import QMainWindow, QHBoxLayout, QVBoxLayout, QPushButton, QStackedWidget, QProgressBar, QMessageBox, QInputDialog, QFileDialog, QShortcut, QComboBox, QLabel
+from PyQt5.QtGui import QIcon, QKeySequence
+from backend.server_config import load_server_config, save_server_config, get_config_service, get_realms
+from backend.connection_pool import get_active_realm, set_active_realm
+from backend.statistics_history import start_statistics_collector, stop_statistics_collector, DEFAULT_SAMPLE_INTERVAL
+from gui.view_manager import ViewManager, DEFAULT_MAX_LIVE_VIEWS, DEFAULT_IDLE_UNLOAD_SECONDS
+from gui.translations import get_translations, LANGUAGE_NAMES, DEFAULT_LANGUAGE
+# Los módulos pesados (pyqtgraph, pymysql, requests, qtawesome) se importan al usarse por primera vez
 import os
 
 class MainWindow(QMainWindow):
@@ -31,19 +31,20 @@ if __name__ == "__main__":
     main_window.show()
     sys.exit(app.exec_())
 
-TRANSLATIONS_FILE = "translations.json"
-
-def load_translations():
-    with open(TRANSLATIONS_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+# Cada cuánto se comprueba si 'server_config.json' se modificó fuera de la aplicación
+CONFIG_POLL_INTERVAL_MS = 2000
 
 class ServerAdminApp(QMainWindow):
+    # Emitida cuando cambia la configuración; cruza al hilo de la interfaz si el cambio se detecta en otro hilo
+    config_changed = pyqtSignal(object)
+
     def __init__(self):
         super(ServerAdminApp, self).__init__()
         self.config = load_server_config()
-        self.language = self.config.get("language", "es")
-        self.translations = load_translations()
-        self.trans = self.translations[self.language]
+        # El catálogo se lee una vez; cambiar de idioma no requiere reiniciar
+        self.trans = get_translations()
+        self.trans.set_language(self.language_from_config(self.config))
+        self.language = self.trans.language
         
         self.setWindowTitle(self.trans["app_title"])
         self.setWindowIcon(QIcon("resources/logo.ico")) 
@@ -53,15 +54,18 @@ class ServerAdminApp(QMainWindow):
         self.apply_theme()
 
         menubar = self.menuBar()
-        config_menu = menubar.addMenu(self.trans["config_menu"])
-        config_menu.addAction(self.trans["server_config_menu"], self.show_server_config)
-        config_menu.addAction(self.trans["theme_menu"], self.choose_theme)
-        config_menu.addSeparator()
-        config_menu.addAction(self.trans["language_menu"], self.choose_language)
-
-        about_menu = menubar.addMenu(self.trans["about_menu"])
-        about_menu.addAction(self.trans["about_menu"], self.about_program)
-        about_menu.addAction(self.trans.get("check_for_updates", "Comprobar Actualizaciones"), self.check_for_updates)
+        self.config_menu = menubar.addMenu(self.trans["config_menu"])
+        self.server_config_action = self.config_menu.addAction(self.trans["server_config_menu"], self.show_server_config)
+        self.theme_action = self.config_menu.addAction(self.trans["theme_menu"], self.choose_theme)
+        self.gm_roster_sync_action = self.config_menu.addAction(self.trans.get("gm_roster_sync_menu", "Sincronizar GMs desde archivo..."), self.sync_gm_roster_action)
+        self.restart_server_action = self.config_menu.addAction(self.trans.get("restart_server_menu", "Reiniciar servidor..."), self.restart_server)
+        self.query_metrics_action = self.config_menu.addAction(self.trans.get("query_metrics_menu", "Métricas de consultas"), self.show_query_metrics)
+        self.config_menu.addSeparator()
+        self.language_action = self.config_menu.addAction(self.trans["language_menu"], self.choose_language)
+
+        self.about_menu = menubar.addMenu(self.trans["about_menu"])
+        self.about_action = self.about_menu.addAction(self.trans["about_menu"], self.about_program)
+        self.check_for_updates_action = self.about_menu.addAction(self.trans.get("check_for_updates", "Comprobar Actualizaciones"), self.check_for_updates)
 
         main_layout = QHBoxLayout()
         central_widget = QtWidgets.QWidget()
@@ -69,16 +73,24 @@ class ServerAdminApp(QMainWindow):
         self.setCentralWidget(central_widget)
 
         button_layout = QVBoxLayout()
-        self.btn_manage_users = QPushButton(qta.icon('fa.users', color='black'), self.trans.get("btn_manage_users", "Gestión de Usuarios"))
+        # Selector de reino: solo se muestra si la configuración define varios
+        self.realm_label = QLabel(self.trans.get("realm_label", "Reino:"))
+        self.realm_combo = QComboBox()
+        self.realm_combo.currentIndexChanged.connect(self.on_realm_selected)
+        button_layout.addWidget(self.realm_label)
+        button_layout.addWidget(self.realm_combo)
+        self.populate_realms()
+
+        self.btn_manage_users = QPushButton(self.trans.get("btn_manage_users", "Gestión de Usuarios"))
         self.btn_manage_users.clicked.connect(self.show_manage_users)
         button_layout.addWidget(self.btn_manage_users)
 
-        self.btn_create_account = QPushButton(qta.icon('fa.user-plus', color='black'), self.trans.get("btn_create_account", "Crear nueva cuenta de usuario"))
+        self.btn_create_account = QPushButton(self.trans.get("btn_create_account", "Crear nueva cuenta de usuario"))
         self.btn_create_account.clicked.connect(self.show_create_account)
         button_layout.addWidget(self.btn_create_account)
 
         # Botón para mostrar estadísticas del servidor
-        self.btn_show_statistics = QPushButton(qta.icon('fa.bar-chart', color='black'), self.trans.get("server_statistics", "Mostrar estadísticas del servidor"))
+        self.btn_show_statistics = QPushButton(self.trans.get("server_statistics", "Mostrar estadísticas del servidor"))
         self.btn_show_statistics.clicked.connect(self.show_statistics_dashboard)  # Conectar al método que muestra el panel de estadísticas
         button_layout.addWidget(self.btn_show_statistics)
 
@@ -88,23 +100,129 @@ class ServerAdminApp(QMainWindow):
         main_layout.addLayout(button_layout)
         main_layout.addWidget(self.stack)
 
+        # Cada página se crea una vez y se reutiliza; las que no se usan se descartan pasado un tiempo
+        self.views = ViewManager(
+            self.stack,
+            max_live_views=self.config.get("max_live_views", DEFAULT_MAX_LIVE_VIEWS),
+            idle_unload_seconds=self.config.get("view_idle_unload_seconds", DEFAULT_IDLE_UNLOAD_SECONDS),
+            parent=self,
+        )
+        self.views.register("manage_users", self.create_manage_users_view)
+        self.views.register("create_account", self.create_create_account_view)
+        self.views.register("statistics", self.create_statistics_view)
+        self.views.register("server_config", self.create_server_config_view)
+        self.views.register("query_metrics", self.create_query_metrics_view)
+        self.trans.subscribe(self.on_language_changed)
+
+        # F5 vuelve a cargar los datos de la página visible
+        self.refresh_shortcut = QShortcut(QKeySequence.Refresh, self)
+        self.refresh_shortcut.activated.connect(self.views.refresh)
+
         self.update_thread = None
         self.progress_bar = None
 
+        self.statistics_collector = None
+        self.deferred_services_started = False
+
+        # Aplicar los cambios de configuración sin reiniciar (guardados desde la aplicación o a mano)
+        self.config_changed.connect(self.apply_config)
+        get_config_service().subscribe(self.on_config_changed)
+        self.config_poll_timer = QTimer(self)
+        self.config_poll_timer.timeout.connect(get_config_service().refresh)
+        self.config_poll_timer.start(CONFIG_POLL_INTERVAL_MS)
+
+    def paintEvent(self, event):
+        super(ServerAdminApp, self).paintEvent(event)
+        if not self.deferred_services_started:
+            self.deferred_services_started = True
+            # Cuando termine el primer pintado
+            QTimer.singleShot(0, self.start_deferred_services)
+
+    def start_deferred_services(self):
+        """Carga lo que no hace falta para pintar la ventana: iconos y recolector de estadísticas."""
+        import qtawesome as qta
+        self.btn_manage_users.setIcon(qta.icon('fa.users', color='black'))
+        self.btn_create_account.setIcon(qta.icon('fa.user-plus', color='black'))
+        self.btn_show_statistics.setIcon(qta.icon('fa.bar-chart', color='black'))
+
+        # Muestrear las estadísticas en segundo plano para el histórico del panel
+        self.statistics_collector = start_statistics_collector(
+            self.config.get("statistics_sample_interval", DEFAULT_SAMPLE_INTERVAL))
+
+    def closeEvent(self, event):
+        self.config_poll_timer.stop()
+        get_config_service().unsubscribe(self.on_config_changed)
+        self.trans.unsubscribe(self.on_language_changed)
+        if self.update_thread is not None and self.update_thread.isRunning():
+            # La descarga se reanudará desde el archivo parcial la próxima vez
+            self.update_thread.cancel()
+            self.update_thread.wait()
+        if self.statistics_collector is not None:
+            stop_statistics_collector()
+        super(ServerAdminApp, self).closeEvent(event)
+
+    def on_config_changed(self, config, previous):
+        # Puede llamarse desde un hilo de trabajo: la señal lleva el cambio al hilo de la interfaz
+        self.config_changed.emit(config)
+
+    @staticmethod
+    def language_from_config(config):
+        language = config.get("language", DEFAULT_LANGUAGE)
+        # Versiones anteriores guardaban el nombre mostrado en el selector
+        return {"ESPÑOL": "es", "ENGLISH": "en"}.get(language, language)
+
+    def apply_config(self, config):
+        self.config = config
+        self.trans.set_language(self.language_from_config(config))
+        is_dark_mode = config.get("theme", "light") == "dark"
+        if is_dark_mode != self.is_dark_mode:
+            self.is_dark_mode = is_dark_mode
+            self.apply_theme()
+        if self.statistics_collector is not None:
+            self.statistics_collector.interval = config.get("statistics_sample_interval", DEFAULT_SAMPLE_INTERVAL)
+        self.populate_realms()
+
+    def populate_realms(self):
+        realms = [realm["name"] for realm in get_realms(self.config or {})]
+        self.realm_combo.blockSignals(True)
+        self.realm_combo.clear()
+        self.realm_combo.addItems(realms)
+        active = get_active_realm()
+        if active in realms:
+            self.realm_combo.setCurrentIndex(realms.index(active))
+        self.realm_combo.blockSignals(False)
+        self.realm_label.setVisible(len(realms) > 1)
+        self.realm_combo.setVisible(len(realms) > 1)
+
+    def on_realm_selected(self, index):
+        realm = self.realm_combo.itemText(index)
+        if not realm or realm == get_active_realm():
+            return
+        try:
+            set_active_realm(realm)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        # La lista de cuentas pertenece al reino anterior; las estadísticas suman todos los reinos
+        self.views.refresh("manage_users")
+
     def check_for_updates(self):
         update_url = self.config.get("update_url")
-        if not update_url:
+        # Con un manifiesto se descarga solo el parche desde la versión instalada si existe
+        manifest_url = self.config.get("update_manifest_url")
+        if not update_url and not manifest_url:
             QMessageBox.information(self, "Actualización", "No se encontró una URL de actualización.")
             return
 
         reply = QMessageBox.question(self, "Nueva actualización", "Hay una nueva versión disponible. ¿Desea actualizar ahora?",
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
-            self.download_update(update_url)
+            self.download_update(update_url, manifest_url)
 
-    def download_update(self, update_url):
+    def download_update(self, update_url, manifest_url=None):
+        from backend.update_manager import UpdateThread
         output_path = os.path.join(os.getcwd(), "metin2_admin_update.exe")
-        self.update_thread = UpdateThread(update_url, output_path)
+        self.update_thread = UpdateThread(update_url, output_path, self.config.get("update_sha256"), manifest_url)
         self.update_thread.update_progress.connect(self.show_update_progress)
         self.update_thread.update_complete.connect(self.on_update_complete)
         self.update_thread.start()
@@ -116,7 +234,12 @@ class ServerAdminApp(QMainWindow):
 
     def show_update_progress(self, progress):
         if self.progress_bar:
-            self.progress_bar.setValue(progress)
+            if progress < 0:
+                # Tamaño desconocido: barra indeterminada
+                self.progress_bar.setMaximum(0)
+            else:
+                self.progress_bar.setMaximum(100)
+                self.progress_bar.setValue(progress)
 
     def on_update_complete(self, success):
         if self.progress_bar:
@@ -125,12 +248,36 @@ class ServerAdminApp(QMainWindow):
         if success:
             QMessageBox.information(self, "Actualización", "La actualización se ha descargado y aplicado exitosamente. Reinicie la aplicación.")
         else:
-            QMessageBox.critical(self, "Error", "Ocurrió un error al intentar descargar la actualización.")
+            error = self.update_thread.error if self.update_thread is not None else None
+            QMessageBox.critical(self, "Error", f"Ocurrió un error al intentar descargar la actualización.\n{error or ''}")
 
     def change_language(self, lang):
         self.config["language"] = lang
         save_server_config(self.config)
-        QMessageBox.information(self, self.trans["about_menu"], f"El idioma ha cambiado a {lang}. Reinicie la aplicación para aplicar los cambios.")
+        # Se aplica en memoria: la ventana y las páginas vuelven a poner sus textos
+        self.trans.set_language(lang)
+
+    def on_language_changed(self, language):
+        self.language = language
+        self.retranslate_ui()
+        self.views.retranslate()
+
+    def retranslate_ui(self):
+        self.setWindowTitle(self.trans["app_title"])
+        self.config_menu.setTitle(self.trans["config_menu"])
+        self.server_config_action.setText(self.trans["server_config_menu"])
+        self.theme_action.setText(self.trans["theme_menu"])
+        self.gm_roster_sync_action.setText(self.trans.get("gm_roster_sync_menu", "Sincronizar GMs desde archivo..."))
+        self.restart_server_action.setText(self.trans.get("restart_server_menu", "Reiniciar servidor..."))
+        self.query_metrics_action.setText(self.trans.get("query_metrics_menu", "Métricas de consultas"))
+        self.language_action.setText(self.trans["language_menu"])
+        self.about_menu.setTitle(self.trans["about_menu"])
+        self.about_action.setText(self.trans["about_menu"])
+        self.check_for_updates_action.setText(self.trans.get("check_for_updates", "Comprobar Actualizaciones"))
+        self.realm_label.setText(self.trans.get("realm_label", "Reino:"))
+        self.btn_manage_users.setText(self.trans.get("btn_manage_users", "Gestión de Usuarios"))
+        self.btn_create_account.setText(self.trans.get("btn_create_account", "Crear nueva cuenta de usuario"))
+        self.btn_show_statistics.setText(self.trans.get("server_statistics", "Mostrar estadísticas del servidor"))
 
     def apply_theme(self):
         if self.is_dark_mode:
@@ -159,41 +306,134 @@ class ServerAdminApp(QMainWindow):
             self.apply_theme()
 
     def choose_language(self):
-        lang, ok = QInputDialog.getItem(self, self.trans["language_menu"], "Seleccione el idioma:", ["ESPÑOL", "ENGLISH"], 0, False)
+        languages = self.trans.languages()
+        names = [LANGUAGE_NAMES.get(language, language) for language in languages]
+        current = languages.index(self.language) if self.language in languages else 0
+        name, ok = QInputDialog.getItem(self, self.trans["language_menu"], "Seleccione el idioma:", names, current, False)
         if ok:
-            self.change_language(lang)
+            self.change_language(languages[names.index(name)])
 
-    def show_manage_users(self):
+    def create_manage_users_view(self):
         from gui.user_management import UserManagementWidget
-        widget = UserManagementWidget()
-        self.stack.addWidget(widget)
-        self.stack.setCurrentWidget(widget)
+        return UserManagementWidget()
 
-    def show_create_account(self):
+    def create_create_account_view(self):
         from gui.create_account import CreateAccountWidget
-        widget = CreateAccountWidget()
-        self.stack.addWidget(widget)
-        self.stack.setCurrentWidget(widget)
+        return CreateAccountWidget()
 
-    def show_statistics_dashboard(self):
-        # Método que muestra el panel de estadísticas
+    def create_statistics_view(self):
         from gui.statistics_dashboard import StatisticsDashboard
-        statistics_widget = StatisticsDashboard()
-        self.stack.addWidget(statistics_widget)
-        self.stack.setCurrentWidget(statistics_widget)
+        return StatisticsDashboard()
 
-    def show_server_config(self):
+    def create_server_config_view(self):
         from gui.server_config_gui import ServerConfigWidget
-        widget = ServerConfigWidget(self.config)
-        widget.show()
-        self.stack.addWidget(widget)
-        self.stack.setCurrentWidget(widget)
+        return ServerConfigWidget(self.config)
+
+    def create_query_metrics_view(self):
+        from gui.query_metrics_panel import QueryMetricsWidget
+        return QueryMetricsWidget()
+
+    def show_manage_users(self):
+        self.views.show("manage_users")
+
+    def show_create_account(self):
+        self.views.show("create_account")
 
     def show_statistics_dashboard(self):
-        # Crear y mostrar el panel de estadísticas con gráficos mejorados
-        statistics_widget = StatisticsDashboard()
-        self.stack.addWidget(statistics_widget)
-        self.stack.setCurrentWidget(statistics_widget)
+        # Método que muestra el panel de estadísticas
+        self.views.show("statistics")
+
+    def show_server_config(self):
+        self.views.show("server_config")
+
+    def show_query_metrics(self):
+        self.views.show("query_metrics")
+
+    def sync_gm_roster_action(self):
+        """
+        Aplica la lista de GMs de un archivo, mostrando antes los cambios que se aplicarán.
+
+        Los GMs que no están en el archivo solo se eliminan si se pide expresamente.
+        """
+        from backend.gm_manager import read_gm_roster_file, sync_gm_roster
+        from gui.query_executor import get_executor
+
+        path, _ = QFileDialog.getOpenFileName(self, "Sincronizar GMs", "", "Lista de GMs (*.json *.csv);;Todos los archivos (*)")
+        if not path:
+            return
+
+        entries, error = read_gm_roster_file(path)
+        if error:
+            QMessageBox.critical(self, "Error", error)
+            return
+
+        # Un archivo parcial no debe borrar al resto del equipo: eliminar es una opción explícita
+        remove_missing = QMessageBox.question(
+            self, "Sincronizar GMs",
+            "¿Eliminar también los GMs que no aparecen en el archivo?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No) == QMessageBox.Yes
+
+        # Primero se calcula el plan sin tocar la tabla para pedir confirmación
+        handle = get_executor().submit(sync_gm_roster, entries, remove_missing=remove_missing, dry_run=True)
+        handle.finished.connect(lambda result: self.confirm_gm_roster_sync(entries, remove_missing, result))
+        handle.failed.connect(lambda error: QMessageBox.critical(self, "Error", error))
+
+    def confirm_gm_roster_sync(self, entries, remove_missing, result):
+        from backend.gm_manager import sync_gm_roster
+        from gui.query_executor import get_executor
+
+        plan, error = result
+        if error:
+            QMessageBox.critical(self, "Error", f"No se pudo leer la lista de GMs: {error}")
+            return
+        if not (plan["insert"] or plan["update"] or plan["delete"]):
+            QMessageBox.information(self, "Sincronizar GMs", "La lista de GMs ya está al día.")
+            return
+
+        reply = QMessageBox.question(
+            self, "Sincronizar GMs",
+            f"Se añadirán {len(plan['insert'])} GMs, se actualizarán {len(plan['update'])} "
+            f"y se eliminarán {len(plan['delete'])}. ¿Desea continuar?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+
+        handle = get_executor().submit(sync_gm_roster, entries, remove_missing=remove_missing, key=("sync_gm_roster",))
+        handle.finished.connect(self.on_gm_roster_synced)
+        handle.failed.connect(lambda error: QMessageBox.critical(self, "Error", error))
+
+    def on_gm_roster_synced(self, result):
+        plan, error = result
+        if error:
+            QMessageBox.critical(self, "Error", f"No se pudo sincronizar la lista de GMs: {error}")
+            return
+        QMessageBox.information(
+            self, "Sincronizar GMs",
+            f"GMs añadidos: {len(plan['insert'])}\nGMs actualizados: {len(plan['update'])}\n"
+            f"GMs eliminados: {len(plan['delete'])}\nSin cambios: {plan['unchanged']}")
+
+    def restart_server(self):
+        """
+        Ejecuta los comandos de reinicio mostrando su salida en directo.
+
+        `restart_commands` en la configuración admite una lista de comandos o de
+        pares [nombre, comando] (por ejemplo, uno por canal), que se ejecutan a la vez.
+        """
+        from backend.commands import RESTART_COMMAND, DEFAULT_COMMAND_TIMEOUT, DEFAULT_MAX_CONCURRENCY
+        from gui.server_commands import ServerCommandDialog
+
+        reply = QMessageBox.question(self, "Reiniciar servidor", "¿Desea reiniciar el servidor ahora?",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+
+        dialog = ServerCommandDialog(
+            "Reiniciar servidor",
+            self.config.get("restart_commands") or [RESTART_COMMAND],
+            timeout=self.config.get("command_timeout", DEFAULT_COMMAND_TIMEOUT),
+            max_concurrency=self.config.get("command_max_concurrency", DEFAULT_MAX_CONCURRENCY),
+            parent=self)
+        dialog.exec_()
 
     def about_program(self):
         QMessageBox.information(self, self.trans["about_menu"], "Metin2 Server Tool - Versión 1.0.0")
@@ -0,0 +1,163 @@
+# query_executor.py
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+# Hilos máximos dedicados a consultas; no conviene superar el tamaño del pool de conexiones
+DEFAULT_MAX_THREADS = 4
+
+
+class QueryCancelled(Exception):
+    """Se lanza dentro de una tarea cuando se pidió su cancelación."""
+
+
+class QueryHandle(QObject):
+    """
+    Resultado futuro de una llamada al backend ejecutada en segundo plano.
+
+    Las señales se emiten en el hilo de la interfaz, así que los slots conectados
+    pueden tocar widgets directamente.
+    """
+
+    finished = pyqtSignal(object)      # Valor devuelto por la función del backend
+    failed = pyqtSignal(str)           # Excepción no controlada dentro de la función
+    progress = pyqtSignal(int, int)    # (hecho, total)
+    cancelled = pyqtSignal()
+
+    def __init__(self, key=None):
+        super(QueryHandle, self).__init__()
+        self.key = key
+        self._cancel_event = threading.Event()
+        self.done = False
+        self.result = None
+        self.error = None
+
+    def cancel(self):
+        """
+        Pide la cancelación de la tarea.
+
+        Si todavía no empezó no se ejecuta; si ya está en marcha, las funciones
+        que reciben `should_cancel` pueden detenerse en el siguiente punto seguro.
+        El resultado de una tarea cancelada se descarta.
+        """
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def report_progress(self, done, total):
+        """Callback de progreso que se pasa a las funciones del backend (thread-safe)."""
+        if not self.is_cancelled():
+            self.progress.emit(done, total)
+
+    def check_cancelled(self):
+        """Lanza `QueryCancelled` si se pidió la cancelación."""
+        if self.is_cancelled():
+            raise QueryCancelled()
+
+
+class _QueryTask(QRunnable):
+    def __init__(self, executor, handle, function, args, kwargs):
+        super(_QueryTask, self).__init__()
+        self.executor = executor
+        self.handle = handle
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+
+    @pyqtSlot()
+    def run(self):
+        handle = self.handle
+        result = error = None
+        if not handle.is_cancelled():
+            try:
+                result = self.function(*self.args, **self.kwargs)
+            except QueryCancelled:
+                pass
+            except Exception as e:
+                error = str(e)
+        self.executor._finish(handle, result, error)
+
+
+class QueryExecutor(QObject):
+    """
+    Ejecuta llamadas bloqueantes del backend en un QThreadPool.
+
+    Las peticiones con la misma `key` que ya están en curso se agrupan: se
+    devuelve el mismo `QueryHandle` en lugar de lanzar otra consulta.
+    """
+
+    _completed = pyqtSignal(object, object, object)  # handle, resultado, error
+
+    def __init__(self, max_threads=DEFAULT_MAX_THREADS, parent=None):
+        super(QueryExecutor, self).__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        # La señal cruza de hilo: los handles se completan en el hilo de la interfaz
+        self._completed.connect(self._deliver)
+
+    def submit(self, function, *args, key=None, with_progress=False, **kwargs):
+        """
+        Programa `function(*args, **kwargs)` en segundo plano.
+
+        :param key: Identificador para agrupar peticiones duplicadas en curso (None para no agrupar).
+        :param with_progress: Si es True, la función recibe `progress_callback` y `should_cancel`.
+        :return: QueryHandle con las señales `finished`, `failed`, `progress` y `cancelled`.
+        """
+        with self._lock:
+            if key is not None:
+                handle = self._in_flight.get(key)
+                if handle is not None and not handle.is_cancelled():
+                    return handle
+
+            handle = QueryHandle(key)
+            if key is not None:
+                self._in_flight[key] = handle
+
+        if with_progress:
+            kwargs["progress_callback"] = handle.report_progress
+            kwargs["should_cancel"] = handle.is_cancelled
+
+        self.pool.start(_QueryTask(self, handle, function, args, kwargs))
+        return handle
+
+    def cancel(self, key):
+        """Cancela la petición en curso con esa clave, si existe."""
+        with self._lock:
+            handle = self._in_flight.get(key)
+        if handle is not None:
+            handle.cancel()
+
+    def _finish(self, handle, result, error):
+        # Llamado desde el hilo de trabajo
+        with self._lock:
+            if handle.key is not None and self._in_flight.get(handle.key) is handle:
+                del self._in_flight[handle.key]
+        self._completed.emit(handle, result, error)
+
+    def _deliver(self, handle, result, error):
+        handle.done = True
+        if handle.is_cancelled():
+            handle.cancelled.emit()
+        elif error is not None:
+            handle.error = error
+            handle.failed.emit(error)
+        else:
+            handle.result = result
+            handle.finished.emit(result)
+
+    def wait_for_done(self, timeout_ms=-1):
+        """Espera a que terminen todas las tareas (por ejemplo, al cerrar la aplicación)."""
+        return self.pool.waitForDone(timeout_ms)
+
+
+_executor = None
+
+
+def get_executor():
+    """Devuelve el ejecutor compartido por toda la interfaz (se crea en el primer uso)."""
+    global _executor
+    if _executor is None:
+        _executor = QueryExecutor()
+    return _executor
@@ -0,0 +1,136 @@
+# query_metrics_panel.py
+import time
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem, \
+    QHeaderView, QPlainTextEdit, QFileDialog, QMessageBox
+from backend.query_metrics import get_query_metrics
+
+# Cada cuánto se actualiza el panel mientras está visible
+METRICS_REFRESH_MS = 2000
+# Columnas de la tabla: (título, clave del resumen de la consulta)
+QUERY_COLUMNS = [
+    ("Llamadas", "count"),
+    ("Errores", "errors"),
+    ("Filas", "rows"),
+    ("p50 ms", "p50_ms"),
+    ("p95 ms", "p95_ms"),
+    ("p99 ms", "p99_ms"),
+    ("Máx ms", "max_ms"),
+    ("Total ms", "total_ms"),
+    ("Consulta", "shape"),
+]
+
+
+def format_metric(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    return str(value)
+
+
+class QueryMetricsWidget(QWidget):
+    """Latencias por forma de consulta, espera de conexiones y consultas lentas del backend."""
+
+    def __init__(self):
+        super(QueryMetricsWidget, self).__init__()
+        self.metrics = get_query_metrics()
+        self.init_ui()
+        self.update_metrics()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+
+        buttons = QHBoxLayout()
+        self.refresh_button = QPushButton("Actualizar")
+        self.refresh_button.clicked.connect(self.update_metrics)
+        self.export_text_button = QPushButton("Exportar texto...")
+        self.export_text_button.clicked.connect(lambda: self.export_metrics("text"))
+        self.export_json_button = QPushButton("Exportar JSON...")
+        self.export_json_button.clicked.connect(lambda: self.export_metrics("json"))
+        self.reset_button = QPushButton("Reiniciar")
+        self.reset_button.clicked.connect(self.reset_metrics)
+        for button in (self.refresh_button, self.export_text_button, self.export_json_button, self.reset_button):
+            buttons.addWidget(button)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+
+        self.queries_table = QTableWidget(0, len(QUERY_COLUMNS))
+        self.queries_table.setHorizontalHeaderLabels([title for title, _ in QUERY_COLUMNS])
+        self.queries_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.queries_table.setWordWrap(False)
+        self.queries_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.queries_table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.queries_table, 3)
+
+        self.waits_label = QLabel("")
+        layout.addWidget(self.waits_label)
+
+        layout.addWidget(QLabel("Consultas lentas:"))
+        self.slow_log = QPlainTextEdit()
+        self.slow_log.setReadOnly(True)
+        layout.addWidget(self.slow_log, 1)
+        self.setLayout(layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.update_metrics)
+
+    def showEvent(self, event):
+        super(QueryMetricsWidget, self).showEvent(event)
+        self.refresh_timer.start(METRICS_REFRESH_MS)
+
+    def hideEvent(self, event):
+        super(QueryMetricsWidget, self).hideEvent(event)
+        self.refresh_timer.stop()
+
+    def refresh_view(self):
+        self.update_metrics()
+
+    def update_metrics(self):
+        snapshot = self.metrics.snapshot()
+        since = time.strftime('%H:%M:%S', time.localtime(snapshot["since"]))
+        total_calls = sum(query["count"] for query in snapshot["queries"])
+        self.summary_label.setText(
+            f"{total_calls} consultas de {len(snapshot['queries'])} tipos desde las {since}. "
+            f"Umbral de consulta lenta: {snapshot['slow_threshold_ms']:.0f} ms"
+        )
+
+        self.queries_table.setRowCount(len(snapshot["queries"]))
+        for row, query in enumerate(snapshot["queries"]):
+            for column, (_, key) in enumerate(QUERY_COLUMNS):
+                item = QTableWidgetItem(format_metric(query[key]))
+                if key != "shape":
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                elif query["last_error"]:
+                    item.setToolTip(f"Último error: {query['last_error']}")
+                self.queries_table.setItem(row, column, item)
+
+        waits = [f"{database}: p50 {format_metric(wait['p50_ms'])} ms, p95 {format_metric(wait['p95_ms'])} ms, "
+                 f"p99 {format_metric(wait['p99_ms'])} ms ({wait['count']} conexiones)"
+                 for database, wait in sorted(snapshot["connection_wait"].items())]
+        self.waits_label.setText("Espera de conexión del pool:\n" + ("\n".join(waits) or "-"))
+
+        self.slow_log.setPlainText("\n".join(
+            f"{time.strftime('%H:%M:%S', time.localtime(entry['time']))} {entry['ms']:.0f} ms "
+            f"[{entry['database']}] {entry['shape']}" + (f" -> {entry['error']}" if entry["error"] else "")
+            for entry in reversed(snapshot["slow_queries"])
+        ))
+
+    def export_metrics(self, fmt):
+        if fmt == "json":
+            path, _ = QFileDialog.getSaveFileName(self, "Exportar métricas", "query_metrics.json", "JSON (*.json)")
+        else:
+            path, _ = QFileDialog.getSaveFileName(self, "Exportar métricas", "query_metrics.txt", "Texto (*.txt)")
+        if not path:
+            return
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.metrics.export_json() if fmt == "json" else self.metrics.export_text())
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudieron exportar las métricas: {e}")
+
+    def reset_metrics(self):
+        self.metrics.reset()
+        self.update_metrics()
@@ -0,0 +1,135 @@
+# server_commands.py
+import asyncio
+import logging
+import threading
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton, QLabel
+from backend.commands import CommandRunner, DEFAULT_COMMAND_TIMEOUT, DEFAULT_MAX_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+# Líneas que se conservan en la consola de salida
+MAX_OUTPUT_LINES = 5000
+
+
+class CommandThread(QThread):
+    """
+    Ejecuta comandos del servidor en un bucle asyncio propio.
+
+    Las señales llevan la salida al hilo de la interfaz línea a línea, según
+    se produce; `cancel()` se puede llamar desde la interfaz y detiene los
+    comandos en curso.
+    """
+
+    output_line = pyqtSignal(str, str, str)     # nombre, "stdout"/"stderr", línea
+    command_finished = pyqtSignal(object)       # resultado de un comando
+    commands_finished = pyqtSignal(object)      # lista de resultados (vacía si se canceló)
+
+    def __init__(self, commands, timeout=DEFAULT_COMMAND_TIMEOUT, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        super(CommandThread, self).__init__()
+        self.commands = commands
+        self.runner = CommandRunner(max_concurrency=max_concurrency, timeout=timeout)
+        self.cancelled = False
+        self.error = None
+        self._lock = threading.Lock()
+        self._loop = None
+        self._task = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._task is not None:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+
+    def run(self):
+        loop = asyncio.new_event_loop()
+        results = []
+        try:
+            with self._lock:
+                if self.cancelled:
+                    return
+                self._loop = loop
+                self._task = loop.create_task(self.runner.run_many(
+                    self.commands, on_line=self.output_line.emit, on_result=self.command_finished.emit))
+            results = loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.error = str(e)
+            logger.error("Error al ejecutar los comandos del servidor: %s", e)
+        finally:
+            with self._lock:
+                self._task = None
+            loop.close()
+            self.commands_finished.emit(results)
+
+
+class ServerCommandDialog(QDialog):
+    """Muestra en directo la salida de uno o varios comandos del servidor y permite cancelarlos."""
+
+    def __init__(self, title, commands, timeout=DEFAULT_COMMAND_TIMEOUT,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, parent=None):
+        super(ServerCommandDialog, self).__init__(parent)
+        self.setWindowTitle(title)
+        self.resize(700, 400)
+
+        layout = QVBoxLayout()
+        self.status_label = QLabel(f"Ejecutando {len(commands)} comando(s)...")
+        layout.addWidget(self.status_label)
+
+        self.output = QPlainTextEdit()
+        self.output.setReadOnly(True)
+        self.output.setMaximumBlockCount(MAX_OUTPUT_LINES)
+        layout.addWidget(self.output)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        self.btn_cancel = QPushButton("Cancelar")
+        self.btn_cancel.clicked.connect(self.cancel_commands)
+        buttons.addWidget(self.btn_cancel)
+        self.btn_close = QPushButton("Cerrar")
+        self.btn_close.setEnabled(False)
+        self.btn_close.clicked.connect(self.accept)
+        buttons.addWidget(self.btn_close)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        self.thread = CommandThread(commands, timeout=timeout, max_concurrency=max_concurrency)
+        self.thread.output_line.connect(self.append_line)
+        self.thread.command_finished.connect(self.on_command_finished)
+        self.thread.commands_finished.connect(self.on_commands_finished)
+        self.thread.start()
+
+    def append_line(self, name, stream, line):
+        prefix = f"[{name}]" if stream == "stdout" else f"[{name}] (error)"
+        self.output.appendPlainText(f"{prefix} {line}")
+
+    def on_command_finished(self, result):
+        if result["timed_out"]:
+            status = "superó el tiempo máximo y se detuvo"
+        else:
+            status = f"terminó con código {result['returncode']}"
+        self.output.appendPlainText(f"--- {result['name']} {status} ({result['duration']:.1f} s)")
+
+    def cancel_commands(self):
+        self.btn_cancel.setEnabled(False)
+        self.status_label.setText("Cancelando...")
+        self.thread.cancel()
+
+    def on_commands_finished(self, results):
+        self.btn_cancel.setEnabled(False)
+        self.btn_close.setEnabled(True)
+        if self.thread.cancelled:
+            self.status_label.setText("Comandos cancelados.")
+        elif self.thread.error:
+            self.status_label.setText(f"Error: {self.thread.error}")
+        else:
+            failed = sum(1 for result in results if result["returncode"] != 0)
+            self.status_label.setText(f"Terminado: {len(results) - failed} correcto(s), {failed} con error.")
+
+    def reject(self):
+        # Cerrar la ventana (Esc o la X) también detiene los comandos
+        if self.thread.isRunning():
+            self.cancel_commands()
+            self.thread.wait()
+        super(ServerCommandDialog, self).reject()
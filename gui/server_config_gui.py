@@ -56,8 +56,13 @@ class ServerConfigWidget(QWidget):
             self.db_common_name_input.setText(config.get("db_common_name", ""))
             self.db_player_name_input.setText(config.get("db_player_name", ""))
 
+    def refresh_view(self):
+        self.load_config()
+
     def save_config(self):
-        config = {
+        # Partir de la configuración actual para no perder las claves que no aparecen en el formulario
+        config = load_server_config() or {}
+        config.update({
             "host": self.host_input.text(),
             "port": int(self.port_input.text()),
             "user": self.user_input.text(),
@@ -65,9 +70,8 @@ class ServerConfigWidget(QWidget):
             "db_account_name": self.db_account_name_input.text(),
             "db_common_name": self.db_common_name_input.text(),
             "db_player_name": self.db_player_name_input.text(),
-            "theme": "light",  # Este valor se puede ajustar según la aplicación
-            "language": "es"   # Este valor se puede ajustar según la aplicación
-        }
+        })
+        # Los pools y la ventana principal se actualizan solos al cambiar la configuración
         save_server_config(config)
         QMessageBox.information(self, "Éxito", "Configuración guardada correctamente.")
     
@@ -0,0 +1,118 @@
+# sprite_cache.py
+import os
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor, QImage, QPainter, QPixmap
+
+# Carpeta de los retratos de clase (relativa al proyecto, no al directorio de trabajo)
+CHARACTERS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources', 'characters')
+DEFAULT_SPRITE = "default"
+# Tamaño en píxeles de los retratos en la tabla de personajes
+DEFAULT_SPRITE_SIZE = 50
+
+# Valor de `player.job` -> (clase, nombre mostrado, sufijo de género del archivo)
+CHARACTER_CLASSES = {
+    0: ("warrior", "Guerrero", "m"),
+    4: ("warrior", "Guerrera", "w"),
+    5: ("assassin", "Ninja", "m"),
+    1: ("assassin", "Ninja", "w"),
+    2: ("sura", "Sura", "m"),
+    6: ("sura", "Sura", "w"),
+    7: ("shaman", "Chamán", "m"),
+    3: ("shaman", "Chamán", "w"),
+    8: ("wolfman", "Lycan", "m")
+}
+UNKNOWN_CLASS_NAME = "Desconocido"
+
+
+class SpriteCache(object):
+    """
+    Retratos de clase decodificados y escalados una sola vez.
+
+    Cada archivo se lee y decodifica la primera vez que se pide, y cada
+    combinación (job, tamaño) se escala una vez y se guarda; las siguientes
+    peticiones no tocan el disco. Si falta el retrato de una clase se usa el
+    de `default.jpg` y, si tampoco existe, un marcador dibujado en memoria.
+    Debe usarse desde el hilo de la interfaz.
+    """
+
+    def __init__(self, directory=CHARACTERS_DIR):
+        self.directory = directory
+        self._images = {}     # nombre de archivo -> QImage original (None si no se pudo cargar)
+        self._pixmaps = {}    # (job, tamaño) -> QPixmap escalado
+        self.missing = set()  # Archivos que faltan o no se pudieron decodificar
+
+    @staticmethod
+    def sprite_name(job):
+        character_class = CHARACTER_CLASSES.get(job)
+        if character_class is None:
+            return DEFAULT_SPRITE
+        job_type, _, gender_suffix = character_class
+        return f"{job_type}_{gender_suffix}"
+
+    def _image(self, name):
+        if name not in self._images:
+            image = QImage(os.path.join(self.directory, f"{name}.jpg"))
+            if image.isNull():
+                self.missing.add(name)
+                image = None
+            self._images[name] = image
+        return self._images[name]
+
+    @staticmethod
+    def _placeholder(size):
+        pixmap = QPixmap(size, size)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#bdc3c7"))
+        painter.drawRoundedRect(0, 0, size, size, size / 8, size / 8)
+        painter.setPen(QColor("#ffffff"))
+        painter.drawText(pixmap.rect(), Qt.AlignCenter, "?")
+        painter.end()
+        return pixmap
+
+    def pixmap(self, job, size=DEFAULT_SPRITE_SIZE):
+        """Devuelve el retrato de la clase `job` escalado a `size` píxeles (lado mayor)."""
+        if job not in CHARACTER_CLASSES:
+            job = None  # Todas las clases desconocidas comparten el retrato por defecto
+        key = (job, size)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            image = self._image(self.sprite_name(job))
+            if image is None and job is not None:
+                pixmap = self.pixmap(None, size)
+            elif image is None:
+                pixmap = self._placeholder(size)
+            else:
+                pixmap = QPixmap.fromImage(image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            self._pixmaps[key] = pixmap
+        return pixmap
+
+    def preload(self, size=DEFAULT_SPRITE_SIZE):
+        """Decodifica y escala todos los retratos de antemano (por ejemplo, al abrir la página)."""
+        for job in CHARACTER_CLASSES:
+            self.pixmap(job, size)
+        self.pixmap(None, size)
+
+    def clear(self):
+        self._images.clear()
+        self._pixmaps.clear()
+        self.missing.clear()
+
+
+_sprite_cache = None
+
+
+def get_sprite_cache():
+    """Devuelve la caché de retratos compartida (se crea en el primer uso)."""
+    global _sprite_cache
+    if _sprite_cache is None:
+        _sprite_cache = SpriteCache()
+    return _sprite_cache
+
+
+def character_class_name(job):
+    """Nombre de la clase de un personaje a partir de `player.job`."""
+    character_class = CHARACTER_CLASSES.get(job)
+    return character_class[1] if character_class is not None else UNKNOWN_CLASS_NAME
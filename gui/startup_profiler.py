@@ -0,0 +1,147 @@
+# startup_profiler.py
+import builtins
+import os
+import sys
+import time
+
+# Tiempo máximo deseado hasta que se pinta la ventana principal, en milisegundos
+DEFAULT_STARTUP_BUDGET_MS = 1500
+# Variables de entorno: activar el informe completo y cambiar el presupuesto
+PROFILE_ENV_VAR = "METIN2_ADMIN_PROFILE_STARTUP"
+BUDGET_ENV_VAR = "METIN2_ADMIN_STARTUP_BUDGET_MS"
+PROFILE_ARGUMENT = "--profile-startup"
+# Importaciones que se muestran en el informe (las más lentas por tiempo propio)
+REPORT_TOP_IMPORTS = 15
+
+
+class StartupProfiler(object):
+    """
+    Mide el arranque de la aplicación.
+
+    Siempre guarda marcas de tiempo (ms desde que se creó el medidor) de
+    las fases del arranque, lo que no cuesta nada. Con `profile_imports=True`
+    además sustituye `__import__` para medir cuánto tarda cada módulo que se
+    importa por primera vez, separando su tiempo propio del de los módulos que
+    importa a su vez.
+    """
+
+    def __init__(self, budget_ms=DEFAULT_STARTUP_BUDGET_MS, profile_imports=False):
+        self.started = time.perf_counter()
+        self.budget_ms = budget_ms
+        self.profile_imports = profile_imports
+        self.marks = []            # Lista de (nombre, ms desde el inicio)
+        self.import_times = {}     # módulo -> [ms acumulado, ms propio]
+        self._import_stack = []    # Tiempo de los hijos de cada importación en curso
+        self._original_import = None
+        self._reported = False
+        if profile_imports:
+            self.install_import_hook()
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def mark(self, name):
+        """Guarda el instante en que termina una fase del arranque."""
+        self.marks.append((name, self.elapsed_ms()))
+
+    def install_import_hook(self):
+        if self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        original_import = self._original_import
+        import_times = self.import_times
+        stack = self._import_stack
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            # Solo interesan las importaciones que cargan algo nuevo
+            if level or name in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+            stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                total = (time.perf_counter() - started) * 1000
+                children = stack.pop()
+                if stack:
+                    stack[-1] += total
+                if name not in import_times:
+                    import_times[name] = [total, total - children]
+
+        builtins.__import__ = timed_import
+
+    def uninstall_import_hook(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def report(self):
+        """Devuelve el informe de arranque como texto."""
+        lines = ["Arranque de la aplicación:"]
+        previous = 0.0
+        for name, at in self.marks:
+            lines.append(f"  {name:<32} {at:8.1f} ms  (+{at - previous:.1f} ms)")
+            previous = at
+
+        if self.import_times:
+            slowest = sorted(self.import_times.items(), key=lambda item: item[1][1], reverse=True)
+            lines.append(f"  Importaciones más lentas (tiempo propio / acumulado), {len(self.import_times)} módulos:")
+            for name, (total, own) in slowest[:REPORT_TOP_IMPORTS]:
+                lines.append(f"    {name:<40} {own:8.1f} ms {total:8.1f} ms")
+        return "\n".join(lines)
+
+    def finish(self, name="primer pintado"):
+        """
+        Cierra la medición: guarda la última marca, informa y devuelve el tiempo total en ms.
+
+        El informe completo solo se imprime si se pidió; si se supera el
+        presupuesto se avisa siempre con una línea.
+        """
+        if self._reported:
+            return None
+        self._reported = True
+        self.mark(name)
+        self.uninstall_import_hook()
+        total = self.marks[-1][1]
+
+        if self.profile_imports:
+            print(self.report())
+        if total > self.budget_ms:
+            print(f"Aviso: el arranque tardó {total:.0f} ms (presupuesto: {self.budget_ms} ms). "
+                  f"Use {PROFILE_ARGUMENT} para ver el detalle.")
+        return total
+
+    def watch_first_paint(self, widget):
+        """Llama a `finish()` cuando termina el primer pintado de `widget`."""
+        from PyQt5.QtCore import QObject, QEvent, QTimer
+
+        profiler = self
+
+        class _FirstPaintFilter(QObject):
+            def eventFilter(self, watched, event):
+                if event.type() == QEvent.Paint:
+                    watched.removeEventFilter(self)
+                    # Medir cuando termina el pintado, no cuando empieza
+                    QTimer.singleShot(0, profiler.finish)
+                return False
+
+        self._paint_filter = _FirstPaintFilter(widget)
+        widget.installEventFilter(self._paint_filter)
+
+
+def create_profiler(argv=None):
+    """
+    Crea el medidor de arranque a partir de la línea de comandos y el entorno.
+
+    El informe completo (con el desglose de importaciones) se activa con
+    `--profile-startup` o con la variable de entorno METIN2_ADMIN_PROFILE_STARTUP=1.
+    """
+    argv = sys.argv if argv is None else argv
+    profile_imports = PROFILE_ARGUMENT in argv or os.environ.get(PROFILE_ENV_VAR, "") not in ("", "0")
+    if PROFILE_ARGUMENT in argv:
+        argv.remove(PROFILE_ARGUMENT)
+    try:
+        budget_ms = int(os.environ.get(BUDGET_ENV_VAR, DEFAULT_STARTUP_BUDGET_MS))
+    except ValueError:
+        budget_ms = DEFAULT_STARTUP_BUDGET_MS
+    return StartupProfiler(budget_ms=budget_ms, profile_imports=profile_imports)
@@ -1,92 +1,69 @@
 # statistics_dashboard.py
-import pymysql
-import json
-import os
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QFormLayout, QLineEdit, QPushButton, QMessageBox, QLabel, QMainWindow
-
-
-CONFIG_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'server_config.json')
-
-def load_db_config():
-    """Carga la configuración de la base de datos desde el archivo 'server_config.json'."""
-    try:
-        with open(CONFIG_FILE_PATH, 'r') as config_file:
-            db_config = json.load(config_file)
-        return db_config
-    except Exception as e:
-        print(f"Error al cargar la configuración de la base de datos: {e}")
-        return None
-
-def connect_to_database(db_name):
-    """Conecta a la base de datos usando la configuración cargada desde 'server_config.json'."""
-    db_config = load_db_config()
-
-    if not db_config:
-        return None, "No se pudo cargar la configuración de la base de datos"
-
-    try:
-        connection = pymysql.connect(
-            host=db_config['host'],
-            user=db_config['user'],
-            password=db_config['password'],
-            port=db_config['port'],
-            database=db_name,
-            cursorclass=pymysql.cursors.DictCursor
-        )
-        return connection, None
-    except Exception as e:
-        return None, str(e)
-    
-def get_server_statistics():
-    try:
-        connection_account, error_account = connect_to_database(load_db_config()["db_account_name"])
-        connection_player, error_player = connect_to_database(load_db_config()["db_player_name"])
-
-        if error_account:
-            return None, error_account
-        if error_player:
-            return None, error_player
-
-        with connection_account.cursor() as cursor:
-            # Cuentas creadas
-            cursor.execute("SELECT COUNT(*) AS total_accounts FROM account")
-            total_accounts = cursor.fetchone()["total_accounts"]
-
-            # Cuentas creadas en los últimos 10 minutos
-            ten_minutes_ago = datetime.now() - timedelta(minutes=10)
-            cursor.execute("SELECT COUNT(*) AS accounts_created_last_10_min FROM account WHERE create_time >= %s", (ten_minutes_ago,))
-            accounts_created_last_10_min = cursor.fetchone()["accounts_created_last_10_min"]
-
-        with connection_player.cursor() as cursor:
-            # Total de personajes creados
-            cursor.execute("SELECT COUNT(*) AS total_characters FROM player")
-            total_characters = cursor.fetchone()["total_characters"]
-
-            # Personajes activos en los últimos 10 minutos
-            cursor.execute("SELECT COUNT(DISTINCT account_id) AS active_users_last_10_min FROM player WHERE last_play >= %s", (ten_minutes_ago,))
-            active_users_last_10_min = cursor.fetchone()["active_users_last_10_min"]
-
-        return {
-            "total_accounts": total_accounts,
-            "total_characters": total_characters,
-            "accounts_created_last_10_min": accounts_created_last_10_min,
-            "active_users_last_10_min": active_users_last_10_min
-        }, None
-
-    except Exception as e:
-        return None, str(e)
-    finally:
-        if connection_account:
-            connection_account.close()
-        if connection_player:
-            connection_player.close()
+from collections import deque
+from datetime import datetime
+import time
+import numpy as np
+import pyqtgraph as pg
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QComboBox, QCheckBox, QSpinBox
+from backend.database import get_server_statistics
+from backend.statistics_history import get_statistics_history
+from gui.query_executor import get_executor
+
+# Métricas del histórico que se pueden elegir en el panel
+HISTORY_METRICS = [
+    ("total_accounts", "Total de cuentas"),
+    ("total_characters", "Total de personajes"),
+    ("online_characters", "Personajes en línea"),
+    ("active_users_last_10_min", "Usuarios activos (10 min)"),
+    ("accounts_created_last_10_min", "Cuentas nuevas (10 min)"),
+]
+
+# Rangos de tiempo del histórico (etiqueta, segundos)
+HISTORY_RANGES = [
+    ("Última hora", 3600),
+    ("Últimas 24 horas", 86400),
+    ("Últimos 7 días", 7 * 86400),
+    ("Últimos 30 días", 30 * 86400),
+    ("Último año", 365 * 86400),
+]
+
+# Gráficas de barras: (clave de la estadística, título)
+BAR_CHARTS = [
+    ("total_accounts", "Total de cuentas creadas"),
+    ("total_characters", "Total de personajes creados"),
+    ("active_users_last_10_min", "PJ activos  últimos 10 min"),
+]
+
+# Series de la gráfica en directo: (clave de la estadística, nombre, color)
+LIVE_SERIES = [
+    ("online_characters", "En línea", "#2980b9"),
+    ("active_users_last_10_min", "Activos (10 min)", "#27ae60"),
+    ("accounts_created_last_10_min", "Cuentas nuevas (10 min)", "#c0392b"),
+]
+
+# Muestras que conserva la gráfica en directo
+LIVE_MAX_SAMPLES = 600
+# Intervalo por defecto de la actualización automática, en segundos
+DEFAULT_REFRESH_SECONDS = 10
+
+BAR_COLOR = "#333333"
+
 
 class StatisticsDashboard(QWidget):
+    """
+    Panel de estadísticas basado en pyqtgraph.
+
+    Los elementos de las gráficas se crean una sola vez en `init_ui`; cada
+    refresco solo cambia sus datos (`setOpts`/`setData`), sin volver a construir
+    ejes ni lienzos.
+    """
+
     def __init__(self):
         super().__init__()
+        self.history_handle = None
+        self.live_times = deque(maxlen=LIVE_MAX_SAMPLES)
+        self.live_values = {key: deque(maxlen=LIVE_MAX_SAMPLES) for key, _, _ in LIVE_SERIES}
         self.init_ui()
 
     def init_ui(self):
@@ -94,27 +71,153 @@ class StatisticsDashboard(QWidget):
         self.statistics_label = QLabel("Cargando estadísticas del servidor...")
         layout.addWidget(self.statistics_label)
 
+        # Actualización automática
+        refresh_controls = QHBoxLayout()
+        self.auto_refresh_checkbox = QCheckBox("Actualización automática cada")
+        self.auto_refresh_checkbox.setChecked(True)
+        self.refresh_interval_spin = QSpinBox()
+        self.refresh_interval_spin.setRange(1, 3600)
+        self.refresh_interval_spin.setValue(DEFAULT_REFRESH_SECONDS)
+        self.refresh_interval_spin.setSuffix(" s")
+        self.refresh_button = QPushButton("Actualizar")
+        self.refresh_button.clicked.connect(self.update_statistics)
+        refresh_controls.addWidget(self.auto_refresh_checkbox)
+        refresh_controls.addWidget(self.refresh_interval_spin)
+        refresh_controls.addWidget(self.refresh_button)
+        refresh_controls.addStretch()
+        layout.addLayout(refresh_controls)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.update_statistics)
+        self.auto_refresh_checkbox.toggled.connect(self.apply_refresh_settings)
+        self.refresh_interval_spin.valueChanged.connect(self.apply_refresh_settings)
+
         # Contenedor de diseño para organizar las gráficas horizontalmente
         charts_layout = QHBoxLayout()
 
-        # Espacio para las tres gráficas
-        self.canvas_accounts = FigureCanvas(plt.figure())
-        self.canvas_characters = FigureCanvas(plt.figure())
-        self.canvas_active_players = FigureCanvas(plt.figure())
-
-        # Añadir los gráficos al contenedor horizontal
-        charts_layout.addWidget(self.canvas_accounts)
-        charts_layout.addWidget(self.canvas_characters)
-        charts_layout.addWidget(self.canvas_active_players)
+        # Una gráfica de barras por cifra; se reutilizan en cada refresco
+        self.bar_items = {}
+        self.bar_labels = {}
+        for key, title in BAR_CHARTS:
+            plot = pg.PlotWidget(title=title)
+            plot.setMenuEnabled(False)
+            plot.setMouseEnabled(x=False, y=False)
+            plot.hideAxis('bottom')
+            plot.setLabel('left', 'Cantidad')
+            plot.setXRange(-0.6, 0.6, padding=0)
+            bar = pg.BarGraphItem(x=[0], height=[0], width=0.6, brush=BAR_COLOR)
+            label = pg.TextItem("", anchor=(0.5, 1.2), color="#333333")
+            plot.addItem(bar)
+            plot.addItem(label)
+            self.bar_items[key] = bar
+            self.bar_labels[key] = label
+            charts_layout.addWidget(plot)
 
         # Añadir el layout de gráficos al layout principal
         layout.addLayout(charts_layout)
 
+        # Gráfica en directo con los últimos refrescos
+        self.live_plot = pg.PlotWidget(title="En directo", axisItems={'bottom': pg.DateAxisItem()})
+        self.live_plot.addLegend()
+        self.live_plot.showGrid(x=True, y=True, alpha=0.2)
+        self.live_curves = {}
+        for key, name, color in LIVE_SERIES:
+            self.live_curves[key] = self.live_plot.plot([], [], name=name, pen=pg.mkPen(color, width=2))
+        layout.addWidget(self.live_plot)
+
+        # Histórico: métrica y rango de tiempo a mostrar
+        history_controls = QHBoxLayout()
+        self.history_metric_combo = QComboBox()
+        for metric, label in HISTORY_METRICS:
+            self.history_metric_combo.addItem(label, metric)
+        self.history_range_combo = QComboBox()
+        for label, seconds in HISTORY_RANGES:
+            self.history_range_combo.addItem(label, seconds)
+        self.history_metric_combo.currentIndexChanged.connect(self.update_history)
+        self.history_range_combo.currentIndexChanged.connect(self.update_history)
+        history_controls.addWidget(QLabel("Histórico:"))
+        history_controls.addWidget(self.history_metric_combo)
+        history_controls.addWidget(self.history_range_combo)
+        history_controls.addStretch()
+        layout.addLayout(history_controls)
+
+        self.history_plot = pg.PlotWidget(axisItems={'bottom': pg.DateAxisItem()})
+        self.history_plot.addLegend()
+        self.history_plot.showGrid(x=True, y=True, alpha=0.2)
+        self.history_min_curve = self.history_plot.plot([], [], pen=pg.mkPen("#999999"))
+        self.history_max_curve = self.history_plot.plot([], [], pen=pg.mkPen("#999999"))
+        self.history_band = pg.FillBetweenItem(self.history_min_curve, self.history_max_curve, brush=pg.mkBrush(153, 153, 153, 100))
+        self.history_plot.addItem(self.history_band)
+        self.history_avg_curve = self.history_plot.plot([], [], name="Media", pen=pg.mkPen("#333333", width=2))
+        layout.addWidget(self.history_plot)
+
         self.setLayout(layout)
         self.update_statistics()
+        self.update_history()
+        self.apply_refresh_settings()
+
+    def apply_refresh_settings(self):
+        if self.auto_refresh_checkbox.isChecked():
+            self.refresh_timer.start(self.refresh_interval_spin.value() * 1000)
+        else:
+            self.refresh_timer.stop()
+
+    def refresh_view(self):
+        self.update_statistics()
+        self.update_history()
+
+    def showEvent(self, event):
+        self.apply_refresh_settings()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        # No consultar la base de datos mientras el panel no se ve
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def update_history(self):
+        metric = self.history_metric_combo.currentData()
+        seconds = self.history_range_combo.currentData()
+        end = time.time()
+        self.history_handle = get_executor().submit(get_statistics_history().get_series, metric, end - seconds, end,
+                                                    key=("statistics_history", metric, seconds))
+        self.history_handle.finished.connect(self.on_history_loaded)
+        self.history_handle.failed.connect(self.on_history_failed)
+
+    def on_history_failed(self, error):
+        self.statistics_label.setText(f"Error al leer el histórico de estadísticas: {error}")
+
+    def on_history_loaded(self, result):
+        # Ignorar respuestas de una métrica o rango que ya no está seleccionado
+        if self.sender() is not self.history_handle:
+            return
+        resolution, buckets = result
+        self.plot_history(resolution, buckets)
+
+    def plot_history(self, resolution, buckets):
+        """Muestra mínimo, media y máximo de cada cubo ya agregado del histórico."""
+        self.history_plot.setTitle(self.history_metric_combo.currentText())
+        if buckets:
+            data = np.array(buckets, dtype=float)
+            times = data[:, 0] + resolution / 2
+            self.history_min_curve.setData(times, data[:, 1])
+            self.history_avg_curve.setData(times, data[:, 2])
+            self.history_max_curve.setData(times, data[:, 3])
+        else:
+            for curve in (self.history_min_curve, self.history_avg_curve, self.history_max_curve):
+                curve.setData([], [])
 
     def update_statistics(self):
-        stats, error = get_server_statistics()
+        # Los refrescos que llegan mientras otro está en curso se agrupan en la misma consulta
+        handle = get_executor().submit(get_server_statistics, key="server_statistics")
+        handle.finished.connect(self.on_statistics_loaded)
+        handle.failed.connect(self.on_statistics_failed)
+
+    def on_statistics_failed(self, error):
+        self.statistics_label.setText(f"Error al obtener las estadísticas: {error}")
+
+    def on_statistics_loaded(self, result):
+        stats, error = result
         if error:
             self.statistics_label.setText(f"Error al obtener las estadísticas: {error}")
             return
@@ -122,136 +225,38 @@ class StatisticsDashboard(QWidget):
         self.statistics_label.setText(
             f"Total cuentas creadas: {stats['total_accounts']}\n"
             f"Total personajes creados: {stats['total_characters']}\n"
-            f"Usuarios activos (últimos 10 minutos): {stats['active_users_last_10_min']}"
+            f"Usuarios activos (últimos 10 minutos): {stats['active_users_last_10_min']}\n"
+            f"Personajes en línea: {stats['online_characters']} "
+            f"(actualizado {datetime.now().strftime('%H:%M:%S')})"
+            + self.format_realms(stats)
         )
 
         # Graficar las estadísticas
         self.plot_statistics(stats)
 
+    @staticmethod
+    def format_realms(stats):
+        """Desglose por reino cuando hay varios (las cifras de arriba son la suma)."""
+        realms = stats.get("realms") or {}
+        errors = stats.get("realm_errors") or {}
+        if len(realms) + len(errors) < 2:
+            return ""
+        lines = [f"{realm}: {realm_stats['online_characters']} en línea, {realm_stats['total_accounts']} cuentas"
+                 for realm, realm_stats in realms.items()]
+        lines += [f"{realm}: sin respuesta ({error})" for realm, error in errors.items()]
+        return "\n\nPor reino:\n" + "\n".join(lines)
+
     def plot_statistics(self, stats):
-        # Limpiar gráficos anteriores
-        self.canvas_accounts.figure.clear()
-        self.canvas_characters.figure.clear()
-        self.canvas_active_players.figure.clear()
-
-        # Definir un color para las barras
-        bar_color = "#333333"
-
-        # Gráfica de cuentas creadas
-        ax1 = self.canvas_accounts.figure.add_subplot(111)
-        ax1.bar(['Total de cuentas creadas'], [stats['total_accounts']], color=bar_color)
-        ax1.set_title('Total de cuentas creadas', fontsize=10, fontweight='bold', pad=10)
-        ax1.set_ylabel('Cantidad', fontsize=8)
-        ax1.set_xticks([])  # Ocultar las marcas en el eje x
-        ax1.title.set_position([.5, 1.05])
-
-        # Gráfica de personajes creados
-        ax2 = self.canvas_characters.figure.add_subplot(111)
-        ax2.bar(['Total de personajes creados'], [stats['total_characters']], color=bar_color)
-        ax2.set_title('Total de personajes creados', fontsize=10, fontweight='bold', pad=10)
-        ax2.set_ylabel('Cantidad', fontsize=8)
-        ax2.set_xticks([])  # Ocultar las marcas en el eje x
-        ax2.title.set_position([.5, 1.05])
-
-        # Gráfica de personajes activos en los últimos 10 minutos
-        ax3 = self.canvas_active_players.figure.add_subplot(111)
-        ax3.bar(['Personajes activos últimos 10 min'], [stats['active_users_last_10_min']], color=bar_color)
-        ax3.set_title('PJ activos  últimos 10 min', fontsize=10, fontweight='bold', pad=10)
-        ax3.set_ylabel('Cantidad', fontsize=8)
-        ax3.set_xticks([])  # Ocultar las marcas en el eje x
-        ax3.title.set_position([.5, 1.05])
-
-        # Añadir etiquetas a las barras para mostrar valores exactos
-        ax1.bar_label(ax1.containers[0], label_type='edge', fontsize=8, fontweight='bold', color='white')
-        ax2.bar_label(ax2.containers[0], label_type='edge', fontsize=8, fontweight='bold', color='white')
-        ax3.bar_label(ax3.containers[0], label_type='edge', fontsize=8, fontweight='bold', color='white')
-
-        # Actualizar los gráficos
-        self.canvas_accounts.draw()
-        self.canvas_characters.draw()
-        self.canvas_active_players.draw()
-        
-    class ServerConfigWidget(QWidget):
-        def __init__(self):
-            super().__init__()
-            self.init_ui()
-
-        def init_ui(self):
-            self.setWindowTitle("Configuración del Servidor")
-            self.layout = QFormLayout()
-
-            # Campos para la configuración del servidor
-            self.host_input = QLineEdit()
-            self.port_input = QLineEdit()
-            self.user_input = QLineEdit()
-            self.password_input = QLineEdit()
-            self.db_account_name_input = QLineEdit()
-            self.db_common_name_input = QLineEdit()
-            self.db_player_name_input = QLineEdit()
-
-            # Botón para guardar la configuración
-            self.save_button = QPushButton("Guardar Configuración")
-            self.save_button.clicked.connect(self.save_config)
-
-            # Añadir campos al layout
-            self.layout.addRow("Host del Servidor", self.host_input)
-            self.layout.addRow("Puerto de BD", self.port_input)
-            self.layout.addRow("Usuario de BD", self.user_input)
-            self.layout.addRow("Contraseña de BD", self.password_input)
-            self.layout.addRow("Nombre de Base de Datos de Cuentas", self.db_account_name_input)
-            self.layout.addRow("Nombre de Base de Datos Común", self.db_common_name_input)
-            self.layout.addRow("Nombre de Base de Datos de Jugadores", self.db_player_name_input)
-            self.layout.addRow(self.save_button)
-
-            self.setLayout(self.layout)
-            self.load_config()
-
-        def load_config(self):
-            config = load_server_config()
-            if config:
-                self.host_input.setText(config.get("host", ""))
-                self.port_input.setText(str(config.get("port", "")))
-                self.user_input.setText(config.get("user", ""))
-                self.password_input.setText(config.get("password", ""))
-                self.db_account_name_input.setText(config.get("db_account_name", ""))
-                self.db_common_name_input.setText(config.get("db_common_name", ""))
-                self.db_player_name_input.setText(config.get("db_player_name", ""))
-
-        def save_config(self):
-            config = {
-                "host": self.host_input.text(),
-                "port": int(self.port_input.text()),
-                "user": self.user_input.text(),
-                "password": self.password_input.text(),
-                "db_account_name": self.db_account_name_input.text(),
-                "db_common_name": self.db_common_name_input.text(),
-                "db_player_name": self.db_player_name_input.text(),
-                "theme": "light",  # Este valor se puede ajustar según la aplicación
-                "language": "es"   # Este valor se puede ajustar según la aplicación
-            }
-            save_server_config(config)
-            QMessageBox.information(self, "Éxito", "Configuración guardada correctamente.")
-
-    class MainApp(QMainWindow):
-        def __init__(self):
-            super().__init__()
-            self.init_ui()
-
-        def init_ui(self):
-            self.setWindowTitle("Administración del Servidor de Metin2")
-            self.setGeometry(100, 100, 800, 600)
-
-            # Crear menú de configuración
-            menubar = self.menuBar()
-            config_menu = menubar.addMenu("Configuración")
-
-            # Acción de configuración del servidor
-            server_config_action = QAction("Configuración del Servidor", self)
-            server_config_action.triggered.connect(self.open_server_config)
-            config_menu.addAction(server_config_action)
-
-            # Otras acciones del menú...
-
-        def open_server_config(self):
-            self.server_config_widget = ServerConfigWidget()
-            self.server_config_widget.show()
\ No newline at end of file
+        """Actualiza los datos de las gráficas existentes con una nueva muestra."""
+        for key, _ in BAR_CHARTS:
+            value = stats[key]
+            self.bar_items[key].setOpts(height=[value])
+            self.bar_labels[key].setText(str(value))
+            self.bar_labels[key].setPos(0, value)
+
+        self.live_times.append(time.time())
+        times = np.fromiter(self.live_times, dtype=float, count=len(self.live_times))
+        for key, _, _ in LIVE_SERIES:
+            values = self.live_values[key]
+            values.append(stats.get(key, 0))
+            self.live_curves[key].setData(times, np.fromiter(values, dtype=float, count=len(values)))
@@ -0,0 +1,103 @@
+# translations.py
+import json
+import os
+
+# Catálogo de textos de la interfaz (relativo al proyecto, no al directorio de trabajo)
+TRANSLATIONS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'translations.json')
+DEFAULT_LANGUAGE = "es"
+# Nombre de cada idioma en el selector
+LANGUAGE_NAMES = {
+    "es": "Español",
+    "en": "English",
+}
+
+
+class TranslationService(object):
+    """
+    Textos de la interfaz en el idioma elegido.
+
+    El catálogo se lee una sola vez. Cada idioma se "compila" la primera vez
+    que se usa en un único diccionario que ya incluye los textos del idioma por
+    defecto para las claves que le falten, así que una búsqueda es un acceso a
+    diccionario. Cambiar de idioma solo cambia el diccionario activo y avisa a
+    los suscriptores para que vuelvan a poner sus textos.
+    """
+
+    def __init__(self, path=TRANSLATIONS_FILE, language=DEFAULT_LANGUAGE):
+        self.path = path
+        self._catalog = None
+        self._compiled = {}
+        self._subscribers = []
+        self.language = language
+        self._texts = {}
+
+    def _load_catalog(self):
+        if self._catalog is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._catalog = json.load(f)
+            except Exception as e:
+                print(f"Error al cargar las traducciones: {e}")
+                self._catalog = {}
+        return self._catalog
+
+    def _compile(self, language):
+        texts = self._compiled.get(language)
+        if texts is None:
+            catalog = self._load_catalog()
+            texts = dict(catalog.get(DEFAULT_LANGUAGE, {}))
+            texts.update(catalog.get(language, {}))
+            self._compiled[language] = texts
+        return texts
+
+    def languages(self):
+        """Idiomas disponibles en el catálogo."""
+        return list(self._load_catalog()) or [DEFAULT_LANGUAGE]
+
+    def set_language(self, language):
+        """
+        Cambia el idioma activo sin volver a leer el archivo.
+
+        :return: True si el idioma cambió.
+        """
+        if language not in self._load_catalog():
+            language = DEFAULT_LANGUAGE
+        texts = self._compile(language)
+        if language == self.language and texts is self._texts:
+            return False
+        self.language = language
+        self._texts = texts
+        for callback in list(self._subscribers):
+            callback(language)
+        return True
+
+    def get(self, key, default=None):
+        """Devuelve el texto de `key`, o `default` (o la propia clave) si no existe."""
+        texts = self._texts or self._compile(self.language)
+        text = texts.get(key)
+        if text is None:
+            return default if default is not None else key
+        return text
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def subscribe(self, callback):
+        """Registra `callback(idioma)`, que se llama al cambiar de idioma."""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+
+_service = None
+
+
+def get_translations():
+    """Devuelve el servicio de traducciones compartido (se crea en el primer uso)."""
+    global _service
+    if _service is None:
+        _service = TranslationService()
+    return _service
@@ -1,56 +1,187 @@
 # user_management.py
-import os
 import datetime
-from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout, QPushButton, QComboBox, QTableWidgetItem, QMessageBox, QWidget, QTableWidget, QLabel, QHeaderView, QLineEdit
+from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout, QPushButton, QComboBox, QTableWidgetItem, QMessageBox, QWidget, QTableWidget, QTableView, QAbstractItemView, QLabel, QHeaderView, QLineEdit, QProgressBar
 from PyQt5.QtGui import QIcon
-from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt
-from backend.database import get_all_accounts, get_all_characters
+from PyQt5.QtCore import Qt, QTimer, QSize
+from backend.database import get_accounts_page
+from backend.character_cache import get_character_cache
+from backend.connection_pool import get_active_realm
 from backend.gm_manager import create_gm
+from backend.account_search import AccountSearchIndex
+from gui.account_table_model import AccountTableModel, StatusDelegate, ACCOUNT_STATUSES
+from gui.query_executor import get_executor
+from gui.sprite_cache import get_sprite_cache, character_class_name
+from gui.translations import get_translations
 from datetime import datetime
 
+# Milisegundos sin escribir antes de aplicar el filtro de búsqueda
+SEARCH_DEBOUNCE_MS = 150
+# Milisegundos sin desplazarse antes de precargar los personajes de las filas visibles
+PREFETCH_DELAY_MS = 200
+# Lado en píxeles de los retratos de clase en la tabla de personajes
+CHARACTER_SPRITE_SIZE = 50
+
 class UserManagementWidget(QWidget):
     def __init__(self):
         super(UserManagementWidget, self).__init__()
         self.all_accounts = []  # Inicializa la lista vacía de cuentas aquí
-        self.translations = self.load_translations()  # Cargar las traducciones al inicializar
+        self.last_account_id = 0  # Último id cargado, para pedir la página siguiente
+        self.total_accounts = None
+        self.fetching_accounts = False
+        self.search_index = AccountSearchIndex()
+        self.executor = get_executor()  # Las consultas se ejecutan fuera del hilo de la interfaz
+        self.pending_status_updates = {}
+        self.more_accounts_handle = None
+        self.bulk_status_handle = None
+        self.characters_handle = None
+        self.characters_account = None
+        self.accounts_handle = None
+        # Reino de las cuentas mostradas; se actualiza al recargar la lista
+        self.realm = get_active_realm()
+        self.character_cache = get_character_cache(self.realm)
+        self.sprite_cache = get_sprite_cache()
+        self.translations = get_translations()  # Textos en el idioma activo
         self.init_ui()
         self.load_accounts()  # Carga las cuentas cuando se inicializa la interfaz
   
     def update_account_status(self, account_id, new_status):
         """
-        Actualiza el estado de la cuenta en la base de datos.
+        Actualiza el estado de la cuenta en la base de datos (en segundo plano).
         
         :param account_id: ID de la cuenta a actualizar.
         :param new_status: Nuevo estado (OK o BLOCK).
         """
         from backend.account_manager import update_account_status_in_db
-        try:
-            update_account_status_in_db(account_id, new_status)
-            QMessageBox.information(self, "Éxito", f"Estado de la cuenta {account_id} actualizado a '{new_status}'")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo actualizar el estado de la cuenta: {e}") 
+        handle = self.executor.submit(update_account_status_in_db, account_id, new_status, realm=self.realm,
+                                      key=("account_status", self.realm, account_id, new_status))
+        self.pending_status_updates[handle] = (account_id, new_status)
+        handle.finished.connect(self.on_account_status_updated)
+        handle.failed.connect(self.on_account_status_failed)
+
+    def on_account_status_updated(self, _result):
+        account_id, new_status = self.pending_status_updates.pop(self.sender(), (None, None))
+        if account_id is None:
+            return
+        self.accounts_model.set_account_status(account_id, new_status)
+        QMessageBox.information(self, "Éxito", f"Estado de la cuenta {account_id} actualizado a '{new_status}'")
+
+    def on_account_status_failed(self, error):
+        self.pending_status_updates.pop(self.sender(), None)
+        QMessageBox.critical(self, "Error", f"No se pudo actualizar el estado de la cuenta: {error}")
         
+    def update_selected_accounts_status(self):
+        """Cambia el estado de todas las cuentas seleccionadas en una sola transacción."""
+        rows = self.accounts_table.selectionModel().selectedRows()
+        if not rows:
+            QMessageBox.information(self, "Información", "Seleccione al menos una cuenta.")
+            return
+
+        account_ids = [self.accounts_model.account_at(index.row())["id"] for index in rows]
+        new_status = self.bulk_status_combobox.currentText()
+        reply = QMessageBox.question(self, "Confirmar", f"¿Cambiar el estado de {len(account_ids)} cuentas a '{new_status}'?",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+
+        from backend.account_manager import update_accounts_status_bulk
+        self.bulk_status_button.setEnabled(False)
+        self.bulk_progress_bar.setRange(0, len(account_ids))
+        self.bulk_progress_bar.setValue(0)
+        self.bulk_progress_bar.show()
+        self.bulk_cancel_button.show()
+
+        self.bulk_status_handle = self.executor.submit(update_accounts_status_bulk, account_ids, new_status,
+                                                       realm=self.realm, with_progress=True)
+        self.bulk_status_new_status = new_status
+        self.bulk_status_handle.progress.connect(self.on_bulk_status_progress)
+        self.bulk_status_handle.finished.connect(self.on_bulk_status_updated)
+        self.bulk_status_handle.failed.connect(self.on_bulk_status_failed)
+        self.bulk_status_handle.cancelled.connect(self.on_bulk_status_cancelled)
+
+    def cancel_bulk_status_update(self):
+        if self.bulk_status_handle is not None:
+            self.bulk_status_handle.cancel()
+
+    def on_bulk_status_progress(self, done, total):
+        self.bulk_progress_bar.setValue(done)
+
+    def finish_bulk_status_update(self):
+        self.bulk_status_handle = None
+        self.bulk_status_button.setEnabled(True)
+        self.bulk_progress_bar.hide()
+        self.bulk_cancel_button.hide()
+
+    def on_bulk_status_updated(self, changed_ids):
+        new_status = self.bulk_status_new_status
+        self.finish_bulk_status_update()
+        self.accounts_model.set_accounts_status(changed_ids, new_status)
+        QMessageBox.information(self, "Éxito", f"Estado actualizado a '{new_status}' en {len(changed_ids)} cuentas.")
+
+    def on_bulk_status_failed(self, error):
+        self.finish_bulk_status_update()
+        QMessageBox.critical(self, "Error", f"No se pudo actualizar el estado de las cuentas: {error}")
+
+    def on_bulk_status_cancelled(self):
+        self.finish_bulk_status_update()
+        QMessageBox.information(self, "Información", "Cambio de estado cancelado. No se modificó ninguna cuenta.")
+
     def create_gm_action(self, account_name, character_name, authority_level):
         """
         Conecta la lógica para crear o actualizar un GM usando la función `create_gm()` de gm_manager.py.
         """
-        create_gm(account_name, character_name, authority_level)
-        
-    def load_translations(self):
-        # Este método se asegura de cargar las traducciones.
-        import json
-        with open('translations.json', 'r', encoding='utf-8') as file:
-            translations = json.load(file)
-        return translations.get("es", {})  # Utiliza 'es' como el idioma predeterminado, cambia si es necesario
+        handle = self.executor.submit(create_gm, account_name, character_name, authority_level, realm=self.realm,
+                                      key=("create_gm", self.realm, account_name, character_name, authority_level))
+        handle.finished.connect(lambda result: self.on_gm_created(character_name, result))
+        handle.failed.connect(self.on_gm_create_failed)
+
+    def on_gm_created(self, character_name, result):
+        action, error = result
+        if error:
+            QMessageBox.critical(self, "Error", f"No se pudo crear el GM: {error}")
+            return
+        verb = "creado" if action == "created" else "actualizado"
+        QMessageBox.information(self, "Éxito", f"GM '{character_name}' {verb} correctamente.")
+
+    def on_gm_create_failed(self, error):
+        QMessageBox.critical(self, "Error", f"No se pudo crear el GM: {error}")
+
+    def account_headers(self):
+        return [
+            self.translations["account_id"],
+            self.translations["name"],
+            self.translations["status_label"],
+            self.translations["created_at"],
+        ]
+
+    def character_headers(self):
+        return [
+            self.translations["character_name"],
+            self.translations["character_type"],
+            self.translations["character_gender_label"],
+            self.translations["character_last_play"],
+            "Crear GM"
+        ]
+
+    def retranslate_ui(self):
+        """Vuelve a poner los textos tras un cambio de idioma, sin recargar los datos."""
+        self.load_accounts_button.setText(self.translations["load_accounts_button"])
+        self.associated_characters_label.setText(self.translations["associated_characters"])
+        self.accounts_model.set_headers(self.account_headers())
+        if self.characters_table.columnCount():
+            self.characters_table.setHorizontalHeaderLabels(self.character_headers())
 
     def init_ui(self):
         layout = QVBoxLayout()
 
         # Barra de búsqueda para cuentas
         self.account_search_box = QLineEdit()
-        self.account_search_box.setPlaceholderText("Buscar cuenta por usuario...")
-        self.account_search_box.textChanged.connect(self.filter_accounts)  # Filtrar en tiempo real mientras se escribe
+        self.account_search_box.setPlaceholderText("Buscar cuenta por usuario o ID...")
+        # Filtrar cuando el usuario deja de escribir, no en cada pulsación
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.filter_accounts)
+        self.account_search_box.textChanged.connect(self.search_timer.start)
 
         # Añadir la barra de búsqueda al layout
         layout.addWidget(self.account_search_box)
@@ -60,173 +191,240 @@ class UserManagementWidget(QWidget):
         self.load_accounts_button.clicked.connect(self.load_accounts)
         layout.addWidget(self.load_accounts_button)
 
-        # Tabla de cuentas
-        self.accounts_table = QTableWidget()
-        self.accounts_table.setColumnCount(4)
-        self.accounts_table.setHorizontalHeaderLabels([
-            self.translations["account_id"],
-            self.translations["name"],
-            self.translations["status_label"],
-            self.translations["created_at"],
-        ])
-        self.accounts_table.cellClicked.connect(self.load_characters)
+        # Tabla de cuentas: modelo/vista, solo se pintan las filas visibles
+        self.accounts_model = AccountTableModel(self.account_headers(), self)
+        self.accounts_model.fetch_more_callback = self.fetch_more_accounts
+        # En cola: el diálogo de confirmación no debe abrirse dentro del commit del editor
+        self.accounts_model.status_change_requested.connect(self.update_account_status, Qt.QueuedConnection)
+
+        self.accounts_table = QTableView()
+        self.accounts_table.setModel(self.accounts_model)
+        self.accounts_table.setItemDelegateForColumn(AccountTableModel.STATUS_COLUMN, StatusDelegate(self.accounts_table))
+        self.accounts_table.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked | QAbstractItemView.EditKeyPressed)
+        self.accounts_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.accounts_table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.accounts_table.setWordWrap(False)
+
+        # Filas de altura fija y columnas sin ajuste al contenido: la vista no recorre todas las filas
+        self.accounts_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.accounts_table.verticalHeader().setDefaultSectionSize(28)
+        self.accounts_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.accounts_table.horizontalHeader().setStretchLastSection(True)
+
+        self.accounts_table.clicked.connect(self.load_characters)
+
+        # Precarga de personajes de las filas visibles al desplazarse o cambiar la lista
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(PREFETCH_DELAY_MS)
+        self.prefetch_timer.timeout.connect(self.prefetch_visible_characters)
+        self.accounts_table.verticalScrollBar().valueChanged.connect(self.schedule_characters_prefetch)
+        self.accounts_model.modelReset.connect(self.schedule_characters_prefetch)
+        self.accounts_model.rowsInserted.connect(self.schedule_characters_prefetch)
         layout.addWidget(self.accounts_table)
 
+        # Número de cuentas cargadas frente al total
+        self.accounts_count_label = QLabel("")
+        layout.addWidget(self.accounts_count_label)
+
+        # Cambio de estado de todas las cuentas seleccionadas a la vez
+        bulk_layout = QHBoxLayout()
+        self.bulk_status_combobox = QComboBox()
+        self.bulk_status_combobox.addItems(ACCOUNT_STATUSES)
+        self.bulk_status_button = QPushButton("Aplicar estado a las seleccionadas")
+        self.bulk_status_button.clicked.connect(self.update_selected_accounts_status)
+        self.bulk_cancel_button = QPushButton("Cancelar")
+        self.bulk_cancel_button.clicked.connect(self.cancel_bulk_status_update)
+        self.bulk_cancel_button.hide()
+        self.bulk_progress_bar = QProgressBar()
+        self.bulk_progress_bar.hide()
+        bulk_layout.addWidget(QLabel("Estado:"))
+        bulk_layout.addWidget(self.bulk_status_combobox)
+        bulk_layout.addWidget(self.bulk_status_button)
+        bulk_layout.addWidget(self.bulk_progress_bar)
+        bulk_layout.addWidget(self.bulk_cancel_button)
+        bulk_layout.addStretch()
+        layout.addLayout(bulk_layout)
+
         # Tabla de personajes asociados
         self.characters_table = QTableWidget()
-        layout.addWidget(QLabel(self.translations["associated_characters"]))
+        self.associated_characters_label = QLabel(self.translations["associated_characters"])
+        layout.addWidget(self.associated_characters_label)
         layout.addWidget(self.characters_table)
 
         # Establecer el layout al widget
         self.setLayout(layout)
 
+    def refresh_view(self):
+        self.load_accounts()
+
+    def can_unload(self):
+        # No descartar la página con cambios de estado sin confirmar
+        return self.bulk_status_handle is None and not self.pending_status_updates
+
     def load_accounts(self):
-        accounts, error = get_all_accounts()  # Usa tu método para obtener las cuentas
+        # Cargar solo la primera página y el total; el resto lo pide la vista al desplazarse
+        self.load_accounts_button.setEnabled(False)
+        self.accounts_count_label.setText("Cargando cuentas...")
+        # Una página pedida antes de recargar ya no encaja con la nueva lista
+        if self.more_accounts_handle is not None:
+            self.more_accounts_handle.cancel()
+            self.more_accounts_handle = None
+        self.fetching_accounts = False
+        # La lista se carga del reino activo (puede haber cambiado desde la última carga)
+        self.realm = get_active_realm()
+        self.character_cache = get_character_cache(self.realm)
+        self.accounts_handle = self.executor.submit(get_accounts_page, include_total=True, realm=self.realm,
+                                                    key=("accounts_first_page", self.realm))
+        self.accounts_handle.finished.connect(self.on_accounts_loaded)
+        self.accounts_handle.failed.connect(self.on_accounts_load_failed)
+
+    def on_accounts_loaded(self, result):
+        if self.sender() is not self.accounts_handle:
+            return
+        self.load_accounts_button.setEnabled(True)
+        page, error = result
 
         if error:
-            QMessageBox.critical(self, "Error", "No se pudieron cargar las cuentas")
+            self.on_accounts_load_failed(error)
             return
 
-        if not accounts:
+        self.last_account_id = page["last_id"]
+        self.total_accounts = page["total"]
+        self.accounts_model.set_accounts(page["accounts"], has_more=page["has_more"])
+        self.all_accounts = self.accounts_model.all_accounts()
+        self.search_index = AccountSearchIndex(self.all_accounts)  # Índice de búsqueda de las cuentas cargadas
+        self.filter_accounts()
+        self.update_accounts_count_label()
+
+        if not page["accounts"]:
             QMessageBox.information(self, "Información", "No se encontraron cuentas.")
-            return
-        
-        self.all_accounts = accounts  # Guardar todas las cuentas en `self.all_accounts` para filtrado
-        self.display_accounts(accounts)
-        self.accounts_table.setRowCount(len(accounts))
-        self.accounts_table.setColumnCount(5)  # Añadir una columna para el botón "Aceptar"
-        self.accounts_table.setHorizontalHeaderLabels([
-            "ID de Cuenta", "Nombre", "Estado", "Fecha de Creación", "Actualizar Estado"
-        ])
 
-        # Ajustar el comportamiento de la tabla para que las celdas se adapten al contenido
-        self.accounts_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
-        self.accounts_table.horizontalHeader().setStretchLastSection(True)
+    def on_accounts_load_failed(self, error):
+        self.load_accounts_button.setEnabled(True)
+        self.accounts_count_label.setText("")
+        QMessageBox.critical(self, "Error", "No se pudieron cargar las cuentas")
 
-        # Establecer una altura fija para todas las filas
-        self.accounts_table.verticalHeader().setDefaultSectionSize(50)
+    def fetch_more_accounts(self):
+        """Pide la siguiente página de cuentas; la vista la añade al llegar."""
+        if self.fetching_accounts:
+            return
 
-        for row_idx, account in enumerate(accounts):
-            # Añadir el ID de cuenta, nombre, estado y fecha de creación
-            self.accounts_table.setItem(row_idx, 0, QTableWidgetItem(str(account.get("id", ""))))
-            self.accounts_table.setItem(row_idx, 1, QTableWidgetItem(account.get("login", "")))
-            self.accounts_table.setItem(row_idx, 2, QTableWidgetItem(account.get("status", "OK")))
+        self.fetching_accounts = True
+        self.more_accounts_handle = self.executor.submit(get_accounts_page, after_id=self.last_account_id, realm=self.realm,
+                                                         key=("accounts_page", self.realm, self.last_account_id))
+        self.more_accounts_handle.finished.connect(self.on_more_accounts_loaded)
+        self.more_accounts_handle.failed.connect(self.on_more_accounts_failed)
 
-            # Convertir create_time a cadena antes de asignarlo a la tabla
-            create_time = account.get("create_time", "")
-            if isinstance(create_time, datetime):
-                create_time = create_time.strftime("%Y-%m-%d %H:%M:%S")  # Convertir datetime a una cadena legible
-            self.accounts_table.setItem(row_idx, 3, QTableWidgetItem(str(create_time)))
+    def on_more_accounts_loaded(self, result):
+        if self.sender() is not self.more_accounts_handle:
+            return
+        self.fetching_accounts = False
+        page, error = result
 
-            # Añadir el botón y el desplegable para actualizar el estado
-            update_status_button = QPushButton("Aceptar")
-            update_status_button.setFixedSize(100, 40)  # Establecer un tamaño fijo para el botón
+        if error:
+            self.on_more_accounts_failed(error)
+            return
 
-            status_combobox = QComboBox()
-            status_combobox.addItems(["OK", "BLOCK"])
-            status_combobox.setFixedSize(100, 40)  # Establecer un tamaño fijo para el combo box
+        self.last_account_id = page["last_id"]
+        self.search_index.extend(page["accounts"])
+        self.accounts_model.append_accounts(page["accounts"], has_more=page["has_more"], matches=self.matches_search)
+        self.update_accounts_count_label()
 
-            # Crear un layout horizontal para el control del estado
-            control_layout = QHBoxLayout()
-            control_layout.addWidget(update_status_button)
-            control_layout.addWidget(status_combobox)
-            control_layout.setContentsMargins(5, 5, 5, 5)  # Añadir márgenes para dar espacio alrededor
-            control_layout.setSpacing(10)  # Espaciado entre el botón y el combo box
+    def on_more_accounts_failed(self, error):
+        if self.sender() not in (None, self.more_accounts_handle):
+            return
+        self.fetching_accounts = False
+        # Evitar que la vista reintente en bucle
+        self.accounts_model.has_more = False
+        QMessageBox.critical(self, "Error", "No se pudieron cargar las cuentas")
+
+    def update_accounts_count_label(self):
+        if self.total_accounts is None:
+            self.accounts_count_label.setText(f"Cuentas cargadas: {len(self.all_accounts)}")
+        else:
+            self.accounts_count_label.setText(f"Cuentas cargadas: {len(self.all_accounts)} de {self.total_accounts}")
 
-            # Crear un QWidget para contener el layout y añadirlo a la celda de la tabla
-            control_widget = QWidget()
-            control_widget.setLayout(control_layout)
-            self.accounts_table.setCellWidget(row_idx, 4, control_widget)
+    def display_accounts(self, accounts):
+        """Muestra en la tabla la lista de cuentas indicada (None para todas las cargadas)."""
+        self.accounts_model.set_filter(accounts)
 
-            # Conectar la lógica del botón al método update_account_status
-            update_status_button.clicked.connect(lambda _, acc_id=account["id"], new_status=status_combobox: 
-                                                self.update_account_status(acc_id, new_status.currentText()))
+    def matches_search(self, account):
+        """Indica si una cuenta coincide con el término de búsqueda actual."""
+        return self.search_index.matches(account, self.account_search_box.text())
 
-        # Forzar el refresco de la tabla
-        self.accounts_table.viewport().update()
+    def filter_accounts(self):
+        """Filtra las cuentas según el término de búsqueda ingresado (subcadena del login o id exacto)."""
+        self.display_accounts(self.search_index.search(self.account_search_box.text()))
 
-    def display_accounts(self, accounts):
-        self.accounts_table.setRowCount(len(accounts))
-        self.accounts_table.setColumnCount(5)  # Añadir una columna para el botón "Aceptar"
-        self.accounts_table.setHorizontalHeaderLabels([
-            "ID de Cuenta", "Nombre", "Estado", "Fecha de Creación", "Actualizar Estado"
-        ])
+    def load_characters(self, index):
+        account = self.accounts_model.account_at(index.row())
 
-        # Ajustar el comportamiento de la tabla para que las celdas se adapten al contenido
-        self.accounts_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
-        self.accounts_table.horizontalHeader().setStretchLastSection(True)
+        # Solo interesa la última cuenta pulsada: descartar la consulta anterior
+        if self.characters_handle is not None and not self.characters_handle.done:
+            self.characters_handle.cancel()
 
-        # Establecer una altura fija para todas las filas
-        self.accounts_table.verticalHeader().setDefaultSectionSize(50)
+        self.characters_account = account
 
-        for row_idx, account in enumerate(accounts):
-            # Añadir el ID de cuenta, nombre, estado y fecha de creación
-            self.accounts_table.setItem(row_idx, 0, QTableWidgetItem(str(account.get("id", ""))))
-            self.accounts_table.setItem(row_idx, 1, QTableWidgetItem(account.get("login", "")))
-            self.accounts_table.setItem(row_idx, 2, QTableWidgetItem(account.get("status", "OK")))
+        # Si la cuenta ya se precargó, mostrarla sin pasar por la base de datos
+        characters = self.character_cache.get(account["id"])
+        if characters is not None:
+            self.characters_handle = None
+            self.display_characters(characters)
+            return
 
-            # Convertir create_time a cadena antes de asignarlo a la tabla
-            create_time = account.get("create_time", "")
-            if isinstance(create_time, datetime):
-                create_time = create_time.strftime("%Y-%m-%d %H:%M:%S")  # Convertir datetime a una cadena legible
-            self.accounts_table.setItem(row_idx, 3, QTableWidgetItem(str(create_time)))
+        self.characters_handle = self.executor.submit(self.character_cache.get_characters, account["id"],
+                                                      key=("characters", self.realm, account["id"]))
+        self.characters_handle.finished.connect(self.on_characters_loaded)
+        self.characters_handle.failed.connect(self.on_characters_failed)
 
-            # Añadir el botón y el desplegable para actualizar el estado
-            update_status_button = QPushButton("Aceptar")
-            update_status_button.setFixedSize(100, 40)  # Establecer un tamaño fijo para el botón
+    def schedule_characters_prefetch(self, *_):
+        # Esperar a que el desplazamiento se detenga antes de pedir nada
+        self.prefetch_timer.start()
 
-            status_combobox = QComboBox()
-            status_combobox.addItems(["OK", "BLOCK"])
-            status_combobox.setFixedSize(100, 40)  # Establecer un tamaño fijo para el combo box
+    def prefetch_visible_characters(self):
+        """Carga en una sola consulta los personajes de las cuentas visibles que no están en caché."""
+        row_count = self.accounts_model.rowCount()
+        if row_count == 0:
+            return
 
-            # Crear un layout horizontal para el control del estado
-            control_layout = QHBoxLayout()
-            control_layout.addWidget(update_status_button)
-            control_layout.addWidget(status_combobox)
-            control_layout.setContentsMargins(5, 5, 5, 5)  # Añadir márgenes para dar espacio alrededor
-            control_layout.setSpacing(10)  # Espaciado entre el botón y el combo box
+        first_row = self.accounts_table.rowAt(0)
+        last_row = self.accounts_table.rowAt(self.accounts_table.viewport().height() - 1)
+        first_row = max(first_row, 0)
+        last_row = row_count - 1 if last_row < 0 else last_row
 
-            # Crear un QWidget para contener el layout y añadirlo a la celda de la tabla
-            control_widget = QWidget()
-            control_widget.setLayout(control_layout)
-            self.accounts_table.setCellWidget(row_idx, 4, control_widget)
+        account_ids = [self.accounts_model.account_at(row)["id"] for row in range(first_row, last_row + 1)]
+        missing = self.character_cache.missing(account_ids)
+        if missing:
+            self.executor.submit(self.character_cache.prefetch, missing,
+                                 key=("characters_prefetch", self.realm, tuple(missing)))
 
-            # Conectar la lógica del botón al método update_account_status
-            update_status_button.clicked.connect(lambda _, acc_id=account["id"], new_status=status_combobox:
-                                                self.update_account_status(acc_id, new_status.currentText()))
+    def on_characters_failed(self, error):
+        if self.sender() is self.characters_handle:
+            QMessageBox.critical(self, "Error", self.translations["error_fetching_characters"])
 
-        # Forzar el refresco de la tabla
-        self.accounts_table.viewport().update()
+    def on_characters_loaded(self, result):
+        if self.sender() is not self.characters_handle:
+            return
 
-    def filter_accounts(self):
-        """Filtra las cuentas según el término de búsqueda ingresado."""
-        search_term = self.account_search_box.text().strip().lower()
-        filtered_accounts = [account for account in self.all_accounts if search_term in account["login"].lower()]
-        self.display_accounts(filtered_accounts)
-
-    def load_characters(self, row, column):
-        account_id = self.accounts_table.item(row, 0).text()
-        account_name = self.accounts_table.item(row, 1).text()  # Obtener el nombre de la cuenta
-        characters, error = get_all_characters(account_id)
-        
+        characters, error = result
 
         if error:
             QMessageBox.critical(self, "Error", self.translations["error_fetching_characters"])
             return
 
+        self.display_characters(characters)
+
+    def display_characters(self, characters):
+        account_name = self.characters_account["login"]  # Obtener el nombre de la cuenta
+
         if not characters:
             QMessageBox.information(self, "Información", self.translations["error_no_characters"])
             return
 
         self.characters_table.setRowCount(len(characters))
         self.characters_table.setColumnCount(5)
-        self.characters_table.setHorizontalHeaderLabels([
-            self.translations["character_name"],
-            self.translations["character_type"],
-            self.translations["character_gender_label"],
-            self.translations["character_last_play"],
-            "Crear GM"
-        ])
+        self.characters_table.setHorizontalHeaderLabels(self.character_headers())
 
         # Ajustar el comportamiento de la tabla para que las celdas se adapten al contenido
         self.characters_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
@@ -235,48 +433,17 @@ class UserManagementWidget(QWidget):
         # Establecer una altura fija para todas las filas (opción 1)
         self.characters_table.verticalHeader().setDefaultSectionSize(50)
     
-        # Mapeo de los valores de job a imágenes y nombres de personajes
-        job_mapping = {
-            0: ("warrior", "Guerrero", "m"),
-            4: ("warrior", "Guerrera", "w"),
-            5: ("assassin", "Ninja", "m"),
-            1: ("assassin", "Ninja", "w"),
-            2: ("sura", "Sura", "m"),
-            6: ("sura", "Sura", "w"),
-            7: ("shaman", "Chamán", "m"),
-            3: ("shaman", "Chamán", "w"),
-            8: ("wolfman", "Lycan", "m")
-        }
+        # Retratos ya decodificados y escalados: pintar la lista no lee ni decodifica imágenes
+        self.characters_table.setIconSize(QSize(CHARACTER_SPRITE_SIZE, CHARACTER_SPRITE_SIZE))
 
         for row_idx, character in enumerate(characters):
             character_job = character.get("job", -1)
-            
-            # Validar si el `job` es reconocido, de lo contrario, mostrar un mensaje y usar valores predeterminados
-            if character_job in job_mapping:
-                job_type, job_name, gender_suffix = job_mapping[character_job]
-                image_path = os.path.join("resources", "characters", f"{job_type}_{gender_suffix}.jpg")
-
-                # Verificar si la imagen existe
-                if not os.path.exists(image_path):
-                    print(f"Imagen no encontrada: {image_path}. Cargando imagen por defecto.")
-                    image_path = os.path.join("resources", "characters", "default.jpg")
-            else:
-                # Mostrar un mensaje si el `job` no es reconocido y cargar valores predeterminados
-                print(f"Trabajo no reconocido: {character_job}. Cargando imagen por defecto.")
-                job_name = "Desconocido"
-                image_path = os.path.join("resources", "characters", "default.jpg")
-
-            # Añadir la imagen al widget
-            pixmap = QPixmap(image_path)
-            if pixmap.isNull():
-                print(f"Error al cargar la imagen: {image_path}. Verifique la ruta y el archivo.")
-                image_path = os.path.join("resources", "characters", "default.jpg")
-                pixmap = QPixmap(image_path)
-
-            pixmap = pixmap.scaled(50, 50, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            image_label = QLabel()
-            image_label.setPixmap(pixmap)
-            self.characters_table.setCellWidget(row_idx, 0, image_label)
+            job_name = character_class_name(character_job)
+
+            image_item = QTableWidgetItem()
+            image_item.setData(Qt.DecorationRole, self.sprite_cache.pixmap(character_job, CHARACTER_SPRITE_SIZE))
+            image_item.setFlags(Qt.ItemIsEnabled)
+            self.characters_table.setItem(row_idx, 0, image_item)
 
             # Añadir el nombre, tipo y última conexión
             self.characters_table.setItem(row_idx, 1, QTableWidgetItem(character.get("name", "Desconocido")))
@@ -309,41 +476,3 @@ class UserManagementWidget(QWidget):
             # Conectar la lógica del botón al método create_gm
             create_gm_button.clicked.connect(lambda _, acc_name=account_name, char_name=character["name"], auth_level=authority_combobox: 
                                             self.create_gm_action(acc_name, char_name, auth_level.currentText()))
-                         
-    # Dentro de la función que carga los personajes de una cuenta:
-    def add_character_controls(self, character, layout):
-        create_gm_button = QPushButton("Crear GM")
-        authority_combobox = QComboBox()
-        authority_combobox.addItems(["IMPLEMENTOR", "GOD", "LOW_WIZARD", "PLAYER"])
-        
-        control_layout = QHBoxLayout()
-        control_layout.addWidget(create_gm_button)
-        control_layout.addWidget(authority_combobox)
-        layout.addLayout(control_layout)
-        
-        # Conectar la lógica para crear o actualizar un GM al botón
-        create_gm_button.clicked.connect(lambda: create_gm(character['name'], authority_combobox.currentText()))
-
-     
-    def update_status(self):
-        selected_row = self.accounts_table.currentRow()
-        if selected_row == -1:
-            error_label = QLabel("Please select an account to update status.")
-            self.layout.addWidget(error_label)
-            return
-
-        account_id = self.accounts_table.item(selected_row, 0).text()
-        current_status = self.accounts_table.item(selected_row, 2).text()
-
-        # Cambiar el estado
-        new_status = "BLOCK" if current_status == "OK" else "OK"
-
-        # Actualizar el estado de la cuenta
-        success = update_account_status(account_id, new_status)
-        if success:
-            self.accounts_table.setItem(selected_row, 2, QTableWidgetItem(new_status))
-        else:
-            error_label = QLabel("Failed to update account status.")
-            self.layout.addWidget(error_label)
-            
-    
\ No newline at end of file
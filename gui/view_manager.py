@@ -0,0 +1,134 @@
+# view_manager.py
+import time
+from PyQt5.QtCore import QObject, QTimer
+
+# Páginas que se mantienen creadas a la vez; al superarlo se descarta la usada hace más tiempo
+DEFAULT_MAX_LIVE_VIEWS = 3
+# Segundos sin mostrarse tras los que una página se descarta (0 para no descartarlas nunca)
+DEFAULT_IDLE_UNLOAD_SECONDS = 600
+# Cada cuánto se buscan páginas inactivas
+IDLE_CHECK_INTERVAL_MS = 60 * 1000
+
+
+class ViewManager(QObject):
+    """
+    Crea bajo demanda las páginas de un QStackedWidget y las reutiliza.
+
+    Cada página se registra con un nombre y una función que la construye; se
+    crea la primera vez que se muestra y las siguientes veces solo se trae al
+    frente, sin volver a consultar la base de datos. Las páginas pueden ofrecer
+    (opcionalmente) estos métodos:
+
+    - `refresh_view()`: vuelve a cargar sus datos; lo llama `refresh()`.
+    - `can_unload()`: devuelve False mientras tienen trabajo en curso que no debe perderse.
+    - `retranslate_ui()`: vuelve a poner sus textos tras un cambio de idioma.
+
+    Para limitar la memoria, las páginas ocultas se descartan si llevan
+    `idle_unload_seconds` sin mostrarse o si hay más de `max_live_views`
+    creadas; se vuelven a crear al mostrarlas de nuevo.
+    """
+
+    def __init__(self, stack, max_live_views=DEFAULT_MAX_LIVE_VIEWS,
+                 idle_unload_seconds=DEFAULT_IDLE_UNLOAD_SECONDS, parent=None):
+        super(ViewManager, self).__init__(parent)
+        self.stack = stack
+        self.max_live_views = max_live_views
+        self.idle_unload_seconds = idle_unload_seconds
+        self._factories = {}    # nombre -> (función que crea la página, mantener siempre)
+        self._views = {}        # nombre -> página creada
+        self._last_used = {}    # nombre -> instante en que dejó de estar visible o se mostró
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.timeout.connect(self.unload_idle_views)
+        self.idle_timer.start(IDLE_CHECK_INTERVAL_MS)
+
+    def register(self, name, factory, keep_alive=False):
+        """
+        Registra una página.
+
+        :param factory: Función sin argumentos que crea el widget de la página.
+        :param keep_alive: Si es True la página no se descarta nunca (por ejemplo, si es barata o tiene estado valioso).
+        """
+        self._factories[name] = (factory, keep_alive)
+
+    def view(self, name):
+        """Devuelve la página si está creada, o None."""
+        return self._views.get(name)
+
+    def current_name(self):
+        current = self.stack.currentWidget()
+        for name, view in self._views.items():
+            if view is current:
+                return name
+        return None
+
+    def show(self, name):
+        """Muestra la página `name`, creándola solo si no existe. Devuelve el widget."""
+        previous = self.current_name()
+        if previous is not None:
+            self._last_used[previous] = time.monotonic()
+
+        view = self._views.get(name)
+        if view is None:
+            factory, _ = self._factories[name]
+            view = factory()
+            self._views[name] = view
+            self.stack.addWidget(view)
+
+        self.stack.setCurrentWidget(view)
+        self._last_used[name] = time.monotonic()
+        self._enforce_limit()
+        return view
+
+    def refresh(self, name=None):
+        """Pide a la página (por defecto la visible) que vuelva a cargar sus datos."""
+        name = name or self.current_name()
+        view = self._views.get(name)
+        if view is not None and hasattr(view, "refresh_view"):
+            view.refresh_view()
+
+    def retranslate(self):
+        """
+        Aplica el idioma actual a las páginas creadas.
+
+        Las que no saben cambiar sus textos se descartan (si se puede) para
+        que se creen de nuevo en el idioma actual al volver a mostrarlas.
+        """
+        for name in list(self._views):
+            view = self._views[name]
+            if hasattr(view, "retranslate_ui"):
+                view.retranslate_ui()
+            elif self._can_unload(name):
+                self.unload(name)
+
+    def _can_unload(self, name):
+        _, keep_alive = self._factories[name]
+        view = self._views[name]
+        if keep_alive or view is self.stack.currentWidget():
+            return False
+        return not hasattr(view, "can_unload") or view.can_unload()
+
+    def unload(self, name):
+        """Descarta una página creada; se volverá a crear al mostrarla."""
+        view = self._views.pop(name, None)
+        if view is None:
+            return
+        self._last_used.pop(name, None)
+        self.stack.removeWidget(view)
+        view.deleteLater()
+
+    def unload_idle_views(self):
+        """Descarta las páginas ocultas que llevan más de `idle_unload_seconds` sin usarse."""
+        if not self.idle_unload_seconds:
+            return
+        now = time.monotonic()
+        for name in list(self._views):
+            if now - self._last_used.get(name, now) > self.idle_unload_seconds and self._can_unload(name):
+                self.unload(name)
+
+    def _enforce_limit(self):
+        # Descartar las páginas usadas hace más tiempo hasta quedar dentro del límite
+        candidates = sorted((name for name in self._views if self._can_unload(name)),
+                            key=lambda name: self._last_used.get(name, 0))
+        while len(self._views) > self.max_live_views and candidates:
+            self.unload(candidates.pop(0))
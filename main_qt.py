@@ -1,10 +1,27 @@
 # main_qt.py
-from PyQt5 import QtWidgets
 import sys
+import logging
+import multiprocessing
+# El medidor se crea antes que nada para que cuente también la importación de PyQt5
+from gui.startup_profiler import create_profiler
+
+startup_profiler = create_profiler()
+
+from PyQt5 import QtWidgets
 from gui.main_window import ServerAdminApp  # Cambiar la importación a main_window.py, donde está ServerAdminApp
 
+startup_profiler.mark("importaciones")
+
 if __name__ == "__main__":
+    # Necesario para el pool de procesos de la importación de cuentas en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
+    # Errores y consultas lentas del backend
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     app = QtWidgets.QApplication(sys.argv)
+    startup_profiler.mark("QApplication")
     main_window = ServerAdminApp()
+    startup_profiler.mark("ventana principal creada")
+    # La ventana carga los iconos y el recolector de estadísticas después de su primer pintado
+    startup_profiler.watch_first_paint(main_window)
     main_window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,52 @@
+# test_account_search.py
+"""
+Pruebas del índice de búsqueda de cuentas.
+
+Uso:
+    python -m pytest tests
+"""
+from backend.account_search import AccountSearchIndex
+
+ACCOUNTS = [
+    {"id": 1, "login": "admin"},
+    {"id": 2, "login": "gamemaster"},
+    {"id": 12, "login": "player12"},
+    {"id": 42, "login": "jugador"},
+]
+
+
+def logins(results):
+    return [account["login"] for account in results]
+
+
+def test_search_by_login_substring():
+    index = AccountSearchIndex(ACCOUNTS)
+
+    assert logins(index.search("master")) == ["gamemaster"]
+    assert logins(index.search("A")) == ["admin", "gamemaster", "player12", "jugador"]
+
+
+def test_search_by_id_puts_exact_match_first():
+    index = AccountSearchIndex(ACCOUNTS)
+
+    assert logins(index.search("12")) == ["player12"]
+    assert logins(index.search("42")) == ["jugador"]
+    assert logins(index.search("2")) == ["gamemaster", "player12"]
+
+
+def test_non_ascii_digits_do_not_raise():
+    index = AccountSearchIndex(ACCOUNTS)
+
+    # "²" y "①" cumplen isdigit() pero int() no los acepta
+    for term in ("²", "①", "12²"):
+        assert index.search(term) == []
+        assert not index.matches(ACCOUNTS[0], term)
+
+
+def test_matches_uses_same_criteria_as_search():
+    index = AccountSearchIndex(ACCOUNTS)
+
+    for term in ("adm", "42", "1", "zzz"):
+        found = index.search(term)
+        assert [account for account in ACCOUNTS if index.matches(account, term)] == sorted(
+            found, key=lambda account: account["id"])
@@ -0,0 +1,169 @@
+# test_downloader.py
+"""
+Pruebas del descargador contra un servidor HTTP local (`http.server` en 127.0.0.1).
+
+Uso:
+    python -m pytest tests
+"""
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.downloader import Downloader, PARTIAL_SUFFIX
+
+# Contenido servido: no repetitivo para que un parcial mal enlazado cambie el hash
+PAYLOAD = os.urandom(512 * 1024)
+PAYLOAD_SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """Sirve PAYLOAD en /file admitiendo `Range: bytes=inicio-`, como un servidor de actualizaciones."""
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        if self.path != "/file":
+            self.send_error(404)
+            return
+
+        start = 0
+        byte_range = self.headers.get("Range")
+        if byte_range:
+            start = int(byte_range.split("=", 1)[1].split("-", 1)[0])
+            if start >= len(PAYLOAD):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(PAYLOAD)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}")
+        else:
+            self.send_response(200)
+        body = PAYLOAD[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        # Envío en trozos con pausas para que la descarga dure lo bastante como para limitar el progreso
+        for position in range(0, len(body), self.server.write_size):
+            self.wfile.write(body[position:position + self.server.write_size])
+            self.wfile.flush()
+            time.sleep(self.server.write_delay)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+    httpd.requests = []
+    httpd.write_size = 64 * 1024
+    httpd.write_delay = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield httpd
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def file_url(httpd):
+    return f"http://127.0.0.1:{httpd.server_address[1]}/file"
+
+
+def test_download_complete_file(server, tmp_path):
+    output = str(tmp_path / "update.zip")
+
+    path, error = Downloader(max_retries=0).download(file_url(server), output, PAYLOAD_SHA256)
+
+    assert error is None
+    assert path == output
+    with open(output, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert not os.path.exists(output + PARTIAL_SUFFIX)
+    assert "Range" not in server.requests[0]
+
+
+def test_resume_partial_download(server, tmp_path):
+    output = str(tmp_path / "update.zip")
+    already_downloaded = 200 * 1024
+    with open(output + PARTIAL_SUFFIX, "wb") as f:
+        f.write(PAYLOAD[:already_downloaded])
+
+    path, error = Downloader(max_retries=0).download(file_url(server), output, PAYLOAD_SHA256)
+
+    assert error is None
+    assert server.requests[0]["Range"] == f"bytes={already_downloaded}-"
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+
+
+def test_already_complete_partial_is_verified(server, tmp_path):
+    output = str(tmp_path / "update.zip")
+    with open(output + PARTIAL_SUFFIX, "wb") as f:
+        f.write(PAYLOAD)
+
+    # El servidor responde 416 al pedir desde el final: el parcial ya está completo
+    path, error = Downloader(max_retries=0).download(file_url(server), output, PAYLOAD_SHA256)
+
+    assert error is None
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+
+
+def test_checksum_mismatch_discards_download(server, tmp_path):
+    output = str(tmp_path / "update.zip")
+
+    path, error = Downloader(max_retries=0).download(file_url(server), output, "0" * 64)
+
+    assert path is None
+    assert "SHA-256" in error
+    assert not os.path.exists(output)
+    assert not os.path.exists(output + PARTIAL_SUFFIX)
+
+
+def test_corrupt_partial_fails_checksum(server, tmp_path):
+    output = str(tmp_path / "update.zip")
+    # Un parcial que no corresponde al archivo se reanuda igual, pero el hash final lo detecta
+    with open(output + PARTIAL_SUFFIX, "wb") as f:
+        f.write(b"\0" * 1024)
+
+    path, error = Downloader(max_retries=0).download(file_url(server), output, PAYLOAD_SHA256)
+
+    assert path is None
+    assert "SHA-256" in error
+    assert not os.path.exists(output)
+
+
+def test_progress_is_throttled(server, tmp_path):
+    server.write_size = 4 * 1024
+    server.write_delay = 0.002
+    output = str(tmp_path / "update.zip")
+    calls = []
+
+    started = time.monotonic()
+    path, error = Downloader(max_retries=0, progress_interval=0.1, min_chunk_size=4 * 1024).download(
+        file_url(server), output, PAYLOAD_SHA256, progress_callback=lambda done, total: calls.append((done, total)))
+    elapsed = time.monotonic() - started
+
+    assert error is None
+    # Como mucho un aviso por intervalo durante la descarga, más el aviso final
+    assert 2 <= len(calls) <= elapsed / 0.1 + 2
+    assert calls[-1] == (len(PAYLOAD), len(PAYLOAD))
+    assert [done for done, _ in calls] == sorted(done for done, _ in calls)
+
+
+def test_client_error_is_not_retried(server, tmp_path):
+    output = str(tmp_path / "update.zip")
+    missing_url = file_url(server).replace("/file", "/missing")
+
+    path, error = Downloader(max_retries=3, retry_backoff=0).download(missing_url, output)
+
+    assert path is None
+    assert "404" in error
+    assert len(server.requests) == 1